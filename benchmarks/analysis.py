@@ -0,0 +1,64 @@
+"""
+Throughput benchmark of the semantic analysis: nodes/s of LexicalAnalyzer on large generated programs,
+parsed once and analyzed repeat times, reporting the best run.
+
+    python benchmarks/analysis.py --nodes 200000
+"""
+import os
+import sys
+import time
+import argparse
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from Scanner import Scanner
+from Parser import Parser
+from LexicalAnalyzer import LexicalAnalyzer
+from generators import statement_list, deep_nesting
+from run import count_nodes
+
+
+def nested_blocks(count: int) -> str:
+    """
+    Loops, if statements and blocks nested a few levels deep, repeated count times: large but shallow, unlike
+    deep_nesting, whose parsing and scope lookups grow with the square of the depth.
+    """
+    return "".join(deep_nesting(24) for _ in range(count))
+
+
+WORKLOADS = {
+    # name: (generator, nodes per unit of its size)
+    'statements': (statement_list, 10),
+    'blocks': (nested_blocks, 170),
+}
+
+
+def analyze(ast, repeat: int) -> float:
+    """
+    Returns the best time of the semantic analysis of the tree out of repeat runs.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        LexicalAnalyzer().visit(ast)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description="Throughput benchmark of the semantic analysis")
+    argument_parser.add_argument('--nodes', type=int, default=200_000, help="approximate number of nodes per program")
+    argument_parser.add_argument('--repeat', type=int, default=3, help="runs of the analysis, the best one is reported")
+    argument_parser.add_argument('--workload', choices=WORKLOADS, action='append', help="programs to analyze (all by default)")
+    args = argument_parser.parse_args()
+
+    warnings.simplefilter('ignore')  # warnings of the semantic analysis about the generated programs
+    print(f"{'workload':<12}{'nodes':>10}{'seconds':>10}{'nodes/s':>12}")
+    for name in args.workload or WORKLOADS:
+        generator, nodes_per_unit = WORKLOADS[name]
+        ast = Parser().parse(Scanner().tokenize(generator(max(1, args.nodes // nodes_per_unit))))
+        nodes = count_nodes(ast)
+        seconds = analyze(ast, args.repeat)
+        print(f"{name:<12}{nodes:>10}{seconds:>10.3f}{nodes / seconds:>12.0f}")
@@ -0,0 +1,53 @@
+"""
+Benchmark of the AST cache: time to scan and parse a large generated program against the time to load its
+serialized FlatTree, with and without building the view the backends walk, reporting the best of repeat runs.
+
+    python benchmarks/ast_cache.py --nodes 200000
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from Scanner import Scanner
+from Parser import Parser
+from FlatAST import FlatTree
+from generators import statement_list
+from run import count_nodes
+
+
+def best(function, repeat: int) -> float:
+    """
+    Returns the best time of function out of repeat calls.
+    """
+    seconds = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        seconds = min(seconds, time.perf_counter() - start)
+    return seconds
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description="Benchmark of loading a cached AST against parsing")
+    argument_parser.add_argument('--nodes', type=int, default=200_000, help="approximate number of nodes of the program")
+    argument_parser.add_argument('--repeat', type=int, default=3, help="runs of each stage, the best one is reported")
+    args = argument_parser.parse_args()
+
+    source = statement_list(max(1, args.nodes // 10))
+    scanner, parser = Scanner(), Parser()
+    ast = parser.parse(scanner.tokenize(source))
+    data = FlatTree.from_ast(ast).to_bytes()
+    print(f"{count_nodes(ast)} nodes, {len(source)} bytes of source, {len(data)} bytes cached")
+
+    stages = {
+        'parse': lambda: parser.parse(scanner.tokenize(source)),
+        'load': lambda: FlatTree.from_bytes(data),
+        'load+view': lambda: FlatTree.from_bytes(data).view(),
+    }
+    print(f"{'stage':<12}{'seconds':>10}")
+    for name, stage in stages.items():
+        print(f"{name:<12}{best(stage, args.repeat):>10.3f}")
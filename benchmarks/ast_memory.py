@@ -0,0 +1,57 @@
+"""
+Memory benchmark of the AST: the memory retained by the tree of a generated program of about a million nodes,
+as node objects or, with --flat, as a FlatTree.
+
+    python benchmarks/ast_memory.py --nodes 1000000
+    python benchmarks/ast_memory.py --nodes 1000000 --flat
+"""
+import os
+import sys
+import gc
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from Scanner import Scanner
+from Parser import Parser
+from generators import statement_list
+from run import count_nodes
+
+NODES_PER_STATEMENT = 10  # average of the assignments and if statements of statement_list
+
+
+def build(text: str, flat: bool = False):
+    """
+    Parses the program, returning the tree and the memory it retains once the scanner and parser are freed.
+    """
+    gc.collect()
+    tracemalloc.start()
+    parser = Parser()
+    ast = (parser.parse_flat if flat else parser.parse)(Scanner().tokenize(text))
+    del parser
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return ast, retained, peak
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description="Memory benchmark of the AST")
+    argument_parser.add_argument('--nodes', type=int, default=1_000_000, help="approximate number of nodes")
+    argument_parser.add_argument('--flat', action='store_true', help="parse into a FlatTree")
+    args = argument_parser.parse_args()
+
+    text = statement_list(max(1, args.nodes // NODES_PER_STATEMENT))
+    start = time.perf_counter()
+    ast, retained, peak = build(text, args.flat)
+    seconds = time.perf_counter() - start
+    nodes = len(ast) if args.flat else count_nodes(ast)
+
+    print(f"nodes:          {nodes}")
+    print(f"retained [MiB]: {retained / 2 ** 20:.1f}")
+    print(f"bytes/node:     {retained / nodes:.1f}")
+    print(f"peak [MiB]:     {peak / 2 ** 20:.1f}")
+    print(f"parse [s]:      {seconds:.2f}")
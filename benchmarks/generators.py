@@ -0,0 +1,109 @@
+"""
+Synthetic program generators for the benchmarks, each scaled by a single size parameter.
+"""
+
+
+def deep_nesting(depth: int) -> str:
+    """
+    Blocks, single-iteration loops and if statements nested depth levels deep.
+    """
+    lines = ["x = 0;"]
+    for level in range(depth):
+        indent = "    " * level
+        if level % 3 == 0:
+            lines.append(f"{indent}for i{level} = 0:1 {{")
+        elif level % 3 == 1:
+            lines.append(f"{indent}if (x >= 0) {{")
+        else:
+            lines.append(f"{indent}{{")
+        lines.append(f"{indent}    x += {level % 7};")
+    for level in reversed(range(depth)):
+        lines.append("    " * level + "}")
+    lines.append("print x;")
+    return "\n".join(lines) + "\n"
+
+
+def statement_list(length: int) -> str:
+    """
+    A long list of top-level assignments with arithmetic and relational expressions.
+    """
+    lines = ["a0 = 1;"]
+    for i in range(1, length):
+        j = i // 2
+        lines.append(f"a{i} = a{j} * 2 + {i} - (a{j} / 3);" if i % 2 else f"a{i} = a{j} + {i} * 0.5;")
+        if i % 10 == 0:
+            lines.append(f"if (a{i} > a{j}) b = a{i}; else b = a{j};")
+    lines.append(f"print a{length - 1};")
+    return "\n".join(lines) + "\n"
+
+
+def matrix_literal(size: int) -> str:
+    """
+    A size x size matrix literal, combined with the matrix operators.
+    """
+    rows = ", ".join("[" + ", ".join(str((i * size + j) % 10) for j in range(size)) + "]" for i in range(size))
+    return (
+        f"A = [{rows}];\n"
+        f"B = ones({size});\n"
+        f"C = A .+ B;\n"
+        f"D = A .* C;\n"
+        f"E = A .- B;\n"
+        f"print D[0, 0], E[{size - 1}, 0];\n"
+    )
+
+
+def tight_loop(limit: int) -> str:
+    """
+    The prime sieve of primes.txt searching up to the limit.
+    """
+    return (
+        f"count = 0;\n"
+        f"for n = 2:{limit} {{\n"
+        f"    p = 1;\n"
+        f"    for d = 2:n-1 {{\n"
+        f"        nc = n;\n"
+        f"        while (nc > 0) nc -= d;\n"
+        f"        if (nc == 0) {{\n"
+        f"            p = 0;\n"
+        f"            break;\n"
+        f"        }}\n"
+        f"    }}\n"
+        f"    if (p == 1) {{\n"
+        f"        count += 1;\n"
+        f"    }}\n"
+        f"}}\n"
+        f"print count;\n"
+    )
+
+
+def break_heavy(iterations: int) -> str:
+    """
+    Loops ended by break or skipped with continue after a few statements, in every iteration of the outer loop.
+    """
+    return (
+        f"total = 0;\n"
+        f"for i = 0:{iterations} {{\n"
+        f"    for j = 0:100 {{\n"
+        f"        if (j > 2) break;\n"
+        f"        total += j;\n"
+        f"    }}\n"
+        f"    k = 0;\n"
+        f"    while (k < 4) {{\n"
+        f"        k += 1;\n"
+        f"        if (k == 2) {{\n"
+        f"            continue;\n"
+        f"        }}\n"
+        f"        total += 1;\n"
+        f"    }}\n"
+        f"}}\n"
+        f"print total;\n"
+    )
+
+
+GENERATORS = {  # name -> (generator, size at scale 1)
+    'deep_nesting': (deep_nesting, 60),
+    'statement_list': (statement_list, 2000),
+    'matrix_literal': (matrix_literal, 60),
+    'tight_loop': (tight_loop, 100),
+    'break_heavy': (break_heavy, 2000),
+}
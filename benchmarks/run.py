@@ -0,0 +1,213 @@
+"""
+Benchmarks of the compiler stages: tokenizing, parsing, semantic analysis and interpretation.
+
+Every generated program is run through the stages, reporting the time, throughput and peak memory of each:
+tokens/s for the scanner, nodes/s for the parser and the semantic analysis and nodes visited by the interpreter
+(ops)/s for the execution, whichever backend runs it. The results can be saved as a baseline and later compared
+against it, on the same machine and Python version, as timings are not comparable across them:
+
+    python benchmarks/run.py --save benchmarks/baseline.json
+    python benchmarks/run.py --baseline benchmarks/baseline.json
+"""
+import os
+import sys
+import io
+import json
+import time
+import platform
+import argparse
+import warnings
+import tracemalloc
+import contextlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import AST
+from Scanner import Scanner
+from Parser import Parser
+from LexicalAnalyzer import LexicalAnalyzer
+from interpreter.Interpreter import Interpreter
+from interpreter.ClosureCompiler import ClosureCompiler
+from interpreter.PythonCompiler import PythonCompiler
+from interpreter.FlatInterpreter import FlatInterpreter
+from interpreter.RegisterMachine import RegisterMachine
+from interpreter.TracingJIT import TracingInterpreter
+from interpreter.CCompiler import CCompiler
+from generators import GENERATORS
+
+
+class CountingInterpreter(Interpreter):
+    """
+    Interpreter counting the visited nodes, used only to measure the number of operations.
+    """
+    def __init__(self):
+        super().__init__()
+        self.operations = 0
+
+    def evaluate(self, node):
+        self.operations += 1
+        return super().evaluate(node)
+
+
+def count_nodes(node) -> int:
+    """
+    Counts the positions of the tree below the node: each child is counted once, and a leaf shared by several
+    parents, as interned by the parser, once for each of them.
+    """
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (list, tuple)):
+            stack.extend(node)
+        elif isinstance(node, AST.Node):
+            count += 1
+            stack.extend(value for name, value in AST.fields(node))
+    return count
+
+
+def tokenize(text):
+    return list(Scanner().tokenize(text))
+
+
+def parse(tokens):
+    return Parser().parse(iter(tokens))
+
+
+def analyze(ast):
+    LexicalAnalyzer().visit(ast)
+
+
+ENGINES = {
+    'interpreter': Interpreter,
+    'closure': ClosureCompiler,
+    'python': PythonCompiler,
+    'flat': FlatInterpreter,
+    'vm': RegisterMachine,
+    'jit': TracingInterpreter,
+    'c': CCompiler,
+}
+engine = Interpreter  # backend measured in the interpret stage
+
+
+def machine() -> dict:
+    """
+    Describes where the timings were measured, as a baseline is only comparable on the same machine.
+    """
+    return {'node': platform.node(), 'processor': platform.machine(), 'python': platform.python_version()}
+
+
+def interpret(ast):
+    with contextlib.redirect_stdout(io.StringIO()):
+        ast.accept(engine())
+
+
+def measure(function, argument, repeat: int):
+    """
+    Returns the result, the best time out of repeat runs and the peak memory, measured in a separate run.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(argument)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    function(argument)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def run_benchmark(text: str, repeat: int) -> dict:
+    tokens, seconds, peak = measure(tokenize, text, repeat)
+    results = {'tokenize': {'seconds': seconds, 'throughput': len(tokens) / seconds, 'unit': 'tokens/s', 'peak': peak}}
+
+    ast, seconds, peak = measure(parse, tokens, repeat)
+    nodes = count_nodes(ast)
+    results['parse'] = {'seconds': seconds, 'throughput': nodes / seconds, 'unit': 'nodes/s', 'peak': peak}
+
+    _, seconds, peak = measure(analyze, ast, repeat)
+    results['analyze'] = {'seconds': seconds, 'throughput': nodes / seconds, 'unit': 'nodes/s', 'peak': peak}
+
+    counting_interpreter = CountingInterpreter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        ast.accept(counting_interpreter)
+    _, seconds, peak = measure(interpret, ast, repeat)
+    results['interpret'] = {'seconds': seconds, 'throughput': counting_interpreter.operations / seconds,
+                            'unit': 'ops/s', 'peak': peak}
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Returns the (benchmark, stage, ratio) of the stages slower than the baseline by more than the tolerance.
+    """
+    regressions = []
+    for name, stages in results.items():
+        for stage, result in stages.items():
+            base = baseline.get(name, {}).get(stage)
+            if base is None:
+                continue
+            ratio = result['seconds'] / base['seconds']
+            result['baseline_ratio'] = ratio
+            if ratio > 1 + tolerance:
+                regressions.append((name, stage, ratio))
+    return regressions
+
+
+def report(results: dict):
+    print(f"{'benchmark':<16}{'stage':<11}{'time [ms]':>11}{'throughput':>14} {'unit':<9}{'peak [KiB]':>11}"
+          f"{'vs baseline':>13}")
+    for name, stages in results.items():
+        for stage, result in stages.items():
+            ratio = f"{result['baseline_ratio']:.2f}x" if 'baseline_ratio' in result else ""
+            print(f"{name:<16}{stage:<11}{result['seconds'] * 1000:>11.2f}{result['throughput']:>14.0f} "
+                  f"{result['unit']:<9}{result['peak'] / 1024:>11.0f}{ratio:>13}")
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description="Benchmarks of the compiler stages")
+    argument_parser.add_argument('--scale', type=float, default=1.0, help="multiplier of the size of the programs")
+    argument_parser.add_argument('--repeat', type=int, default=3, help="runs per stage, the best time is reported")
+    argument_parser.add_argument('--only', nargs='+', choices=GENERATORS.keys(), help="benchmarks to run")
+    argument_parser.add_argument('--engine', choices=ENGINES.keys(), default='interpreter',
+                                 help="execution backend measured in the interpret stage")
+    argument_parser.add_argument('--save', help="file to store the results in as a baseline")
+    argument_parser.add_argument('--baseline', help="baseline file to compare the results with")
+    argument_parser.add_argument('--tolerance', type=float, default=0.2,
+                                 help="allowed relative slowdown against the baseline")
+    args = argument_parser.parse_args()
+    warnings.simplefilter('ignore')  # warnings of the semantic analysis about the generated programs
+    engine = ENGINES[args.engine]
+    if args.baseline and not os.path.exists(args.baseline):
+        sys.exit(f"No baseline in {args.baseline}: measure one on this machine with --save")
+
+    results = {}
+    for name in args.only or GENERATORS:
+        generator, size = GENERATORS[name]
+        results[name] = run_benchmark(generator(max(1, int(size * args.scale))), args.repeat)
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump({'scale': args.scale, 'engine': args.engine, 'machine': machine(), 'benchmarks': results}, file,
+                      indent=2)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)
+        if baseline['scale'] != args.scale:
+            sys.exit(f"The baseline was measured at scale {baseline['scale']}, not {args.scale}")
+        if baseline.get('engine', 'interpreter') != args.engine:
+            sys.exit(f"The baseline was measured with the {baseline.get('engine', 'interpreter')} engine")
+        if baseline.get('machine') != machine():
+            sys.exit(f"The baseline was measured on {baseline.get('machine')}, not {machine()}: "
+                     f"save a new one with --save")
+        regressions = compare(results, baseline['benchmarks'], args.tolerance)
+    report(results)
+
+    for name, stage, ratio in regressions:
+        print(f"Regression: {name} {stage} is {ratio:.2f}x slower than the baseline")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,61 @@
+"""
+Benchmark of the register machine against the tree-walking Interpreter on the example programs of the tests,
+reporting the best of repeat runs of each engine, with the output discarded. The vm column includes the
+compilation to bytecode, the run column only the dispatch loop.
+
+    python benchmarks/vm.py
+    python benchmarks/vm.py --disassemble pi
+"""
+import os
+import sys
+import io
+import time
+import argparse
+import contextlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from Scanner import Scanner
+from Parser import Parser
+from interpreter.Interpreter import Interpreter
+from interpreter.RegisterMachine import RegisterMachine, BytecodeCompiler
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests', 'test_data', 'interpreter_example')
+
+
+def best(function, repeat: int) -> float:
+    """
+    Returns the best time of function out of repeat calls.
+    """
+    seconds = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            function()
+        seconds = min(seconds, time.perf_counter() - start)
+    return seconds
+
+
+if __name__ == '__main__':
+    programs = sorted(name[:-len('.txt')] for name in os.listdir(EXAMPLES) if name.endswith('.txt'))
+    argument_parser = argparse.ArgumentParser(description="Benchmark of the register machine against the Interpreter")
+    argument_parser.add_argument('--repeat', type=int, default=3, help="runs of each engine, the best one is reported")
+    argument_parser.add_argument('--only', nargs='+', choices=programs, help="programs to run")
+    argument_parser.add_argument('--disassemble', choices=programs, help="print the bytecode of the program")
+    args = argument_parser.parse_args()
+
+    if args.disassemble:
+        with open(os.path.join(EXAMPLES, args.disassemble + '.txt')) as file:
+            print(BytecodeCompiler().compile_program(Parser().parse(Scanner().tokenize(file.read()))).disassemble())
+        sys.exit(0)
+
+    print(f"{'program':<12}{'instructions':>14}{'interpreter [ms]':>18}{'vm [ms]':>10}{'run [ms]':>10}{'speedup':>10}")
+    for name in args.only or programs:
+        with open(os.path.join(EXAMPLES, name + '.txt')) as file:
+            ast = Parser().parse(Scanner().tokenize(file.read()))
+        bytecode = BytecodeCompiler().compile_program(ast)
+        interpreter = best(lambda: ast.accept(Interpreter()), args.repeat)
+        vm = best(lambda: ast.accept(RegisterMachine()), args.repeat)
+        run = best(lambda: RegisterMachine().run(bytecode), args.repeat)
+        print(f"{name:<12}{len(bytecode):>14}{interpreter * 1000:>18.2f}{vm * 1000:>10.2f}{run * 1000:>10.2f}"
+              f"{interpreter / vm:>9.1f}x")
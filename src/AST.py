@@ -1,92 +1,116 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, fields as dataclass_fields
 import warnings
 
 
 class Node(object):
     """
     Base class for all AST nodes.
+
+    Nodes are slotted, without a per-instance dictionary: _fields names the attributes holding
+    the contents of a node, in order, which replaces vars(node) in generic traversals.
     """
+    __slots__ = ()
+    _fields = ()
+
     def accept(self, visitor):
         return visitor.visit(self)
 
 
-@dataclass
+def fields(node: Node) -> list:
+    """
+    Returns the (name, value) pairs of the contents of the node.
+    """
+    return [(name, getattr(node, name)) for name in node._fields]
+
+
+def argument(position: int) -> property:
+    """
+    Named field of an instruction, stored only in its arguments.
+    """
+    def get(self):
+        return self.args[position]
+
+    def set(self, value):
+        self.args = self.args[:position] + (value,) + self.args[position + 1:]
+
+    return property(get, set)
+
+
+@dataclass(slots=True)
 class Program(Node):
     instructions: list
 
 
-@dataclass
+@dataclass(slots=True)
 class Block(Program):
-    instructions: list
+    pass
 
 
 class Instruction(Node):
+    __slots__ = ('instruction', 'args')
+    _fields = ('instruction', 'args')
+
     def __init__(self, instruction, *args):
         self.instruction = instruction
         self.args = args
 
 
 class FunctionalInstruction(Instruction):
-    def __init__(self, instruction, *args):
-        super().__init__(instruction, *args)
-
+    __slots__ = ()
 
 
 class WhileInstruction(Instruction):
-    def __init__(self, instruction, *args):
-        super().__init__(instruction, *args)
-        self.condition = args[0]
-        self.body = args[1]
+    __slots__ = ()
+    condition = argument(0)
+    body = argument(1)
 
 
 class ForLoopInstruction(Instruction):
-    def __init__(self, instruction, *args):
-        super().__init__(instruction, *args)
-        self.id = args[0]
-        self.range = args[1]
-        self.body = args[2]
+    __slots__ = ()
+    id = argument(0)
+    range = argument(1)
+    body = argument(2)
 
 
-@dataclass
+@dataclass(slots=True)
 class Range(Node):
     start: int
     end: int
 
 
 class FlowControlInstruction(Instruction):
-    def __init__(self, instruction, *args):
-        super().__init__(instruction, *args)
+    __slots__ = ()
 
 
-@dataclass
+@dataclass(slots=True)
 class Ifstatement(Node):
     condition: Node
     instruction: Node
     elsepart: Node
 
 
-@dataclass
+@dataclass(slots=True)
 class Assignment(Node):
     op: str
     id: Variable | Reference
     expr: Node
 
 
-@dataclass
+@dataclass(slots=True)
 class BinaryOperation(Node):
     op: str
     left: Node
     right: Node
 
 
-@dataclass
+@dataclass(slots=True)
 class UnaryOperation(Node):
     op: str
     operand: Node
 
 
-@dataclass
+@dataclass(slots=True)
 class Vector(Node):
     elements: list
 
@@ -133,26 +157,24 @@ class Vector(Node):
         return self.elements[index]
 
 
-@dataclass
+@dataclass(slots=True)
 class Reference(Node):
     id: Variable
     index: Vector
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Variable(Node):
     name: str
 
 
-@dataclass
 class Numeric(Node):
-    value: int | float
-
-    def __int__(self):
-        return int(self.value)
-
-    def __float__(self):
-        return float(self.value)
+    """
+    Numeric literal, which is also the int or float it holds, so the value is not stored twice.
+    Subclasses give it back as a plain int or float through their value property.
+    """
+    __slots__ = ()
+    _fields = ('value',)
 
     def __eq__(self, other):
         if isinstance(other, Numeric):
@@ -162,20 +184,35 @@ class Numeric(Node):
     def __hash__(self):
         return hash(self.value)
 
+    def __repr__(self):
+        return f"{self.__class__.__name__}(value={self.value!r})"
+
 
 class Integer(Numeric, int):
-    def __init__(self, value):
-        super().__init__(int(value))
+    __slots__ = ()
+
+    @property
+    def value(self) -> int:
+        return int(self)
+
 
 class Float(Numeric, float):
-    def __init__(self, value):
-        super().__init__(float(value))
+    __slots__ = ()
+
+    @property
+    def value(self) -> float:
+        return float(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class String(Node):
     value: str
 
 
 class Error(Node):
-    pass
+    __slots__ = ()
+
+
+for _node_class in (Program, Block, Range, Ifstatement, Assignment, BinaryOperation, UnaryOperation, Vector,
+                    Reference, Variable, String):
+    _node_class._fields = tuple(field.name for field in dataclass_fields(_node_class))
@@ -0,0 +1,48 @@
+import os
+import sys
+import marshal
+import hashlib
+from FlatAST import FlatTree, FORMAT_VERSION
+from Parser import Parser
+
+
+class ASTCache:
+    """
+    Directory of parsed and analyzed programs, so that running an unchanged script again skips the scanner
+    and the parser: the AST is stored as a serialized FlatTree, with the warnings of its semantic analysis.
+
+    An entry is keyed by the hash of the source, the grammar hash of the parser, the format version of the tree
+    and the Python implementation, so any change of them misses the cache instead of loading a stale tree.
+    Entries that cannot be read or decoded are ignored, as the cache is optional.
+    """
+    suffix = '.ast'
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.version = repr((Parser._grammar_hash(), FORMAT_VERSION, sys.implementation.cache_tag)).encode()
+
+    def path(self, source: str) -> str:
+        key = hashlib.sha256(self.version + b'\0' + source.encode()).hexdigest()
+        return os.path.join(self.directory, key + self.suffix)
+
+    def load(self, source: str) -> tuple[FlatTree, list] | None:
+        """
+        Returns the tree and the warning messages stored for the source, None if it is not cached.
+        """
+        try:
+            with open(self.path(source), 'rb') as f:
+                messages, data = marshal.load(f)
+            return FlatTree.from_bytes(data), messages
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+    def store(self, source: str, tree: FlatTree, messages: list):
+        path = self.path(source)
+        temporary = f"{path}.{os.getpid()}"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temporary, 'wb') as f:
+                marshal.dump((list(messages), tree.to_bytes()), f)
+            os.replace(temporary, path)  # concurrent runs never read a partial entry
+        except OSError:
+            pass
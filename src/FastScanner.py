@@ -0,0 +1,176 @@
+import sys
+from sly.lex import Token, LexError
+from Scanner import Scanner, StreamTokenizer
+
+
+KEYWORDS = {keyword.lower(): keyword for keyword in Scanner.KEYWORDS}
+
+# character classes dispatched on by the scanner
+SPACE, NEWLINE, COMMENT, LETTER, DIGIT, DOT, QUOTE, OPERATOR, LITERAL = range(9)
+
+CHARACTER_CLASSES = {' ': SPACE, '\t': SPACE, '\n': NEWLINE, '#': COMMENT, '.': DOT, '"': QUOTE, "'": QUOTE}
+CHARACTER_CLASSES.update((c, LETTER) for c in 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_')
+CHARACTER_CLASSES.update((c, DIGIT) for c in '0123456789')
+CHARACTER_CLASSES.update((c, OPERATOR) for c in '=<>!+-*/')
+CHARACTER_CLASSES.update((c, LITERAL) for c in '()[]{},;:')
+
+IDENTIFIER_CHARACTERS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_0123456789')
+DIGITS = frozenset('0123456789')
+
+# operator -> (token type, token type when followed by '=')
+OPERATORS = {
+    '=': ('ASSIGN', 'EQ'),
+    '<': ('LT', 'LE'),
+    '>': ('GT', 'GE'),
+    '!': (None, 'NE'),
+    '+': ('+', 'ADD'),
+    '-': ('-', 'SUBTRACT'),
+    '*': ('*', 'MULTIPLY_BY'),
+    '/': ('/', 'DIVIDE_BY'),
+}
+MATRIX_OPERATORS = {'+': 'MATRIX_PLUS', '-': 'MATRIX_MINUS', '*': 'MATRIX_MUL', '/': 'MATRIX_DIV'}
+LITERALS = {':': 'RANGE'}  # other literals are their own token type
+
+
+class FastScanner(StreamTokenizer):
+    """
+    Hand-written scanner producing the same token stream as Scanner, including the types, values, line numbers,
+    positions and lexing errors, without the regular expression alternation of sly.Lexer.
+
+    The first character of a token selects its class, after which the token is consumed in a single pass;
+    identifiers are remapped to keywords with a dictionary.
+    """
+    tokens = Scanner.tokens
+
+    def __init__(self):
+        self.lineno = 0
+        self.text = None
+        self.index = 0
+
+    def tokenize(self, text: str, lineno: int = 1, index: int = 0):
+        self.text = text
+        length = len(text)
+        character_classes = CHARACTER_CLASSES
+        try:
+            while index < length:
+                c = text[index]
+                character_class = character_classes.get(c)
+                start = index
+
+                if character_class == SPACE:
+                    index += 1
+                    continue
+                elif character_class == NEWLINE:
+                    lineno += 1
+                    index += 1
+                    continue
+                elif character_class == COMMENT:
+                    index = text.find('\n', index)
+                    if index < 0:
+                        index = length
+                    continue
+                elif character_class == LETTER:
+                    index += 1
+                    while index < length and text[index] in IDENTIFIER_CHARACTERS:
+                        index += 1
+                    value = sys.intern(text[start:index])
+                    type_ = KEYWORDS.get(value, 'ID')
+                elif character_class == DIGIT:
+                    index += 1
+                    while index < length and text[index] in DIGITS:
+                        index += 1
+                    if index < length and text[index] == '.':
+                        index = self._fraction(text, index + 1)
+                        type_ = 'FLOAT'
+                    else:
+                        type_ = 'INTEGER'
+                    value = text[start:index]
+                elif character_class == OPERATOR:
+                    index += 1
+                    simple, compound = OPERATORS[c]
+                    if index < length and text[index] == '=':
+                        index += 1
+                        type_ = compound
+                    elif simple is None:
+                        self._error(text, start)
+                    else:
+                        type_ = simple
+                    value = text[start:index]
+                elif character_class == LITERAL:
+                    index += 1
+                    value = c
+                    type_ = LITERALS.get(c, c)
+                elif character_class == DOT:
+                    following = text[index + 1:index + 2]
+                    if following in MATRIX_OPERATORS:
+                        index += 2
+                        type_ = MATRIX_OPERATORS[following]
+                    elif following in DIGITS:
+                        index = self._fraction(text, index + 1)
+                        type_ = 'FLOAT'
+                    else:
+                        self._error(text, start)
+                    value = text[start:index]
+                elif character_class == QUOTE:
+                    # a string ends with the same quote on the same line; otherwise ' is the transpose
+                    closing = text.find(c, index + 1)
+                    newline = text.find('\n', index + 1, closing)
+                    if closing >= 0 and newline < 0:
+                        index = closing + 1
+                        type_ = 'STRING'
+                    elif c == "'":
+                        index += 1
+                        type_ = 'TRANSPOSE'
+                    else:
+                        self._error(text, start)
+                    value = text[start:index]
+                else:
+                    self._error(text, start)
+
+                token = Token()
+                token.type = type_
+                token.value = value
+                token.lineno = lineno
+                token.index = start
+                token.end = index
+                yield token
+        finally:
+            self.index = index
+            self.lineno = lineno
+
+    @staticmethod
+    def _fraction(text: str, index: int) -> int:
+        """
+        Returns the end of a float whose digits after the dot start at the index, with the optional exponent.
+        """
+        length = len(text)
+        while index < length and text[index] in DIGITS:
+            index += 1
+        if index < length and text[index] in 'eE':
+            exponent = index + 1
+            if exponent < length and text[exponent] in '+-':
+                exponent += 1
+            if exponent < length and text[exponent] in DIGITS:
+                index = exponent + 1
+                while index < length and text[index] in DIGITS:
+                    index += 1
+        return index
+
+    def _error(self, text: str, index: int):
+        self.index = index
+        raise LexError(f'Illegal character {text[index]!r} at index {index}', text[index:], index)
+
+
+if __name__ == '__main__':
+
+    try:
+        filename = sys.argv[1] if len(sys.argv) > 1 else "./scanner_example/example.txt"
+        file = open(filename, "r")
+    except IOError:
+        print("Cannot open {0} file".format(filename))
+        sys.exit(0)
+
+    lexer = FastScanner()
+
+    for tok in lexer.tokenize_stream(file):
+        print(tok)
@@ -0,0 +1,261 @@
+import sys
+import struct
+import marshal
+from array import array
+import AST
+
+
+# kind code of a node -> class of the node it encodes
+KINDS = (
+    AST.Program, AST.Block, AST.FunctionalInstruction, AST.WhileInstruction, AST.ForLoopInstruction, AST.Range,
+    AST.FlowControlInstruction, AST.Ifstatement, AST.Assignment, AST.BinaryOperation, AST.UnaryOperation,
+    AST.Vector, AST.Reference, AST.Variable, AST.Integer, AST.Float, AST.String, AST.Error,
+)
+(PROGRAM, BLOCK, FUNCTIONAL, WHILE, FOR, RANGE, FLOW_CONTROL, IF, ASSIGNMENT, BINARY, UNARY,
+ VECTOR, REFERENCE, VARIABLE, INTEGER, FLOAT, STRING, ERROR) = range(len(KINDS))
+
+LIST_KINDS = {PROGRAM, BLOCK, VECTOR}  # nodes holding a list of their children
+OPERATOR_KINDS = {FUNCTIONAL, WHILE, FOR, FLOW_CONTROL, ASSIGNMENT, BINARY, UNARY}  # nodes with an op code
+LITERAL_KINDS = {VARIABLE, INTEGER, FLOAT, STRING}  # nodes holding a value of the literal pool
+
+NONE = -1  # child standing for a missing node, like the else part of an if statement
+
+COLUMNS = ('kinds', 'ops', 'first', 'counts', 'literals', 'children')
+
+# serialized tree: magic, format version, little endian flag, root, size of the marshalled operators and pool,
+# length of each column; then the raw columns and the marshalled operators and pool
+MAGIC = b'FAST'
+FORMAT_VERSION = 1
+HEADER = struct.Struct(f'<4sH?iI{len(COLUMNS)}I')
+
+
+class FlatTree:
+    """
+    AST encoded as a structure of arrays, one entry per node in each column, instead of one object per node:
+
+    - kinds: kind code of the node, an index in KINDS,
+    - ops: op code of the node, an index in operators (the operator or instruction name), 0 if it has none,
+    - first, counts: start and length of the node's children in the children array,
+    - literals: index in the pool of the name or value of a variable or literal, NONE otherwise.
+
+    Nodes are indexed in the order they are added, children before their parent, so the root is the last node.
+    Operators and pool values are interned, a variable referenced a thousand times stores its name once.
+
+    The methods named after the AST classes take the arguments of their constructors, with node indices
+    in place of nodes, and return the index of the added node; the parser emits the tree through them.
+    Nodes are materialized as AST objects on demand by node(), which keeps them, so the materialized
+    subtrees can be analyzed or printed like a parsed AST.
+    """
+    def __init__(self):
+        self.kinds = array('B')
+        self.ops = array('H')
+        self.first = array('i')
+        self.counts = array('i')
+        self.literals = array('i')
+        self.children = array('i')
+        self.operators = [None]
+        self.pool = []
+        self.root = NONE
+        self._operator_codes = {None: 0}
+        self._pool_indices = {str: {}, int: {}, float: {}}  # per type, 1 and 1.0 are distinct literals
+        self._nodes = {}  # index -> materialized node
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def _add(self, kind: int, op=None, children=(), literal: int = NONE) -> int:
+        code = self._operator_codes.get(op)
+        if code is None:
+            code = self._operator_codes[op] = len(self.operators)
+            self.operators.append(op)
+        index = len(self.kinds)
+        self.kinds.append(kind)
+        self.ops.append(code)
+        self.first.append(len(self.children))
+        self.counts.append(len(children))
+        self.literals.append(literal)
+        self.children.extend(NONE if child is None else child for child in children)
+        return index
+
+    def _intern(self, value) -> int:
+        indices = self._pool_indices[type(value)]
+        index = indices.get(value)
+        if index is None:
+            index = indices[value] = len(self.pool)
+            self.pool.append(value)
+        return index
+
+    def Program(self, instructions: list) -> int:
+        self.root = self._add(PROGRAM, children=instructions)
+        return self.root
+
+    def Block(self, instructions: list) -> int:
+        return self._add(BLOCK, children=instructions)
+
+    def FunctionalInstruction(self, instruction: str, *args) -> int:
+        return self._add(FUNCTIONAL, instruction, args)
+
+    def WhileInstruction(self, instruction: str, condition: int, body: int) -> int:
+        return self._add(WHILE, instruction, (condition, body))
+
+    def ForLoopInstruction(self, instruction: str, id: int, range: int, body: int) -> int:
+        return self._add(FOR, instruction, (id, range, body))
+
+    def Range(self, start: int, end: int) -> int:
+        return self._add(RANGE, children=(start, end))
+
+    def FlowControlInstruction(self, instruction: str, *args) -> int:
+        return self._add(FLOW_CONTROL, instruction, args)
+
+    def Ifstatement(self, condition: int, instruction: int, elsepart: int | None) -> int:
+        return self._add(IF, children=(condition, instruction, elsepart))
+
+    def Assignment(self, op: str, id: int, expr: int) -> int:
+        return self._add(ASSIGNMENT, op, (id, expr))
+
+    def BinaryOperation(self, op: str, left: int, right: int) -> int:
+        return self._add(BINARY, op, (left, right))
+
+    def UnaryOperation(self, op: str, operand: int) -> int:
+        return self._add(UNARY, op, (operand,))
+
+    def Vector(self, elements: list) -> int:
+        return self._add(VECTOR, children=elements)
+
+    def Reference(self, id: int, index: int) -> int:
+        return self._add(REFERENCE, children=(id, index))
+
+    def Variable(self, name: str) -> int:
+        return self._add(VARIABLE, literal=self._intern(name))
+
+    def Integer(self, value) -> int:
+        return self._add(INTEGER, literal=self._intern(int(value)))
+
+    def Float(self, value) -> int:
+        return self._add(FLOAT, literal=self._intern(float(value)))
+
+    def String(self, value: str) -> int:
+        return self._add(STRING, literal=self._intern(value))
+
+    def Error(self) -> int:
+        return self._add(ERROR)
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the tree in the binary format read by from_bytes.
+        """
+        columns = [getattr(self, name) for name in COLUMNS]
+        values = marshal.dumps((self.operators, self.pool))
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, sys.byteorder == 'little', self.root, len(values),
+                             *(len(column) for column in columns))
+        return b''.join([header, *(column.tobytes() for column in columns), values])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'FlatTree':
+        """
+        Loads a tree serialized by to_bytes, raising ValueError if the data is not a tree of this format.
+        The columns are copied as they are, so loading takes time proportional to the size of the data.
+        """
+        try:
+            magic, version, little_endian, root, values_size, *lengths = HEADER.unpack_from(data)
+        except struct.error:
+            raise ValueError("truncated tree header") from None
+        if magic != MAGIC or version != FORMAT_VERSION or little_endian != (sys.byteorder == 'little'):
+            raise ValueError("not a tree of this format")
+        tree = cls()
+        data = memoryview(data)
+        offset = HEADER.size
+        for name, length in zip(COLUMNS, lengths):
+            column = getattr(tree, name)
+            end = offset + length * column.itemsize
+            column.frombytes(data[offset:end])
+            offset = end
+        if offset + values_size != len(data):
+            raise ValueError("tree size does not match its header")
+        tree.operators, tree.pool = marshal.loads(data[offset:])
+        tree.root = root
+        tree._operator_codes = {op: code for code, op in enumerate(tree.operators)}
+        for index, value in enumerate(tree.pool):
+            tree._pool_indices[type(value)][value] = index
+        return tree
+
+    def child_indices(self, index: int) -> array:
+        start = self.first[index]
+        return self.children[start:start + self.counts[index]]
+
+    @classmethod
+    def from_ast(cls, root: AST.Node) -> 'FlatTree':
+        """
+        Encodes an AST, e.g. one rewritten by the optimizer after parsing.
+        """
+        tree = cls()
+        indices = {}  # id(node) -> index
+
+        def encode(value):
+            if isinstance(value, list):
+                return [encode(element) for element in value]
+            return indices[id(value)] if isinstance(value, AST.Node) else value
+
+        stack = [(root, False)]
+        while stack:
+            node, children_added = stack.pop()
+            if id(node) in indices:
+                continue
+            arguments = constructor_arguments(node)
+            if children_added:
+                indices[id(node)] = getattr(tree, type(node).__name__)(*(encode(value) for value in arguments))
+                continue
+            stack.append((node, True))
+            for value in reversed(arguments):
+                for child in (value if isinstance(value, list) else [value]):
+                    if isinstance(child, AST.Node):
+                        stack.append((child, False))
+        tree.root = indices[id(root)]
+        return tree
+
+    def node(self, index: int) -> AST.Node:
+        """
+        Returns the AST node of the index, materializing it and the nodes below it on the first request.
+        """
+        nodes = self._nodes
+        stack = [(index, False)]
+        while stack:
+            current, children_added = stack.pop()
+            if current in nodes:
+                continue
+            children = self.child_indices(current)
+            if not children_added:
+                stack.append((current, True))
+                stack.extend((child, False) for child in children if child != NONE)
+                continue
+            kind = self.kinds[current]
+            node_class = KINDS[kind]
+            values = [None if child == NONE else nodes[child] for child in children]
+            if kind in LIST_KINDS:
+                nodes[current] = node_class(values)
+            elif kind in OPERATOR_KINDS:
+                nodes[current] = node_class(self.operators[self.ops[current]], *values)
+            elif kind in LITERAL_KINDS:
+                nodes[current] = node_class(self.pool[self.literals[current]])
+            else:
+                nodes[current] = node_class(*values)
+        return nodes[index]
+
+    def view(self) -> AST.Node:
+        """
+        Returns the root of the tree as an AST node.
+        """
+        return self.node(self.root)
+
+
+def constructor_arguments(node: AST.Node) -> list:
+    """
+    Returns the arguments the node was constructed with, a tuple field holding variadic arguments.
+    """
+    arguments = []
+    for name, value in AST.fields(node):
+        if isinstance(value, tuple):
+            arguments.extend(value)
+        else:
+            arguments.append(value)
+    return arguments
@@ -0,0 +1,209 @@
+from dataclasses import dataclass
+from sly.lex import LexError
+from Scanner import Scanner
+from Parser import Parser
+import AST
+
+
+@dataclass
+class Segment:
+    """
+    Top-level statement of the program together with its position in the source text.
+    """
+    start: int  # index of the first character of the first token
+    end: int  # index after the last character of the last token
+    lineno: int
+    instruction: AST.Node
+    error: str | None = None
+    error_position: tuple | None = None  # (start, lineno) the error message was produced at
+
+
+class IncrementalParser:
+    """
+    Parser for editor integrations, which keeps the program split into top-level segments, one per statement.
+
+    A segment ends with a ';' or '}' outside of any block, unless an 'else' follows.
+    After a text edit only the segments around the edit are re-tokenized and re-parsed; the tokenizer continues
+    until it reaches a boundary that existed before the edit, from where the old segments and their subtrees are reused.
+    The instructions of the program are updated in place and syntax errors are confined to their segment,
+    which then holds a single AST.Error node.
+
+    Positions of the segments after an edit are shifted lazily: the segments from index shift_from onwards
+    are stored without the pending shift, which is applied only as far as the next edit needs it,
+    so edits close to each other cost the same regardless of the length of the text.
+    """
+
+    def __init__(self, text: str = ""):
+        self.scanner = Scanner()
+        self.parser = Parser()
+        self.text = text
+        self.segments = []
+        self.shift_from = 0
+        self.shift = 0
+        self.line_shift = 0
+        self.segments, _ = self._reparse(0, 1, 0, 0)
+        self.shift_from = len(self.segments)
+        self.program = AST.Program([segment.instruction for segment in self.segments])
+
+    @property
+    def errors(self) -> list:
+        self._settle(len(self.segments))
+        for i, segment in enumerate(self.segments):
+            if segment.error is not None and segment.error_position != (segment.start, segment.lineno):
+                self.segments[i] = self._refresh(segment)  # the message refers to the old position
+                self.program.instructions[i] = self.segments[i].instruction
+        return [(segment.lineno, segment.error) for segment in self.segments if segment.error is not None]
+
+    def edit(self, start: int, end: int, new_text: str) -> AST.Program:
+        """
+        Replaces text[start:end] with new_text and updates the program.
+        """
+        delta = len(new_text) - (end - start)
+        line_delta = new_text.count('\n') - self.text.count('\n', start, end)
+        self.text = self.text[:start] + new_text + self.text[end:]
+
+        first = self._find(start, 0)
+        if first > 0:
+            # re-parsing starts at the boundary after the preceding segment, or at its start if an 'else' follows
+            self._settle(first)
+            previous = self.segments[first - 1]
+            position = previous.end
+            lineno = previous.lineno + self.text.count('\n', previous.start, previous.end)
+            if self._next_token_type(position, lineno) == 'ELSE':
+                first, position, lineno = first - 1, previous.start, previous.lineno
+        else:
+            position, lineno = 0, 1
+
+        new_segments, replaced = self._reparse(position, lineno, start + len(new_text), delta, first)
+        self._settle(first + replaced)
+        self.segments[first:first + replaced] = new_segments
+        self.program.instructions[first:first + replaced] = [segment.instruction for segment in new_segments]
+
+        # the reused segments move by the length of the edit, eagerly up to the pending shift
+        self.shift_from += len(new_segments) - replaced
+        if self.shift == self.line_shift == 0:
+            self.shift_from = first + len(new_segments)
+        for segment in self.segments[first + len(new_segments):self.shift_from]:
+            self._move(segment, delta, line_delta)
+        self.shift += delta
+        self.line_shift += line_delta
+        self._settle(self.shift_from)
+        return self.program
+
+    @staticmethod
+    def _move(segment: Segment, delta: int, line_delta: int):
+        segment.start += delta
+        segment.end += delta
+        segment.lineno += line_delta
+
+    def _settle(self, index: int):
+        """
+        Applies the pending shift to the segments before the index.
+        """
+        for segment in self.segments[self.shift_from:index]:
+            self._move(segment, self.shift, self.line_shift)
+        self.shift_from = max(self.shift_from, index)
+        if self.shift_from >= len(self.segments):
+            self.shift = self.line_shift = 0
+
+    def _end(self, i: int) -> int:
+        return self.segments[i].end + (self.shift if i >= self.shift_from else 0)
+
+    def _find(self, position: int, low: int) -> int:
+        """
+        Returns the index of the first segment, not before low, ending at or after the position.
+        """
+        high = len(self.segments)
+        while low < high:
+            middle = (low + high) // 2
+            if self._end(middle) < position:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _reparse(self, position, lineno, edit_end, delta, first=0):
+        """
+        Parses segments from the position until the first boundary after edit_end that was also a boundary
+        before the edit. Returns the new segments and the number of old segments from first they replace.
+        """
+        new_segments = []
+        try:
+            for tokens in self._split(self.scanner.tokenize(self.text, lineno, position)):
+                new_segments.append(self._parse_segment(tokens))
+                end = tokens[-1].end
+                if end < edit_end:
+                    continue
+
+                reused = self._find(end - delta, first)
+                if reused < len(self.segments) and self._end(reused) == end - delta:
+                    return new_segments, reused + 1 - first
+        except LexError as e:
+            # the rest of the text is a single erroneous segment
+            start = new_segments[-1].end if new_segments else position
+            lineno += self.text.count('\n', position, start)
+            new_segments.append(Segment(start, len(self.text), lineno, AST.Error(), str(e), (start, lineno)))
+        return new_segments, len(self.segments) - first
+
+    def _next_token_type(self, position, lineno):
+        try:
+            token = next(self.scanner.tokenize(self.text, lineno, position), None)
+        except LexError:
+            return None
+        return token.type if token is not None else None
+
+    @staticmethod
+    def _split(tokens):
+        """
+        Groups the tokens into top-level segments.
+        """
+        segment = []
+        depth = 0
+        boundary = False
+        tokens = iter(tokens)
+        while True:
+            try:
+                token = next(tokens, None)
+            except LexError:
+                if boundary:  # the completed segment does not depend on the illegal character
+                    yield segment
+                raise
+            if token is None:
+                break
+            if boundary and token.type != 'ELSE':
+                yield segment
+                segment = []
+            segment.append(token)
+            if token.type == '{':
+                depth += 1
+            elif token.type == '}':
+                depth -= 1
+            boundary = depth == 0 and token.type in (';', '}')
+        if segment:
+            yield segment
+
+    def _refresh(self, segment: Segment) -> Segment:
+        """
+        Parses a segment again in place.
+        """
+        tokens = []
+        try:
+            for token in self.scanner.tokenize(self.text, segment.lineno, segment.start):
+                if token.index >= segment.end:
+                    break
+                tokens.append(token)
+        except LexError as e:
+            if e.error_index >= segment.end:  # the illegal character follows the segment
+                return self._parse_segment(tokens)
+            position = (segment.start, segment.lineno)
+            return Segment(segment.start, segment.end, segment.lineno, AST.Error(), str(e), position)
+        return self._parse_segment(tokens)
+
+    def _parse_segment(self, tokens) -> Segment:
+        start, end, lineno = tokens[0].index, tokens[-1].end, tokens[0].lineno
+        try:
+            program = self.parser.parse(iter(tokens))
+        except Exception as e:
+            return Segment(start, end, lineno, AST.Error(), str(e), (start, lineno))
+        # a segment holds exactly one statement, as every statement ends with ';' or '}'
+        return Segment(start, end, lineno, program.instructions[0])
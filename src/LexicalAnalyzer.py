@@ -2,6 +2,162 @@ from typing import Optional
 import warnings
 import AST
 from SymbolTable import SymbolTable, VectorType, VariableSymbol, TYPE
+from interpreter.visit import trampoline
+
+
+FUNCTION_ARGUMENT_TYPES = {
+	'eye': [AST.Integer, Optional[AST.Integer]],
+	'zeros': [AST.Integer, Optional[AST.Integer]],
+	'ones': [AST.Integer, Optional[AST.Integer]],
+	'print': ['*'],
+}
+
+
+def dimension(argument: AST.Node) -> int | None:
+	"""
+	Returns the length of a dimension given by an argument, None if it is only known at runtime.
+	"""
+	return int(argument) if isinstance(argument, AST.Integer) else None
+
+
+def matrix_type(x: AST.Node, y: AST.Node | None = None) -> VectorType:
+	"""
+	Returns the type of zeros(x, y) and ones(x, y), which like at runtime have y rows and x columns.
+	"""
+	return VectorType(shape=(dimension(y if y is not None else x), dimension(x)))
+
+
+FUNCTION_RETURN_TYPES = {
+	'eye': lambda n, *_: matrix_type(n),  # eye(n) is square, further arguments are ignored
+	'zeros': matrix_type,
+	'ones': matrix_type,
+	'print': lambda *args: None,
+}
+
+TRANSLATION_TABLE = {
+	'+=': '+',
+	'-=': '-',
+	'*=': '*',
+	'/=': '/',
+}
+
+MATRIX_OPERATIONS = {
+	('.+', VectorType, VectorType): VectorType,
+	('.-', VectorType, VectorType): VectorType,
+	('.*', VectorType, VectorType): VectorType,
+	('./', VectorType, VectorType): VectorType,
+	('+', VectorType, VectorType): VectorType,
+	('-', VectorType, VectorType): VectorType,
+	('*', VectorType, VectorType): VectorType,
+}
+ALLOWED_OPERATIONS = {
+	('==', AST.Numeric, AST.Numeric): bool,
+	('<=', AST.Numeric, AST.Numeric): bool,
+	('<', AST.Numeric, AST.Numeric): bool,
+	('>=', AST.Numeric, AST.Numeric): bool,
+	('>', AST.Numeric, AST.Numeric): bool,
+	('!=', AST.Numeric, AST.Numeric): bool,
+	('+', AST.Numeric, AST.Numeric): AST.Numeric,
+	('-', AST.Numeric, AST.Numeric): AST.Numeric,
+	('*', AST.Numeric, AST.Numeric): AST.Numeric,
+	('/', AST.Numeric, AST.Numeric): AST.Numeric,
+	('*', AST.Numeric, VectorType): VectorType,
+	('*', AST.Numeric, AST.String): AST.String,
+	('*', AST.String, AST.Numeric): AST.String,
+	**MATRIX_OPERATIONS,
+}
+UNARY_OPERATIONS = {
+	("'", VectorType): VectorType,
+	('-', AST.Numeric): AST.Numeric,
+	('-', VectorType): VectorType,
+}
+
+# literal types checked as their common base in the operation tables
+OPERAND_TYPES = {AST.Integer: AST.Numeric, AST.Float: AST.Numeric}
+
+
+def operand_type(type_: TYPE) -> TYPE:
+	"""
+	Returns the type an operand is looked up as in the operation tables, VectorType for every vector type.
+	"""
+	if isinstance(type_, VectorType):
+		return VectorType
+	return OPERAND_TYPES.get(type_, type_)
+
+
+def dimensions_agree(left: int | None, right: int | None) -> bool:
+	return left is None or right is None or left == right
+
+
+def vector_shapes(op: str, left_type: VectorType, right_type: VectorType) -> VectorType | None:
+	"""
+	Returns the type of the result of a matrix operation from the shapes of its operands, computed once for each
+	vector literal by visit_Vector and carried by the types, so the operands are not walked again.
+	An unknown shape, None for the whole shape or a dimension, agrees with any other.
+	"""
+	left_shape = left_type.shape
+	right_shape = right_type.shape
+	if left_shape is None or right_shape is None:
+		return VectorType(shape=None)
+
+	if op == '*':
+		if len(left_shape) > 2 or len(right_shape) > 2:
+			warnings.warn(f"Matrix multiplication is only supported for 2D matrices: {left_shape} {right_shape}")
+			return None
+		if len(left_shape) != len(right_shape) or not dimensions_agree(left_shape[1], right_shape[0]):
+			warnings.warn(f"Vector dimensions must agree: {left_shape} != {right_shape}")
+			return None
+		return VectorType(shape=(left_shape[0], right_shape[1]))
+	else:
+		if len(left_shape) != len(right_shape) or not all(map(dimensions_agree, left_shape, right_shape)):
+			warnings.warn(f"Vector dimensions must agree: {left_shape} != {right_shape}")
+			return None
+		return VectorType(shape=tuple(right if left is None else left for left, right in zip(left_shape, right_shape)))
+
+
+class ExpressionTypes:
+	"""
+	Side table of the types inferred for the operations of a tree, which the slotted nodes have no room for:
+	the signature of an operation is the type of its result followed by the types of its operands,
+	as the operands themselves may be leaves shared by the whole tree.
+
+	An entry holds its node, so the id of a node freed by a later pass, like the Optimizer, is never matched.
+	The types are those at the point of the analysis, which assignments later in a loop can change.
+	"""
+
+	def __init__(self):
+		self.entries = {}
+
+	def __len__(self):
+		return len(self.entries)
+
+	def record(self, node: AST.Node, result: TYPE, *operands: TYPE) -> TYPE:
+		self.entries[id(node)] = (node, (result, *operands))
+		return result
+
+	def get(self, node: AST.Node) -> tuple | None:
+		"""
+		Returns the signature recorded for the node, None if it was not analyzed or has no valid type.
+		"""
+		entry = self.entries.get(id(node))
+		if entry is None or entry[0] is not node:
+			return None
+		return entry[1]
+
+
+def infer_types(ast: AST.Program) -> ExpressionTypes:
+	"""
+	Analyzes the tree without reporting warnings and returns the types of its operations, as far as
+	the analysis gets: it stops at the first construct it cannot analyze, e.g. a variable read before its declaration.
+	"""
+	analyzer = LexicalAnalyzer()
+	with warnings.catch_warnings():
+		warnings.simplefilter('ignore')
+		try:
+			analyzer.visit(ast)
+		except Exception:
+			pass
+	return analyzer.types
 
 
 class LexicalAnalyzer:
@@ -10,40 +166,57 @@ class LexicalAnalyzer:
 
 	Visit function extends the functionality of AST classes by implementing the Visitor pattern.
 	To add custom behavior for a specific node type, define a method named visit_<NodeType>(self, node).
+	A visit method reaches the children by yielding them, which sends back their result, instead of calling visit:
+	the traversal is driven by a trampoline with an explicit stack, so deep trees do not exhaust the call stack.
 	"""
 
 	def __init__(self):
 		self.symbol_table = SymbolTable(parent_scope=None, name="global")
 		self.current_loop = 0
+		self.types = ExpressionTypes()
+		self.visitors = self.dispatch_table()
+
+	@classmethod
+	def dispatch_table(cls) -> dict:
+		"""
+		Returns the table of the class mapping node classes to their visit functions, filled on the first visit
+		of each node class and shared by all the analyzers of the class.
+		"""
+		if '_visitors' not in cls.__dict__:
+			cls._visitors = {}
+		return cls._visitors
 
 	@staticmethod
 	def _get_children(node):
-		return [
-			child for name, child in vars(node).items()
-			if not name.startswith("_")
-		]
+		return [child for name, child in AST.fields(node)]
 
 	def visit(self, node: AST.Node | list):
+		return trampoline(self.dispatch, node)
+
+	def dispatch(self, node: AST.Node | list):
 		"""
 		Visits a node by finding the appropriate visit method.
 		Defaults to generic_visit if no explicit visitor function exists for a node.
 		"""
-		method = 'visit_' + node.__class__.__name__
-		visitor = getattr(self, method, self.generic_visit)
-		return visitor(node)
+		node_class = node.__class__
+		visitor = self.visitors.get(node_class)
+		if visitor is None:
+			visitor = getattr(type(self), 'visit_' + node_class.__name__, type(self).generic_visit)
+			self.visitors[node_class] = visitor
+		return visitor(self, node)
 
 	def generic_visit(self, node):
 		"""
 		Called if no explicit visitor function exists for a node.
-        It relays on visit method to continue the traversal.
+        It yields the children to continue the traversal.
         """
 		if isinstance(node, AST.Node):
 			for child in self._get_children(node):
-				if isinstance(child, AST.Node) or isinstance(child, list):
-					self.visit(child)
-		elif isinstance(node, list):
+				if isinstance(child, (AST.Node, list, tuple)):
+					yield child
+		elif isinstance(node, (list, tuple)):
 			for elem in node:
-				self.visit(elem)
+				yield elem
 
 
 	def visit_VariableSymbol(self, node):
@@ -51,26 +224,20 @@ class LexicalAnalyzer:
 
 	def visit_Block(self, node):
 		self.symbol_table = SymbolTable(parent_scope=self.symbol_table, name="block")
-		self.visit(node.instructions)
+		yield node.instructions
 		self.symbol_table = self.symbol_table.parent_scope
 
 
+	def visit_ForLoopInstruction(self, node):
+		yield node.range
+		# like at runtime, the loop variable is declared in the enclosing scope
+		self.symbol_table.put(VariableSymbol(name=node.id.name, type_=AST.Integer))
+		yield node.body
+
+
 	def visit_FunctionalInstruction(self, node) -> TYPE:
-		ALLOWED_ARGUMENT_TYPES = {
-			'eye': [AST.Integer, Optional[AST.Integer]],
-			'zeros': [AST.Integer, Optional[AST.Integer]],
-			'ones': [AST.Integer, Optional[AST.Integer]],
-			'print': ['*'],
-		}
-		FUNCTION_RETURN_TYPES = {
-			'eye': lambda x, y=None: VectorType(shape=(x, y if y is not None else x)),
-			'zeros': lambda x, y=None: VectorType(shape=(x, y if y is not None else x)),
-			'ones': lambda x, y=None: VectorType(shape=(x, y if y is not None else x)),
-			'print': lambda *args: None,
-		}
-
-		arg_types = [arg for arg in node.args]
-		expected_types = ALLOWED_ARGUMENT_TYPES[node.instruction]
+		arg_types = node.args
+		expected_types = FUNCTION_ARGUMENT_TYPES[node.instruction]
 
 		if '*' in expected_types:
 			return FUNCTION_RETURN_TYPES[node.instruction](*arg_types)
@@ -104,21 +271,14 @@ class LexicalAnalyzer:
 				self.symbol_table = self.symbol_table.parent_scope
 
 		if node.instruction == 'RETURN':
-			return self.visit(node.args[0])
+			return (yield node.args[0])
 
 
 	def visit_Assignment(self, node):
-		TRANSLATION_TABLE = {
-			'+=': '+',
-			'-=': '-',
-			'*=': '*',
-			'/=': '/',
-		}
-
 		var_name = node.id.name
 		var_symbol = self.symbol_table.get(var_name)
 		if node.op == '=':
-			type_ = self.visit(node.expr)
+			type_ = yield node.expr
 			if var_symbol is None:
 				self.symbol_table.put(VariableSymbol(name=var_name, type_=type_))
 			else:
@@ -126,125 +286,75 @@ class LexicalAnalyzer:
 		else:
 			if var_symbol is None:
 				warnings.warn(f"Undefined variable: {var_name}")
-			type_ = self.visit(AST.BinaryOperation(TRANSLATION_TABLE[node.op], AST.Variable(var_name), node.expr))
+			operation = AST.BinaryOperation(TRANSLATION_TABLE[node.op], AST.Variable(var_name), node.expr)
+			type_ = yield operation
 			self.symbol_table.get(var_name).type = type_
+			if type_ is not None:
+				self.types.record(node, *self.types.get(operation))
 
 
 
 	def visit_BinaryOperation(self, node) -> TYPE:
-		MATRIX_OPERATIONS = {
-			('.+', VectorType, VectorType): VectorType,
-			('.-', VectorType, VectorType): VectorType,
-			('.*', VectorType, VectorType): VectorType,
-			('./', VectorType, VectorType): VectorType,
-			('+', VectorType, VectorType): VectorType,
-			('-', VectorType, VectorType): VectorType,
-			('*', VectorType, VectorType): VectorType,
-		}
-		ALLOWED_OPERATIONS = {
-			('==', AST.Numeric, AST.Numeric): bool,
-			('<=', AST.Numeric, AST.Numeric): bool,
-			('<', AST.Numeric, AST.Numeric): bool,
-			('>=', AST.Numeric, AST.Numeric): bool,
-			('>', AST.Numeric, AST.Numeric): bool,
-			('!=', AST.Numeric, AST.Numeric): bool,
-			('+', AST.Numeric, AST.Numeric): AST.Numeric,
-			('-', AST.Numeric, AST.Numeric): AST.Numeric,
-			('*', AST.Numeric, AST.Numeric): AST.Numeric,
-			('/', AST.Numeric, AST.Numeric): AST.Numeric,
-			('*', AST.Numeric, VectorType): VectorType,
-			('*', AST.Numeric, AST.String): AST.String,
-			('*', AST.String, AST.Numeric): AST.String,
-			**MATRIX_OPERATIONS,
-		}
-
-		def vector_shapes(op: str, left_vector: AST.Vector, right_vector: AST.Vector) -> VectorType:
-			left_shape = left_vector.shape()
-			right_shape = right_vector.shape()
-
-			if op == '*':
-				if len(left_shape) > 2 or len(right_shape) > 2:
-					raise Exception(
-						f"Matrix multiplication is only supported for 2D matrices: {left_shape} {right_shape}")
-				if len(left_shape) != len(right_shape) or left_shape[1] != right_shape[0]:
-					raise Exception(f"Vector dimensions must agree: {left_shape} != {right_shape}")
-				return VectorType(shape=(left_shape[0], right_shape[1]))
-			else:
-				if left_shape != right_shape:
-					raise Exception(f"Vector dimensions must agree: {left_shape} != {right_shape}")
-				return VectorType(shape=left_shape)
-
-		def get_ancestor(cls):
-			# returns the first base class or None if no base exists
-			return cls.__bases__[0] if hasattr(cls, '__bases__') and cls.__bases__ else None
-
-
-		left_type = self.visit(node.left)
-		right_type = self.visit(node.right)
-
-		if left_type is AST.Integer or left_type is AST.Float:
-			left_type = get_ancestor(left_type)
-
-		if right_type is AST.Integer or right_type is AST.Float:
-			right_type = get_ancestor(right_type)
-
-
-		operation = (node.op, left_type, right_type)
-		if operation in ALLOWED_OPERATIONS.keys():
-			if operation in MATRIX_OPERATIONS.keys():
-				return vector_shapes(node.op, node.left, node.right)
-			return ALLOWED_OPERATIONS[operation]
+		left_type = yield node.left
+		right_type = yield node.right
+
+		left_type = OPERAND_TYPES.get(left_type, left_type)
+		right_type = OPERAND_TYPES.get(right_type, right_type)
+
+		operation = (node.op, operand_type(left_type), operand_type(right_type))
+		result = ALLOWED_OPERATIONS.get(operation)
+		if result is not None:
+			if operation in MATRIX_OPERATIONS:
+				result = vector_shapes(node.op, left_type, right_type)
+				if result is None:
+					return None
+			elif result is VectorType:  # scalar times vector
+				result = right_type
+			return self.types.record(node, result, left_type, right_type)
 		else:
 			warnings.warn(f"Unsupported operation: {left_type} {node.op} {right_type} for {node.left} {node.op} {node.right}")
 
 	def visit_UnaryOperation(self, node) -> TYPE:
-		self.visit(node.operand)
-
-		ALLOWED_OPERATIONS = {
-			("'", VectorType): VectorType,
-			('-', AST.Numeric): AST.Numeric,
-			('-', VectorType): VectorType,
-		}
+		type_ = yield node.operand
 
-		if isinstance(node.operand, AST.Variable):
-			operand_type = self.symbol_table.get(node.operand.name).type
-		else:
-			operand_type = node.operand.__class__.__name__
-
-		operation = (node.op, operand_type)
+		operation = (node.op, operand_type(type_))
 
-		if operation not in ALLOWED_OPERATIONS.keys():
+		if operation not in UNARY_OPERATIONS:
 			warnings.warn(
-				f"Unsupported operation: {operand_type} {node.operand.__class__.__name__} for {node.op} {node.operand}")
+				f"Unsupported operation: {type_} {node.operand.__class__.__name__} for {node.op} {node.operand}")
+			return None
 
-		if ALLOWED_OPERATIONS[operation] is VectorType:
-			if isinstance(node.operand, AST.Variable):
-				return VectorType(shape=self.symbol_table.get(node.operand.name).type.shape())
-			else:
-				return VectorType(shape=node.operand.shape())
+		if UNARY_OPERATIONS[operation] is VectorType:
+			if node.op == "'" and type_.shape is not None:
+				return self.types.record(node, VectorType(shape=type_.shape[::-1]), type_)
+			return self.types.record(node, type_, type_)
 		else:
-			return ALLOWED_OPERATIONS[operation]
+			return self.types.record(node, UNARY_OPERATIONS[operation], OPERAND_TYPES.get(type_, type_))
 
 	def visit_Reference(self, node) -> TYPE:
-		id_type = self.visit(node.id)
-		index_types = [i.accept(self) for i in node.index]  #TODO: recursive visits
+		id_type = yield node.id
+		index_types = []
+		for i in node.index:
+			index_types.append((yield i))
 
 		if isinstance(id_type, VectorType):
+			if id_type.shape is None:  # unknown shape, the indexes are checked at runtime
+				return None
 			if len(index_types) > len(id_type.shape):
 				warnings.warn(f"Index out of bounds: {node.id} {node.index}")
 				return
-			for i in range(len(id_type.shape)):  # check if indexes are integers and within bounds
+			for i in range(len(node.index)):  # check if indexes are integers and within bounds
 				if not isinstance(node.index[i], AST.Integer):
 					warnings.warn(f"Indexes must be an integers: {node.id} {node.index} in {node}")
 					return
-				if node.index[i] < 0 or node.index[i] >= id_type.shape[i]:
+				if node.index[i] < 0 or (id_type.shape[i] is not None and node.index[i] >= id_type.shape[i]):
 					warnings.warn(f"Index out of bounds: {node.id} {node.index} in {node}")
 					return
 
-			if len(node.index) == len(id.shape):
+			if len(node.index) == len(id_type.shape):
 				return AST.Numeric
 			else:
-				return VectorType(shape=id.shape[len(node.index):])
+				return VectorType(shape=id_type.shape[len(node.index):])
 		else:
 			warnings.warn(f"Variable is not a vector: {node.id} in {node} is type {id_type}")
 
@@ -252,9 +362,10 @@ class LexicalAnalyzer:
 		return VectorType(shape=(node.shape()))
 
 	def visit_Variable(self, node):
-		if self.symbol_table.get(node.name) is None:
+		symbol = self.symbol_table.get(node.name)
+		if symbol is None:
 			warnings.warn(f"Variable referenced before assignment: {node.name}")
-		return self.symbol_table.get(node.name).type
+		return symbol.type
 
 	def visit_Integer(self, node) -> TYPE:
 		return AST.Integer
@@ -0,0 +1,271 @@
+import copy
+import AST
+from interpreter.Operations import BINARY_OPERATORS
+
+
+ARITHMETIC_OPERATORS = {'+', '-', '*', '/'}
+RELATIONAL_OPERATORS = {'==', '!=', '>', '<', '>=', '<='}
+
+
+class Optimizer:
+    """
+    Optimization pass run on the analyzed AST before execution, which rewrites the tree in place.
+
+    - Arithmetic on numeric literals is folded into a single literal, including the sizes of eye, zeros and ones;
+      transposes of these constructors with literal sizes are replaced by the constructor of the transposed matrix.
+    - If statements and while loops with constant conditions are replaced by the branch that is taken.
+    - Loop-invariant expressions evaluated in every iteration of a loop are computed once into temporary
+      variables (inv$0, inv$1, ...) before the loop, guarded so that they are only computed if the loop runs.
+      Expressions are not hoisted from behind a print, as they could raise an error before its output.
+
+    Every backend evaluates expressions without side effects, so folding and hoisting keep the output
+    of programs, also of the ones ending with an error.
+    To add custom behavior for a specific node type, define a method named visit_<NodeType>(self, node),
+    returning the node replacing the visited one.
+    """
+
+    def __init__(self):
+        self.temporaries = 0
+        self.hoisting = True
+
+    def optimize(self, program: AST.Program) -> AST.Program:
+        # matrices are shared by the iterations after hoisting, which must not be observable by element assignment
+        self.hoisting = not any(isinstance(node, AST.Assignment) and isinstance(node.id, AST.Reference)
+                                for node in walk(program))
+        return self.visit(program)
+
+    def visit(self, node):
+        method = 'visit_' + node.__class__.__name__
+        visitor = getattr(self, method, None)
+        return visitor(node) if visitor is not None else node
+
+    def visit_Program(self, node):
+        node.instructions = self.visit_instructions(node.instructions)
+        return node
+
+    def visit_Block(self, node):
+        node.instructions = self.visit_instructions(node.instructions)
+        return node
+
+    def visit_instructions(self, instructions: list) -> list:
+        optimized = []
+        for instruction in instructions:
+            instruction = self.visit(instruction)
+            if isinstance(instruction, (AST.WhileInstruction, AST.ForLoopInstruction)) and self.hoisting:
+                optimized.extend(self.hoist(instruction))
+            if instruction is not None:
+                optimized.append(instruction)
+        return optimized
+
+    def visit_statement(self, node):
+        """
+        Visits a statement which cannot be removed, replacing a removed one with an empty block.
+        """
+        node = self.visit(node)
+        return AST.Block([]) if node is None else node
+
+    def visit_Ifstatement(self, node):
+        node.condition = self.visit(node.condition)
+        node.instruction = self.visit_statement(node.instruction)
+        if node.elsepart:
+            node.elsepart = self.visit_statement(node.elsepart)
+
+        value = constant_value(node.condition)
+        if value is None:
+            return node
+        return node.instruction if value else node.elsepart
+
+    def visit_WhileInstruction(self, node):
+        node.condition = self.visit(node.condition)
+        node.body = self.visit_statement(node.body)
+        node.args = (node.condition, node.body)
+        value = constant_value(node.condition)
+        return None if value is not None and not value else node
+
+    def visit_ForLoopInstruction(self, node):
+        node.range.start = self.visit(node.range.start)
+        node.range.end = self.visit(node.range.end)
+        node.body = self.visit_statement(node.body)
+        node.args = (node.id, node.range, node.body)
+        return node
+
+    def visit_FunctionalInstruction(self, node):
+        node.args = tuple(self.visit(arg) for arg in node.args)
+        return node
+
+    def visit_FlowControlInstruction(self, node):
+        node.args = tuple(self.visit(arg) if isinstance(arg, AST.Node) else arg for arg in node.args)
+        return node
+
+    def visit_Assignment(self, node):
+        node.expr = self.visit(node.expr)
+        if isinstance(node.id, AST.Reference):
+            node.id.index = self.visit(node.id.index)
+        return node
+
+    def visit_Reference(self, node):
+        node.index = self.visit(node.index)
+        return node
+
+    def visit_Vector(self, node):
+        node.elements = [self.visit(element) for element in node.elements]
+        return node
+
+    def visit_BinaryOperation(self, node):
+        node.left = self.visit(node.left)
+        node.right = self.visit(node.right)
+        if node.op not in ARITHMETIC_OPERATORS or not (is_numeric(node.left) and is_numeric(node.right)):
+            return node
+        if node.op == '/' and node.right.value == 0:
+            return node  # the error is left to the execution
+        return literal(BINARY_OPERATORS[node.op](node.left.value, node.right.value))
+
+    def visit_UnaryOperation(self, node):
+        node.operand = self.visit(node.operand)
+        operand = node.operand
+        if node.op == '-' and is_numeric(operand):
+            return literal(-operand.value)
+        if node.op == "'" and isinstance(operand, AST.FunctionalInstruction) \
+                and all(isinstance(arg, AST.Integer) for arg in operand.args):
+            if operand.instruction == 'eye' or len(operand.args) == 1:
+                return operand  # square
+            if len(operand.args) == 2:
+                return AST.FunctionalInstruction(operand.instruction, operand.args[1], operand.args[0])
+        return node
+
+    def hoist(self, loop) -> list:
+        """
+        Moves the invariant expressions of the loop out of it, returning the statements computing them.
+        """
+        assigned = assigned_names(loop)
+        hoisted = []
+
+        def replace(expression):
+            if is_invariant(expression, assigned):
+                if isinstance(expression, (AST.BinaryOperation, AST.UnaryOperation, AST.FunctionalInstruction)):
+                    name = f"inv${self.temporaries}"
+                    self.temporaries += 1
+                    hoisted.append(AST.Assignment('=', AST.Variable(name), expression))
+                    return AST.Variable(name)
+                return expression
+            return self.map_subexpressions(expression, replace)
+
+        for statement in always_executed(loop.body):
+            self.map_expressions(statement, replace)
+            if prints(statement):  # its arguments are evaluated before the output, the later expressions after it
+                break
+        if not hoisted:
+            return []
+
+        # the expressions are only evaluated if the loop was going to evaluate them
+        if isinstance(loop, AST.ForLoopInstruction):
+            guard = AST.BinaryOperation('<', copy.deepcopy(loop.range.start), copy.deepcopy(loop.range.end))
+        else:
+            guard = copy.deepcopy(loop.condition)
+        value = constant_value(guard)
+        if value is not None:
+            return hoisted if value else []  # the loop never runs otherwise
+        return [AST.Ifstatement(guard, assignment, None) for assignment in hoisted]
+
+    @staticmethod
+    def map_expressions(statement, function):
+        """
+        Replaces the expressions evaluated by the statement itself with their images under the function.
+        """
+        if isinstance(statement, AST.Assignment):
+            statement.expr = function(statement.expr)
+        elif isinstance(statement, AST.Ifstatement):
+            statement.condition = function(statement.condition)
+        elif isinstance(statement, AST.WhileInstruction):
+            statement.condition = function(statement.condition)
+            statement.args = (statement.condition, statement.body)
+        elif isinstance(statement, AST.ForLoopInstruction):
+            statement.range.start = function(statement.range.start)
+            statement.range.end = function(statement.range.end)
+        elif isinstance(statement, AST.FunctionalInstruction):
+            statement.args = tuple(function(arg) for arg in statement.args)
+
+    @staticmethod
+    def map_subexpressions(expression, function):
+        if isinstance(expression, AST.BinaryOperation):
+            expression.left = function(expression.left)
+            expression.right = function(expression.right)
+        elif isinstance(expression, AST.UnaryOperation):
+            expression.operand = function(expression.operand)
+        elif isinstance(expression, AST.FunctionalInstruction):
+            expression.args = tuple(function(arg) for arg in expression.args)
+        elif isinstance(expression, AST.Vector):
+            expression.elements = [function(element) for element in expression.elements]
+        elif isinstance(expression, AST.Reference):
+            expression.index = function(expression.index)
+        return expression
+
+
+def literal(value) -> AST.Numeric:
+    return AST.Integer(value) if isinstance(value, int) else AST.Float(value)
+
+
+def is_numeric(node) -> bool:
+    return isinstance(node, (AST.Integer, AST.Float))
+
+
+def constant_value(condition):
+    """
+    Returns the value of a condition comparing numeric literals, otherwise None.
+    """
+    if isinstance(condition, AST.BinaryOperation) and condition.op in RELATIONAL_OPERATORS \
+            and is_numeric(condition.left) and is_numeric(condition.right):
+        return BINARY_OPERATORS[condition.op](condition.left.value, condition.right.value)
+    return None
+
+
+def walk(node):
+    """
+    Yields the node and all nodes below it.
+    """
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (list, tuple)):
+            stack.extend(node)
+        elif isinstance(node, AST.Node):
+            yield node
+            stack.extend(value for name, value in AST.fields(node))
+
+
+def assigned_names(node) -> set:
+    names = set()
+    for child in walk(node):
+        if isinstance(child, AST.Assignment):
+            target = child.id.id if isinstance(child.id, AST.Reference) else child.id
+            names.add(target.name)
+        elif isinstance(child, AST.ForLoopInstruction):
+            names.add(child.id.name)
+    return names
+
+
+def is_invariant(expression, assigned: set) -> bool:
+    for node in walk(expression):
+        if isinstance(node, AST.Variable) and node.name in assigned:
+            return False
+    return True
+
+
+def prints(statement) -> bool:
+    return any(isinstance(node, AST.FunctionalInstruction) and node.instruction == 'print' for node in walk(statement))
+
+
+def always_executed(body):
+    """
+    Yields the statements of a loop body evaluated in every iteration, up to the first one which can end it.
+    """
+    statements = body.instructions if isinstance(body, AST.Block) else [body]
+    for statement in statements:
+        if isinstance(statement, AST.Block):
+            if any(isinstance(node, AST.FlowControlInstruction) for node in walk(statement)):
+                return
+            yield from always_executed(statement)
+            continue
+        yield statement
+        if any(isinstance(node, AST.FlowControlInstruction) for node in walk(statement)):
+            return
@@ -1,6 +1,30 @@
+import os
+import pickle
+import hashlib
+import sly
 from sly import Parser as slyParser
 from Scanner import Scanner
 import AST
+from FlatAST import FlatTree
+
+
+class CachedTable:
+    """
+    LR tables loaded from the cache, holding only the parts used while parsing.
+    """
+    def __init__(self, lr_action, lr_goto, defaulted_states, sr_conflicts, rr_conflicts):
+        self.lr_action = lr_action
+        self.lr_goto = lr_goto
+        self.defaulted_states = defaulted_states
+        self.sr_conflicts = sr_conflicts  # number of conflicts
+        self.rr_conflicts = rr_conflicts
+
+    @classmethod
+    def from_table(cls, lrtable):
+        if isinstance(lrtable, cls):
+            return lrtable
+        return cls(lrtable.lr_action, lrtable.lr_goto, lrtable.defaulted_states,
+                   len(lrtable.sr_conflicts), len(lrtable.rr_conflicts))
 
 
 class Parser(slyParser):
@@ -20,6 +44,8 @@ class Parser(slyParser):
         """
         cls.debugfile = debugfile
         if hasattr(cls, '_grammar') and hasattr(cls, '_lrtable'):
+            if isinstance(cls._lrtable, CachedTable):  # the description of the states is not cached
+                cls._Parser__build_lrtables()
             cls._apply_debugfile()
 
     @classmethod
@@ -31,6 +57,79 @@ class Parser(slyParser):
                 f.write(str(cls._lrtable))
             cls.log.info('Parser debugging for %s written to %s', cls.__qualname__, cls.debugfile)
 
+    tablefile = os.path.join(os.path.dirname(os.path.abspath(__file__)), '__pycache__', 'parser_tables.pickle')
+
+    @classmethod
+    def _build(cls, definitions):
+        """
+        Replaces the SLY build run by the metaclass, loading the LR tables from tablefile when they were generated
+        for the same grammar, as generating them dominates the startup time.
+        The cache is invalidated by any change of the rules, the precedence or the SLY version.
+        Private methods of sly.Parser are reached through their mangled names.
+        """
+        rules = [(name, value) for name, value in definitions if callable(value) and hasattr(value, 'rules')]
+        if not cls._Parser__validate_specification():
+            raise sly.yacc.YaccError('Invalid parser specification')
+        cls._Parser__build_grammar(rules)
+
+        grammar_hash = cls._grammar_hash()
+        tables = cls._load_tables(grammar_hash)
+        if tables is None:
+            cls._Parser__build_lrtables()
+            cls._save_tables(grammar_hash)
+        else:
+            cls._lrtable = CachedTable(**tables)
+            cls._report_conflicts()
+        cls._apply_debugfile()
+
+    @classmethod
+    def _grammar_hash(cls) -> str:
+        grammar = cls._grammar
+        description = repr((
+            sly.__version__,
+            [(str(production), production.prec) for production in grammar.Productions],
+            sorted(grammar.Precedence.items()),
+            grammar.Start,
+        ))
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    @classmethod
+    def _load_tables(cls, grammar_hash: str):
+        if not cls.tablefile:
+            return None
+        try:
+            with open(cls.tablefile, 'rb') as f:
+                cached = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return None
+        if not isinstance(cached, dict) or cached.get('grammar_hash') != grammar_hash:
+            return None
+        return cached['tables']
+
+    @classmethod
+    def _save_tables(cls, grammar_hash: str):
+        if not cls.tablefile:
+            return
+        tables = vars(CachedTable.from_table(cls._lrtable))
+        temporary = f"{cls.tablefile}.{os.getpid()}"
+        try:
+            os.makedirs(os.path.dirname(cls.tablefile), exist_ok=True)
+            with open(temporary, 'wb') as f:
+                pickle.dump({'grammar_hash': grammar_hash, 'tables': tables}, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, cls.tablefile)  # concurrent processes never read a partial file
+        except OSError:
+            pass  # the cache is optional, e.g. in a read-only installation
+
+    @classmethod
+    def _report_conflicts(cls):
+        for kind, count, expected in (
+                ('shift/reduce', cls._lrtable.sr_conflicts, getattr(cls, 'expected_shift_reduce', None)),
+                ('reduce/reduce', cls._lrtable.rr_conflicts, getattr(cls, 'expected_reduce_reduce', None))):
+            if count != expected and count == 1:
+                cls.log.warning('1 %s conflict', kind)
+            elif count != expected and count > 1:
+                cls.log.warning('%d %s conflicts', count, kind)
+
 
 
     precedence = (  # tokens are ordered from lowest to highest precedence
@@ -59,12 +158,17 @@ class Parser(slyParser):
 
     @_('statements')
     def program(self, p):
-        return AST.Program(p[0] if isinstance(p[0], list) else [p[0]])
+        return self.ast.Program(p[0])
 
+    # left recursive, so that the list is built by appending in linear time and the parser stack stays shallow
     @_('statement')
-    @_('statement statements')
     def statements(self, p):
-        return p[0] if len(p) == 1 else ([p[0]] + p[1] if isinstance(p[1], list) else [p[0], p[1]])
+        return [p[0]]
+
+    @_('statements statement')
+    def statements(self, p):
+        p[0].append(p[1])
+        return p[0]
 
     @_('if_statement')
     @_('for_loop')
@@ -78,12 +182,12 @@ class Parser(slyParser):
 
     @_(" '{' statements '}'")
     def block(self, p):
-        return AST.Block(p[1] if isinstance(p[1], list) else [p[1]])
+        return self.ast.Block(p[1])
 
     @_("IF '(' condition ')' statement %prec IFX")
     @_("IF '(' condition ')' statement ELSE statement")
     def if_statement(self, p):
-        return AST.Ifstatement(p[2], p[4], p[6] if len(p) > 5 else None)
+        return self.ast.Ifstatement(p[2], p[4], p[6] if len(p) > 5 else None)
 
 
     @_('id ADD expr')
@@ -92,7 +196,7 @@ class Parser(slyParser):
     @_('id DIVIDE_BY expr')
     @_('id ASSIGN expr')
     def assignment(self, p):
-        return AST.Assignment(p[1],p[0], p[2])
+        return self.ast.Assignment(p[1],p[0], p[2])
 
     @_('reference ADD expr')
     @_('reference SUBTRACT expr')
@@ -100,32 +204,32 @@ class Parser(slyParser):
     @_('reference DIVIDE_BY expr')
     @_('reference ASSIGN expr')
     def assignment(self, p):
-        return AST.Assignment(p[1], p[0], p[2])
+        return self.ast.Assignment(p[1], p[0], p[2])
 
     @_("FOR id ASSIGN range_expr statement")
     def for_loop(self, p):
-        return AST.ForLoopInstruction(p[0], p[1], p[3], p[4])
+        return self.ast.ForLoopInstruction(p[0], p[1], p[3], p[4])
 
     @_('expr RANGE expr')
     def range_expr(self, p):
-        return AST.Range(p[0], p[2])
+        return self.ast.Range(p[0], p[2])
 
 
     @_("WHILE '(' condition ')' statement")
     def while_loop(self, p):
-        return AST.WhileInstruction(p[0], p[2], p[4])
+        return self.ast.WhileInstruction(p[0], p[2], p[4])
 
     # here be reduce/reduce conflict
     @_("PRINT terms")
     @_("PRINT expr")
     def print_statement(self, p):
-        return AST.FunctionalInstruction(p[0], *(p[1] if isinstance(p[1], list) else [p[1]]))
+        return self.ast.FunctionalInstruction(p[0], *(p[1] if isinstance(p[1], list) else [p[1]]))
 
     @_("BREAK")
     @_("CONTINUE")
     @_("RETURN expr")
     def keyword_statement(self, p):
-        return AST.FlowControlInstruction(p[0], p[1] if len(p) > 1 else None)
+        return self.ast.FlowControlInstruction(p[0], p[1] if len(p) > 1 else None)
 
     @_('expr EQ expr')
     @_('expr LE expr')
@@ -134,7 +238,7 @@ class Parser(slyParser):
     @_('expr GT expr')
     @_('expr NE expr')
     def condition(self, p):
-        return AST.BinaryOperation(p[1], p[0], p[2])
+        return self.ast.BinaryOperation(p[1], p[0], p[2])
 
     @_('term')
     @_('arithmetic_expr')
@@ -144,7 +248,7 @@ class Parser(slyParser):
 
     @_('"-" expr %prec UMINUS')
     def expr(self, p):
-        return AST.UnaryOperation(p[0], p[1])
+        return self.ast.UnaryOperation(p[0], p[1])
 
     @_("'(' expr ')'")
     def expr(self, p):
@@ -155,14 +259,14 @@ class Parser(slyParser):
     @_("expr '*' expr")
     @_("expr '/' expr")
     def arithmetic_expr(self, p):
-        return AST.BinaryOperation(p[1], p[0], p[2])
+        return self.ast.BinaryOperation(p[1], p[0], p[2])
 
     @_('expr MATRIX_PLUS expr')
     @_('expr MATRIX_MINUS expr')
     @_('expr MATRIX_MUL expr')
     @_('expr MATRIX_DIV expr')
     def matrix_expr(self, p):
-        return AST.BinaryOperation(p[1], p[0], p[2])
+        return self.ast.BinaryOperation(p[1], p[0], p[2])
 
     # here be reduce/reduce conflict ## EYE(2,3) / EYE(2+1) / EYE(2)
     @_("EYE '(' terms ')'")
@@ -172,23 +276,24 @@ class Parser(slyParser):
     @_("ZEROS '(' expr ')'")
     @_("ONES '(' expr ')' ")
     def matrix(self, p):
-        return AST.FunctionalInstruction(p[0], *(p[2] if isinstance(p[2], list) else [p[2]]))
+        return self.ast.FunctionalInstruction(p[0], *(p[2] if isinstance(p[2], list) else [p[2]]))
 
     @_('matrix TRANSPOSE')
     def matrix(self, p):
-        return AST.UnaryOperation(p[1], p[0])
+        return self.ast.UnaryOperation(p[1], p[0])
 
     @_(" '[' terms ']' ")
     def list(self, p):
-        return AST.Vector(p[1])
+        return self.ast.Vector(p[1] if isinstance(p[1], list) else [p[1]])
 
     @_("term")
     def terms(self, p):
-        return p[0]
+        return [p[0]]
 
-    @_("term ',' terms")
+    @_("terms ',' term")
     def terms(self, p):
-        return [p[0]] + p[2] if isinstance(p[2], list) else [p[0], p[2]]
+        p[0].append(p[2])
+        return p[0]
 
     @_('reference')
     @_('numeric')
@@ -201,27 +306,62 @@ class Parser(slyParser):
 
     @_("id TRANSPOSE")
     def term(self, p):
-        return AST.UnaryOperation(p[1], p[0])
+        return self.ast.UnaryOperation(p[1], p[0])
 
     @_('id list')
     def reference(self, p):
-        return AST.Reference(p[0], p[1])
+        return self.ast.Reference(p[0], p[1])
 
     @_('ID')
     def id(self, p):
-        return AST.Variable(p[0])
+        return self.leaf('Variable', p[0])
 
     @_('INTEGER')
     def numeric(self, p):
-        return AST.Integer(p[0])
+        return self.leaf('Integer', p[0])
 
     @_('FLOAT')
     def numeric(self, p):
-        return AST.Float(p[0])
+        return self.leaf('Float', p[0])
 
     @_('STRING')
     def string(self, p):
-        return AST.String(p[0])
+        return self.ast.String(p[0])
+
+    intern_leaves = True  # identical variables and numbers of a program share one immutable node
+
+    def parse(self, tokens):
+        """
+        Parses the tokens into an AST whose identical leaves, like the hundred occurrences of a loop counter,
+        are a single node when intern_leaves is set, so they take memory once and can be cached by identity.
+        Positions are tracked by node, so a shared leaf has the position of its last occurrence: the leaves
+        are not interned when their positions matter, e.g. for profiling.
+        """
+        self.leaves = {} if self.intern_leaves and self.ast is AST else None  # (class name, text) -> node
+        try:
+            return super().parse(tokens)
+        finally:
+            self.leaves = None
+
+    def leaf(self, kind: str, text: str):
+        if self.leaves is None:
+            return getattr(self.ast, kind)(text)
+        key = (kind, text)
+        node = self.leaves.get(key)
+        if node is None:
+            node = self.leaves[key] = getattr(self.ast, kind)(text)
+        return node
+
+    def parse_flat(self, tokens) -> FlatTree:
+        """
+        Parses the tokens into a FlatTree, without allocating an object per node.
+        """
+        self.ast = tree = FlatTree()
+        try:
+            self.parse(tokens)
+        finally:
+            del self.ast
+        return tree
 
     def error(self, p):
         if p is not None:
@@ -229,4 +369,9 @@ class Parser(slyParser):
                 f"Syntax error at line {p.lineno}: Unexpected token '{p.value}'")
         else:
             raise Exception(
-                f"Syntax error at end of input")
\ No newline at end of file
+                f"Syntax error at end of input")
+
+
+# constructors of the nodes emitted by the grammar actions, replaced by a FlatTree in parse_flat;
+# set outside of the class body, where SLY resolves uppercase names to token names
+Parser.ast = AST
@@ -1,8 +1,52 @@
 import sys
 from sly import Lexer
-
-
-class Scanner(Lexer):
+from sly.lex import LexError
+
+
+class StreamTokenizer:
+    """
+    Lazy tokenizing of file objects and chunked text, shared by the scanners, on top of their tokenize method.
+    """
+    chunk_size = 1 << 16  # characters read at once from a file object
+
+    def tokenize_stream(self, chunks, lineno=1):
+        """
+        Tokenizes a file object or an iterable of text chunks lazily, with the same tokens as tokenize on the whole text.
+        No token spans a line break, so the input is tokenized in pieces ending after the last complete line
+        and only a partial line is kept between chunks.
+        """
+        if hasattr(chunks, 'read'):
+            file = chunks
+            chunks = iter(lambda: file.read(self.chunk_size), '')
+
+        offset = 0
+        pending = []  # chunks of the incomplete last line
+        for chunk in chunks:
+            split = chunk.rfind('\n') + 1
+            if not split:
+                pending.append(chunk)
+                continue
+            pending.append(chunk[:split])
+            lines = ''.join(pending)
+            yield from self._tokenize_piece(lines, lineno, offset)
+            lineno += lines.count('\n')
+            offset += len(lines)
+            pending = [chunk[split:]]
+        yield from self._tokenize_piece(''.join(pending), lineno, offset)
+
+    def _tokenize_piece(self, text, lineno, offset):
+        try:
+            for token in self.tokenize(text, lineno):
+                token.index += offset
+                token.end += offset
+                yield token
+        except LexError as e:
+            # positions in the message are relative to the whole input
+            index = e.error_index + offset
+            raise LexError(f'Illegal character {e.text[0]!r} at index {index}', e.text, index) from None
+
+
+class Scanner(StreamTokenizer, Lexer):
     def __init__(self):
         self.lineno = 0
 
@@ -62,6 +106,10 @@ class Scanner(Lexer):
     def ignore_newline(self, t):
         self.lineno += len(t.value)
 
+    def ID(self, t):
+        t.value = sys.intern(t.value)  # a name repeated all over a program is stored once
+        return t
+
 
 if __name__ == '__main__':
 
@@ -72,10 +120,9 @@ if __name__ == '__main__':
         print("Cannot open {0} file".format(filename))
         sys.exit(0)
 
-    text = file.read()
     lexer = Scanner()
 
 
-    for tok in lexer.tokenize(text):
+    for tok in lexer.tokenize_stream(file):
         print(tok)
 
@@ -14,9 +14,10 @@ TYPE = object # keyword to annotate type
 
 
 class VariableSymbol(Symbol):
-	def __init__(self, name: str, type_):
+	def __init__(self, name: str, type_, slot: int | None = None):
 		super().__init__(name)
 		self.type = type_
+		self.slot = slot  # index of the variable in the runtime frame of its scope
 
 
 class VectorType(TYPE):
@@ -44,14 +45,38 @@ class SymbolTable(object):
 		self.symbols: dict = {}
 		self.parent_scope = parent_scope
 		self.name = name
+		self.depth = 0 if parent_scope is None else parent_scope.depth + 1
 
 	def put(self, symbol: Symbol):
 		self.symbols[symbol.name] = symbol
 
 	def get(self, name: str):
+		scope = self
+		while scope is not None:  # iterative, scopes can be nested deeper than the recursion limit
+			symbol = scope.symbols.get(name)
+			if symbol is not None:
+				return symbol
+			scope = scope.parent_scope
+		return None
+
+	def declare(self, name: str) -> VariableSymbol:
+		"""
+		Returns the symbol of a variable in this scope, allocating the next free slot if it is not declared yet.
+		"""
 		symbol = self.symbols.get(name)
-		if symbol is not None:
-			return symbol
-		elif self.parent_scope is not None:
-			return self.parent_scope.get(name)
+		if symbol is None:
+			symbol = VariableSymbol(name=name, type_=None, slot=len(self.symbols))
+			self.put(symbol)
+		return symbol
+
+	def resolve(self, name: str) -> tuple | None:
+		"""
+		Returns the (depth, slot) pair of the variable visible under the name, or None if it is not declared.
+		"""
+		scope = self
+		while scope is not None:
+			symbol = scope.symbols.get(name)
+			if symbol is not None:
+				return scope.depth, symbol.slot
+			scope = scope.parent_scope
 		return None
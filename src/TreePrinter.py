@@ -31,104 +31,122 @@ class TreePrinter:
 
     @staticmethod
     def print(obj, indent_level):
-        """Helper to print either a Node, content of a list (or tuple) or a literal value."""
-        if isinstance(obj, AST.Node):
-            obj.printTree(indent_level)
-        elif isinstance(obj, list):
-            for elem in obj:
-                TreePrinter.print(elem, indent_level)
-        else:  # literal value
-            transformed_obj = TreePrinter.keyword_mapping.get(obj, obj)
-            indented_text = TreePrinter.indent_text(f"{transformed_obj}", indent_level)
-            print(indented_text)
+        """
+        Helper to print either a Node, content of a list (or tuple) or a literal value.
+
+        The tree is traversed with an explicit stack instead of recursion: printNode prints the lines of a node
+        and yields the (child, indent) pairs printed in between, so nesting depth is not limited by the call stack.
+        """
+        stack = [iter([(obj, indent_level)])]
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                continue
+            obj, indent_level = item
+            if isinstance(obj, AST.Node):
+                children = obj.printNode(indent_level)
+                if children is not None:
+                    stack.append(children)
+            elif isinstance(obj, list):
+                stack.append((elem, indent_level) for elem in obj)
+            else:  # literal value
+                transformed_obj = TreePrinter.keyword_mapping.get(obj, obj)
+                indented_text = TreePrinter.indent_text(f"{transformed_obj}", indent_level)
+                print(indented_text)
 
     @addToClass(AST.Node)
     def printTree(self, indent=0):
+        TreePrinter.print(self, indent)
+
+    @addToClass(AST.Node)
+    def printNode(self, indent=0):
         raise Exception("printTree not defined in class " + self.__class__.__name__)
 
 
     @addToClass(AST.Program)
-    def printTree(self, indent=0):
+    def printNode(self, indent=0):
         for instruction in self.instructions:
-            TreePrinter.print(instruction, indent)
+            yield instruction, indent
 
     @addToClass(AST.Instruction)
-    def printTree(self, indent=0):
-        TreePrinter.print(self.instruction, indent)
+    def printNode(self, indent=0):
+        yield self.instruction, indent
         if not isinstance(self.args, tuple):
-            TreePrinter.print(self.args, indent+1)
+            yield self.args, indent+1
         else:
             for arg in self.args:
-                TreePrinter.print(arg, indent + 1)
+                yield arg, indent + 1
 
 
     @addToClass(AST.Ifstatement)
-    def printTree(self, indent=0):
+    def printNode(self, indent=0):
         print(TreePrinter.indent_text("IF", indent))
-        TreePrinter.print(self.condition, indent+1)
+        yield self.condition, indent+1
         print(TreePrinter.indent_text("THEN", indent))
-        TreePrinter.print(self.instruction, indent+1)
+        yield self.instruction, indent+1
         if self.elsepart:
             print(TreePrinter.indent_text("ELSE", indent))
-            TreePrinter.print(self.elsepart, indent+1)
+            yield self.elsepart, indent+1
 
 
     @addToClass(AST.Range)
-    def printTree(self, indent=0):
+    def printNode(self, indent=0):
         print(TreePrinter.indent_text("RANGE", indent))
-        TreePrinter.print(self.start, indent+1)
-        TreePrinter.print(self.end, indent+1)
+        yield self.start, indent+1
+        yield self.end, indent+1
 
 
     @addToClass(AST.Assignment)
-    def printTree(self, indent=0):
+    def printNode(self, indent=0):
         print(TreePrinter.indent_text(f"{self.op}", indent))
-        TreePrinter.print(self.id, indent + 1)
-        TreePrinter.print(self.expr, indent + 1)
+        yield self.id, indent + 1
+        yield self.expr, indent + 1
 
     @addToClass(AST.BinaryOperation)
-    def printTree(self, indent=0):
-        TreePrinter.print(self.op, indent)
-        TreePrinter.print(self.left, indent+1)
-        TreePrinter.print(self.right, indent+1)
+    def printNode(self, indent=0):
+        yield self.op, indent
+        yield self.left, indent+1
+        yield self.right, indent+1
 
 
     @addToClass(AST.UnaryOperation)
-    def printTree(self, indent=0):
-        TreePrinter.print(self.op, indent)
-        TreePrinter.print(self.operand, indent+1)
+    def printNode(self, indent=0):
+        yield self.op, indent
+        yield self.operand, indent+1
 
 
     @addToClass(AST.Vector)
-    def printTree(self, indent=0):
+    def printNode(self, indent=0):
         print(TreePrinter.indent_text("VECTOR", indent))
         for element in self.elements:
-            TreePrinter.print(element, indent+1)
+            yield element, indent+1
 
     @addToClass(AST.Reference)
-    def printTree(self, indent=0):
+    def printNode(self, indent=0):
         print(TreePrinter.indent_text("REF", indent))
-        TreePrinter.print(self.id, indent+1)
+        yield self.id, indent+1
         try:
-            TreePrinter.print(self.index.elements, indent+1)  # index is a Vector, by accessing its elements we can omit printing VECTOR, making AST more readable
+            elements = self.index.elements  # index is a Vector, by accessing its elements we can omit printing VECTOR, making AST more readable
         except AttributeError:
             raise Exception("Index can only be a 1D Vector")
+        yield elements, indent+1
 
     @addToClass(AST.Variable)
-    def printTree(self, indent=0):
+    def printNode(self, indent=0):
         print(TreePrinter.indent_text(f"{self.name}", indent))
 
 
     @addToClass(AST.Numeric)
-    def printTree(self, indent=0):
+    def printNode(self, indent=0):
         print(TreePrinter.indent_text(f"{self.value}", indent))
 
 
     @addToClass(AST.String)
-    def printTree(self, indent=0):
+    def printNode(self, indent=0):
         print(TreePrinter.indent_text(f"{self.value}", indent))
 
     @addToClass(AST.Error)
-    def printTree(self, indent=0):
+    def printNode(self, indent=0):
         print(TreePrinter.indent_text("ERROR", indent))
 
@@ -0,0 +1,134 @@
+"""
+Batch checking of many programs: every file is scanned, parsed and analyzed by LexicalAnalyzer in a pool of
+worker processes, which build the Scanner and Parser once, and a single JSON report with the diagnostics
+and timings of every file is written:
+
+    python src/batch.py 'scripts/**/*.txt' other.txt --report report.json
+
+The exit status is 1 if any file has an error.
+"""
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from sly.lex import LexError
+from Scanner import Scanner
+from Parser import Parser
+from LexicalAnalyzer import LexicalAnalyzer
+
+
+_scanner = None  # per worker process
+_parser = None
+
+
+def init_worker():
+    global _scanner, _parser
+    _scanner = Scanner()
+    _parser = Parser()
+
+
+def expand(patterns: list) -> list:
+    """
+    Returns the files matched by the glob patterns, in order and without duplicates.
+    A pattern matching nothing is kept, so that the missing file is reported.
+    """
+    files = []
+    for pattern in patterns:
+        matches = sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+        files.extend(matches or [pattern])
+    return list(dict.fromkeys(files))
+
+
+def diagnostic(stage: str, severity: str, message: str) -> dict:
+    return {'stage': stage, 'severity': severity, 'message': message}
+
+
+def check_file(filename: str) -> dict:
+    """
+    Scans, parses and analyzes the file, returning its diagnostics and the time of each stage in seconds.
+    """
+    if _parser is None:
+        init_worker()
+    diagnostics = []
+    timings = {}
+    result = {'file': filename, 'status': 'ok', 'diagnostics': diagnostics, 'timings': timings}
+
+    start = time.perf_counter()
+    try:
+        with open(filename, "r") as file:
+            text = file.read()
+    except (OSError, UnicodeDecodeError) as e:
+        diagnostics.append(diagnostic('read', 'error', str(e)))
+    timings['read'] = time.perf_counter() - start
+
+    if not diagnostics:
+        start = time.perf_counter()
+        try:
+            ast = _parser.parse(_scanner.tokenize(text))
+        except LexError as e:
+            diagnostics.append(diagnostic('scan', 'error', str(e)))
+        except Exception as e:
+            diagnostics.append(diagnostic('parse', 'error', str(e)))
+        timings['parse'] = time.perf_counter() - start
+
+    if not diagnostics:
+        start = time.perf_counter()
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            try:
+                LexicalAnalyzer().visit(ast)
+            except Exception as e:
+                diagnostics.append(diagnostic('analyze', 'error', f"{type(e).__name__}: {e}"))
+        timings['analyze'] = time.perf_counter() - start
+        diagnostics[:0] = [diagnostic('analyze', 'warning', str(warning.message)) for warning in caught]
+
+    if any(item['severity'] == 'error' for item in diagnostics):
+        result['status'] = 'error'
+    elif diagnostics:
+        result['status'] = 'warning'
+    return result
+
+
+def check_files(files: list, jobs: int | None = None) -> list:
+    """
+    Checks the files in jobs worker processes (all cores by default), returning the results in the order of the files.
+    With a single job the files are checked in this process.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(files) <= 1:
+        return [check_file(filename) for filename in files]
+    chunksize = max(1, len(files) // (jobs * 4))  # small files are sent in batches to amortize the messaging
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker) as executor:
+        return list(executor.map(check_file, files, chunksize=chunksize))
+
+
+def summarize(results: list, seconds: float, jobs: int) -> dict:
+    summary = {'files': len(results), 'seconds': seconds, 'jobs': jobs}
+    for status in ('ok', 'warning', 'error'):
+        summary[status] = sum(1 for result in results if result['status'] == status)
+    return summary
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description="Scan, parse and analyze many programs in parallel")
+    argument_parser.add_argument('patterns', nargs='+', help="files or glob patterns ('**' matches directories)")
+    argument_parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count(), help="number of worker processes")
+    argument_parser.add_argument('--report', help="file to write the JSON report to instead of the standard output")
+    args = argument_parser.parse_args()
+
+    files = expand(args.patterns)
+    start = time.perf_counter()
+    results = check_files(files, args.jobs)
+    report = {'summary': summarize(results, time.perf_counter() - start, args.jobs), 'files': results}
+
+    if args.report:
+        with open(args.report, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    sys.exit(1 if report['summary']['error'] else 0)
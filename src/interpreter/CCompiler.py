@@ -0,0 +1,734 @@
+import os
+import sys
+import stat
+import ctypes
+import hashlib
+import subprocess
+from dataclasses import dataclass
+import AST
+from SymbolTable import SymbolTable, VariableSymbol
+from interpreter.Interpreter import Interpreter
+from interpreter.Operations import ASSIGNMENT_OPERATORS
+from interpreter.visit import *
+
+CC = os.environ.get('CC', 'cc')
+CFLAGS = ['-O2', '-shared', '-fPIC', '-ffp-contract=off']  # no fused multiply-add, which Python does not do
+# private to the user: the shared objects found there are loaded into the process
+CACHE_DIRECTORY = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                               'c-like-native')
+MAX_ELEMENTS = 1 << 24  # of a matrix, whose storage is static
+
+_libraries = {}  # hash of the C source -> loaded shared object
+
+INT, FLOAT, BOOL, STRING = 'int', 'float', 'bool', 'str'
+C_TYPES = {INT: 'long long', FLOAT: 'double', BOOL: 'int'}
+PUT = {INT: 'put_int', FLOAT: 'put_float', BOOL: 'put_bool'}
+SAMPLES = {INT: 1, FLOAT: 1.0, BOOL: True}
+TYPE_NAMES = {int: INT, float: FLOAT, bool: BOOL}
+
+# errors of the native program, after which the Interpreter runs the program instead
+ERRORS = {
+    1: "integer overflow",
+    2: "division by zero",
+    3: "index out of bounds",
+    4: "variable read before its assignment",
+    5: "integer not exactly representable as a float",
+    6: "out of memory",
+}
+
+RUNTIME = r'''
+#include <math.h>
+#include <limits.h>
+#include <setjmp.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+enum { OVERFLOW = 1, ZERO_DIVISION, INDEX_ERROR, UNDEFINED, INEXACT, NO_MEMORY };
+
+static jmp_buf failure;
+static char *output;
+static size_t length, capacity;
+
+static void fail(int error) { longjmp(failure, error); }
+
+static void put(const char *text, size_t size) {
+    if (length + size > capacity) {
+        size_t grown = capacity ? capacity : 4096;
+        while (grown < length + size) grown *= 2;
+        char *buffer = realloc(output, grown);
+        if (!buffer) fail(NO_MEMORY);
+        output = buffer;
+        capacity = grown;
+    }
+    memcpy(output + length, text, size);
+    length += size;
+}
+
+static void put_int(long long value) {
+    char text[24];
+    put(text, snprintf(text, sizeof text, "%lld", value));
+}
+
+static inline void put_bool(int value) {
+    if (value) put("True", 4); else put("False", 5);
+}
+
+/* the shortest digits reading back as the value, closest to it, in the notation of repr of Python floats */
+static void put_float(double value) {
+    char text[40], digits[24];
+    long long mantissa = 0;
+    int scale = 0, n, exponent, r = 0;
+    if (isnan(value)) { put("nan", 3); return; }
+    if (signbit(value)) { put("-", 1); value = -value; }
+    if (isinf(value)) { put("inf", 3); return; }
+    for (int precision = 1; precision <= 17; precision++) {
+        snprintf(text, sizeof text, "%.*e", precision - 1, value);
+        char *e = strchr(text, 'e');
+        mantissa = 0;
+        for (char *p = text; p < e; p++) if (*p != '.') mantissa = mantissa * 10 + (*p - '0');
+        scale = atoi(e + 1) - (precision - 1);
+        if (strtod(text, NULL) == value) break;
+        /* the closest digits may be outside of the interval rounding to the value, while a neighbour is not */
+        snprintf(text, sizeof text, "%llde%d", mantissa - 1, scale);
+        if (mantissa > 1 && strtod(text, NULL) == value) { mantissa--; break; }
+        snprintf(text, sizeof text, "%llde%d", mantissa + 1, scale);
+        if (strtod(text, NULL) == value) { mantissa++; break; }
+    }
+    n = snprintf(digits, sizeof digits, "%lld", mantissa);
+    exponent = scale + n - 1;
+    while (n > 1 && digits[n - 1] == '0') n--;
+    if (exponent < -4 || exponent >= 16) {
+        text[r++] = digits[0];
+        if (n > 1) { text[r++] = '.'; memcpy(text + r, digits + 1, n - 1); r += n - 1; }
+        r += snprintf(text + r, sizeof text - r, "e%c%02d", exponent < 0 ? '-' : '+', abs(exponent));
+    } else if (exponent < 0) {
+        text[r++] = '0';
+        text[r++] = '.';
+        for (int i = -1; i > exponent; i--) text[r++] = '0';
+        memcpy(text + r, digits, n);
+        r += n;
+    } else {
+        for (int i = 0; i <= exponent; i++) text[r++] = i < n ? digits[i] : '0';
+        text[r++] = '.';
+        if (n > exponent + 1) { memcpy(text + r, digits + exponent + 1, n - exponent - 1); r += n - exponent - 1; }
+        else text[r++] = '0';
+    }
+    put(text, r);
+}
+
+#define PUT_MATRIX(name, type, put_element) \
+static inline void name(const type *elements, long rows, long columns) { \
+    put("[", 1); \
+    for (long i = 0; i < rows; i++) { \
+        put(i ? ", [" : "[", i ? 3 : 1); \
+        for (long j = 0; j < columns; j++) { \
+            if (j) put(", ", 2); \
+            put_element(elements[i * columns + j]); \
+        } \
+        put("]", 1); \
+    } \
+    put("]", 1); \
+}
+PUT_MATRIX(put_int_matrix, long long, put_int)
+PUT_MATRIX(put_float_matrix, double, put_float)
+
+static inline long long add_int(long long a, long long b) {
+    long long result;
+    if (__builtin_add_overflow(a, b, &result)) fail(OVERFLOW);
+    return result;
+}
+
+static inline long long sub_int(long long a, long long b) {
+    long long result;
+    if (__builtin_sub_overflow(a, b, &result)) fail(OVERFLOW);
+    return result;
+}
+
+static inline long long mul_int(long long a, long long b) {
+    long long result;
+    if (__builtin_mul_overflow(a, b, &result)) fail(OVERFLOW);
+    return result;
+}
+
+static inline long long neg_int(long long a) {
+    if (a == LLONG_MIN) fail(OVERFLOW);
+    return -a;
+}
+
+/* Python compares integers with floats and divides integers exactly */
+static inline double exact(long long a) {
+    if (a > (1LL << 53) || a < -(1LL << 53)) fail(INEXACT);
+    return (double)a;
+}
+
+static inline double divide(double a, double b) {
+    if (b == 0.0) fail(ZERO_DIVISION);
+    return a / b;
+}
+
+static inline long position(long long index, long size) {
+    if (index < 0) index += size;
+    if (index < 0 || index >= size) fail(INDEX_ERROR);
+    return (long)index;
+}
+
+static void program(void);
+
+int run(char **text, size_t *size) {
+    int error = setjmp(failure);
+    if (error) {
+        free(output);
+        output = NULL;
+        length = capacity = 0;
+        return error;
+    }
+    program();
+    *text = output;
+    *size = length;
+    output = NULL;
+    length = capacity = 0;
+    return 0;
+}
+
+void release(char *text) {
+    free(text);
+}
+'''
+
+
+class Unsupported(Exception):
+    """
+    Raised for a construct outside of the part of the language compiled to C.
+    """
+
+
+@dataclass(frozen=True)
+class MatrixType:
+    element: str
+    rows: int
+    columns: int
+
+    @property
+    def size(self) -> int:
+        return self.rows * self.columns
+
+
+class CGenerator(object):
+    """
+    Translates AST.Program to a C function printing to a buffer.
+
+    Every variable has a single static type, the one of its first assignment: an int, float or bool scalar,
+    or an int or float matrix of a fixed shape, as built by zeros, ones, eye or a vector literal.
+    Block scoping is resolved statically through the symbol tables, like in the BytecodeCompiler, and a variable
+    is checked for an assignment only when it may not have one; a block in a loop unsets the assignment flags of
+    its variables each time it is entered. Operations whose result could differ from Python,
+    like an integer overflow or a division by zero, end the program with an error instead.
+    Matrices are stored in static arrays, and matrix expressions are computed by loops over their elements.
+    """
+    def __init__(self):
+        self.symbol_table = SymbolTable(parent_scope=None, name="global")
+        self.variables = 0
+        self.declarations = []  # of the scalar variables and locals of the program function
+        self.arrays = []  # static storage of the matrices
+        self.lines = []
+        self.depth = 1
+        self.assigned = set()  # slots of the variables assigned on every path to the current statement
+        self.checked = set()  # slots of the variables with an assignment flag
+        self.loops = 0
+        self.end = None  # label ending the top-level statement, for a break or continue outside of loops
+        self.ended = False  # the label is used
+        self.copies = False  # a matrix variable was assigned another one, which Python would share
+        self.stores = False  # an element of a matrix was assigned
+
+    def generate(self, program) -> str:
+        # a break or continue outside of a loop ends the top-level instruction, as in the Interpreter
+        for number, instruction in enumerate(program.instructions):
+            self.end, self.ended = f"end{number}", False
+            self.statement(instruction)
+            if self.ended:
+                self.emit(f"{self.end}: ;")
+        if self.copies and self.stores:
+            raise Unsupported("assignment of a matrix to another variable")
+        # only the variables which may be read before their assignment keep a flag
+        declarations = self.declarations + [f"int d{slot} = 0;" for slot in sorted(self.checked)]
+        body = [line for line in self.lines if not line.endswith("= 1; /* assigned */")
+                or int(line.split()[0][1:]) in self.checked]
+        return "\n".join([RUNTIME] + self.arrays + ["static void program(void) {"]
+                         + ["    " + declaration for declaration in declarations] + body + ["}"])
+
+    def emit(self, line: str):
+        self.lines.append("    " * self.depth + line)
+
+    def local(self, type_, code: str) -> str:
+        """
+        Returns a new local holding the value of the scalar code.
+        """
+        name = f"s{len(self.declarations)}"
+        self.declarations.append(f"{C_TYPES[type_]} {name};")
+        self.emit(f"{name} = {code};")
+        return name
+
+    def array(self, type_: MatrixType, name: str | None = None) -> str:
+        if type_.size > MAX_ELEMENTS:
+            raise Unsupported(f"matrix of {type_.size} elements")
+        name = name or f"m{len(self.arrays)}"
+        self.arrays.append(f"static {C_TYPES[type_.element]} {name}[{max(type_.size, 1)}];")
+        return name
+
+    def declare(self, name: str, type_, symbol_table: SymbolTable) -> VariableSymbol:
+        symbol = VariableSymbol(name=name, type_=type_, slot=self.variables)
+        self.variables += 1
+        symbol_table.put(symbol)
+        if isinstance(type_, MatrixType):
+            self.array(type_, self.variable(symbol))
+        else:
+            self.declarations.append(f"{C_TYPES[type_]} {self.variable(symbol)} = 0;")
+        return symbol
+
+    @staticmethod
+    def variable(symbol: VariableSymbol) -> str:
+        """
+        Returns the C variable of the symbol, the array of a matrix.
+        """
+        return f"v{symbol.slot}"
+
+    def store(self, name: str, type_, symbol_table: SymbolTable | None = None) -> VariableSymbol:
+        """
+        Returns the symbol of an assignment target of the type, declaring it if it is not visible.
+        """
+        symbol = self.symbol_table.get(name) if symbol_table is None else symbol_table.symbols.get(name)
+        if symbol is None:
+            return self.declare(name, type_, symbol_table or self.symbol_table)
+        if symbol.type != type_:
+            raise Unsupported(f"variable {name} of type {symbol.type} assigned a {type_}")
+        return symbol
+
+    def assign(self, symbol: VariableSymbol):
+        self.emit(f"d{symbol.slot} = 1; /* assigned */")
+        self.assigned.add(symbol.slot)
+
+    def statement(self, node):
+        if self.compile(node) is not None:  # the dispatch found no method for the node
+            raise Unsupported(f"{type(node).__name__} statement")
+
+    def body(self, node):
+        self.depth += 1
+        self.statement(node)
+        self.depth -= 1
+
+    def condition(self, node) -> str:
+        code, type_ = self.expression(node)
+        if isinstance(type_, MatrixType) or type_ == STRING:
+            raise Unsupported(f"condition of type {type_}")
+        return code
+
+    def expression(self, node, target: str | None = None) -> tuple:
+        """
+        Returns the code and the type of a scalar expression, or the array and the type of a matrix expression,
+        computed into the target array when it is given and the elements can be computed in place.
+        """
+        result = self.compile_expression(node, target)
+        if isinstance(result, list):
+            raise Unsupported(f"{type(node).__name__} in an expression")
+        return result
+
+    @on('node')
+    def compile(self, node):
+        pass
+
+    @when(AST.Block)
+    def compile(self, node):
+        self.symbol_table = SymbolTable(parent_scope=self.symbol_table, name="block")
+        start = len(self.lines)
+        for instruction in node.instructions:
+            self.statement(instruction)
+        if self.loops:
+            # the checked variables of the block are unassigned at its start, whatever its previous run assigned
+            slots = sorted(symbol.slot for symbol in self.symbol_table.symbols.values() if symbol.slot in self.checked)
+            self.lines[start:start] = ["    " * self.depth + f"d{slot} = 0;" for slot in slots]
+        self.symbol_table = self.symbol_table.parent_scope
+
+    @when(AST.FunctionalInstruction)
+    def compile(self, node):
+        if node.instruction != 'print':
+            raise Unsupported(f"{node.instruction} as a statement")
+        for number, arg in enumerate(node.args):
+            if number:
+                self.emit('put(" ", 1);')
+            if isinstance(arg, AST.String):
+                data = arg.value.encode()
+                literal = "".join(f"\\{byte:03o}" for byte in data)
+                self.emit(f'put("{literal}", {len(data)});')
+                continue
+            code, type_ = self.expression(arg)
+            if isinstance(type_, MatrixType):
+                self.emit(f"put_{type_.element}_matrix({code}, {type_.rows}, {type_.columns});")
+            elif type_ == STRING:
+                raise Unsupported("string expression")
+            else:
+                self.emit(f"{PUT[type_]}({code});")
+        self.emit('put("\\n", 1);')
+
+    @when(AST.WhileInstruction)
+    def compile(self, node):
+        assigned = self.assigned
+        self.emit(f"while ({self.condition(node.condition)}) {{")
+        self.loop_body(node.body, assigned)
+        self.emit("}")
+        self.assigned = assigned
+
+    def loop_body(self, body, assigned: set):
+        self.assigned = set(assigned)
+        self.loops += 1
+        self.body(body)
+        self.loops -= 1
+
+    @when(AST.ForLoopInstruction)
+    def compile(self, node):
+        # range bounds are evaluated before the loop variable is bound, as in the Interpreter
+        bounds = []
+        for bound in (node.range.start, node.range.end):
+            code, type_ = self.expression(bound)
+            if type_ != INT:
+                raise Unsupported(f"range bound of type {type_}")
+            bounds.append(self.local(INT, code))
+        start, end = bounds
+        # the loop variable is always declared in the current scope
+        variable = self.store(node.id.name, INT, self.symbol_table)
+        self.emit(f"{self.variable(variable)} = {start};")
+        self.assign(variable)
+        assigned = self.assigned
+        counter = self.local(INT, start)
+        self.emit(f"for (; {counter} < {end}; {counter}++) {{")
+        self.depth += 1
+        self.emit(f"{self.variable(variable)} = {counter};")
+        self.depth -= 1
+        self.loop_body(node.body, assigned)
+        self.emit("}")
+        self.assigned = assigned
+
+    @when(AST.FlowControlInstruction)
+    def compile(self, node):
+        if node.instruction not in ('break', 'continue'):
+            raise Unsupported(node.instruction)
+        if self.loops:
+            self.emit(f"{node.instruction};")
+        else:
+            self.ended = True
+            self.emit(f"goto {self.end};")
+
+    @when(AST.Ifstatement)
+    def compile(self, node):
+        self.emit(f"if ({self.condition(node.condition)}) {{")
+        assigned = self.assigned
+        self.assigned = set(assigned)
+        self.body(node.instruction)
+        assigned_instruction = self.assigned
+        self.assigned = set(assigned)
+        if node.elsepart:
+            self.emit("} else {")
+            self.body(node.elsepart)
+        self.emit("}")
+        self.assigned &= assigned_instruction
+
+    @when(AST.Assignment)
+    def compile(self, node):
+        if isinstance(node.id, AST.Reference):
+            self.store_element(node)
+            return
+        name = node.id.name
+        if node.op in ASSIGNMENT_OPERATORS:
+            # x op= v is x = x op v, which builds a new matrix
+            value = self.operation(ASSIGNMENT_OPERATORS[node.op], self.expression(node.id), self.expression(node.expr))
+        else:
+            symbol = self.symbol_table.get(name)
+            target = self.variable(symbol) if symbol is not None and isinstance(symbol.type, MatrixType) else None
+            value = self.expression(node.expr, target)
+        code, type_ = value
+        if type_ == STRING:
+            raise Unsupported("string variable")
+        symbol = self.store(name, type_)
+        if isinstance(type_, MatrixType):
+            if code != self.variable(symbol):
+                self.copies |= isinstance(node.expr, AST.Variable)
+                self.emit(f"memcpy({self.variable(symbol)}, {code}, sizeof {self.variable(symbol)});")
+        else:
+            self.emit(f"{self.variable(symbol)} = {code};")
+        self.assign(symbol)
+
+    def store_element(self, node):
+        reference = node.id
+        code, type_ = self.expression(node.expr)
+        matrix, matrix_type = self.expression(reference.id)
+        if not isinstance(matrix_type, MatrixType):
+            raise Unsupported("index of a scalar")
+        element = self.element(matrix, matrix_type, reference.index)
+        if node.op in ASSIGNMENT_OPERATORS:
+            code, type_ = self.operation(ASSIGNMENT_OPERATORS[node.op], (element, matrix_type.element), (code, type_))
+        if type_ != matrix_type.element:
+            raise Unsupported(f"{type_} stored in a matrix of {matrix_type.element}")
+        self.emit(f"{element} = {code};")
+        self.stores = True
+
+    def element(self, matrix: str, type_: MatrixType, index) -> str:
+        if len(index.elements) != 2:
+            raise Unsupported("row of a matrix")
+        positions = []
+        for i, size in zip(index.elements, (type_.rows, type_.columns)):
+            code, index_type = self.expression(i)
+            if index_type != INT:
+                raise Unsupported(f"index of type {index_type}")
+            positions.append(f"position({code}, {size})")
+        row, column = positions
+        return f"{matrix}[{row} * {type_.columns} + {column}]"
+
+    @on('node')
+    def compile_expression(self, node, target):
+        pass
+
+    @when(AST.Variable)
+    def compile_expression(self, node, target):
+        symbol = self.symbol_table.get(node.name)
+        if symbol is None:
+            raise Unsupported(f"variable {node.name} read before its declaration")
+        if symbol.slot not in self.assigned:
+            self.emit(f"if (!d{symbol.slot}) fail(UNDEFINED);")
+            self.checked.add(symbol.slot)
+            self.assigned.add(symbol.slot)
+        return self.variable(symbol), symbol.type
+
+    @when(AST.Integer)
+    def compile_expression(self, node, target):
+        if not -2 ** 63 < node.value < 2 ** 63:
+            raise Unsupported("integer out of the 64-bit range")
+        return f"{node.value}LL", INT
+
+    @when(AST.Float)
+    def compile_expression(self, node, target):
+        return repr(node.value), FLOAT
+
+    @when(AST.String)
+    def compile_expression(self, node, target):
+        return None, STRING
+
+    @when(AST.Reference)
+    def compile_expression(self, node, target):
+        matrix, type_ = self.expression(node.id)
+        if not isinstance(type_, MatrixType):
+            raise Unsupported("index of a scalar")
+        return self.element(matrix, type_, node.index), type_.element
+
+    @when(AST.BinaryOperation)
+    def compile_expression(self, node, target):
+        return self.operation(node.op, self.expression(node.left), self.expression(node.right), target)
+
+    @when(AST.UnaryOperation)
+    def compile_expression(self, node, target):
+        code, type_ = self.expression(node.operand)
+        if node.op == '-':
+            if not isinstance(type_, MatrixType):
+                return self.negation(code, type_)
+            result = MatrixType(type_.element, type_.rows, type_.columns)
+            return self.elementwise(result, target, self.negation(f"{code}[k]", type_.element)[0])
+        if not isinstance(type_, MatrixType):
+            raise Unsupported("transpose of a scalar")
+        result = MatrixType(type_.element, type_.columns, type_.rows)
+        array = self.array(result)
+        self.emit(f"for (long i = 0; i < {type_.rows}; i++) for (long j = 0; j < {type_.columns}; j++) "
+                  f"{array}[j * {type_.rows} + i] = {code}[i * {type_.columns} + j];")
+        return array, result
+
+    @staticmethod
+    def negation(code: str, type_) -> tuple:
+        if type_ == FLOAT:
+            return f"(-{code})", FLOAT
+        if type_ == STRING:
+            raise Unsupported("negation of a string")
+        return f"neg_int({code})", INT
+
+    @when(AST.FunctionalInstruction)
+    def compile_expression(self, node, target):
+        if len(node.args) not in ((1, 2) if node.instruction != 'eye' else range(1, len(node.args) + 1)):
+            raise Unsupported(f"{node.instruction} of {len(node.args)} arguments")
+        dimensions = []
+        for arg in node.args:
+            if not isinstance(arg, AST.Integer) or arg.value < 0:
+                raise Unsupported(f"{node.instruction} of a shape not known before running")
+            dimensions.append(arg.value)
+        if node.instruction == 'eye':
+            rows = columns = dimensions[0]
+        else:
+            columns, rows = (dimensions[0], dimensions[0]) if len(dimensions) == 1 else dimensions
+        type_ = MatrixType(INT, rows, columns)
+        array = target or self.array(type_)
+        if node.instruction == 'eye':
+            self.emit(f"for (long k = 0; k < {type_.size}; k++) {array}[k] = k % {rows + 1} == 0;")
+        else:
+            self.emit(f"for (long k = 0; k < {type_.size}; k++) {array}[k] = {int(node.instruction == 'ones')};")
+        return array, type_
+
+    @when(AST.Vector)
+    def compile_expression(self, node, target):
+        if not node.elements or not all(isinstance(row, AST.Vector) for row in node.elements) \
+                or len({len(row.elements) for row in node.elements}) != 1:
+            raise Unsupported("vector which is not a matrix")
+        elements = [self.expression(element) for row in node.elements for element in row.elements]
+        types = {type_ for _, type_ in elements}
+        if len(types) != 1 or not types <= {INT, FLOAT}:
+            raise Unsupported("vector of mixed or non-numeric elements")
+        type_ = MatrixType(types.pop(), len(node.elements), len(node.elements[0].elements))
+        array = self.array(type_)
+        for k, (code, _) in enumerate(elements):
+            self.emit(f"{array}[{k}] = {code};")
+        return array, type_
+
+    def operation(self, op: str, left: tuple, right: tuple, target: str | None = None) -> tuple:
+        (left, left_type), (right, right_type) = left, right
+        if STRING in (left_type, right_type):
+            raise Unsupported("string operation")
+        left_matrix, right_matrix = isinstance(left_type, MatrixType), isinstance(right_type, MatrixType)
+        if not left_matrix and not right_matrix:
+            if op.startswith('.'):
+                raise Unsupported(f"{op} of scalars")
+            return self.scalar(op, left, left_type, right, right_type)
+        if op in ('==', '!=', '>', '<', '>=', '<='):
+            raise Unsupported(f"{op} of matrices")
+
+        if left_matrix and right_matrix:
+            if op == '*':
+                return self.product(left, left_type, right, right_type)
+            if (left_type.rows, left_type.columns) != (right_type.rows, right_type.columns):
+                raise Unsupported("operation of matrices of different shapes")
+            code, element = self.scalar(op.lstrip('.'), f"{left}[k]", left_type.element,
+                                        f"{right}[k]", right_type.element)
+            shape = left_type
+        elif left_matrix:
+            if op.startswith('.'):
+                raise Unsupported(f"{op} of a matrix and a scalar")
+            right = self.local(right_type, right)
+            code, element = self.scalar(op, f"{left}[k]", left_type.element, right, right_type)
+            shape = left_type
+        else:
+            if op.startswith('.') or op == '/':
+                raise Unsupported(f"{op} of a scalar and a matrix")
+            left = self.local(left_type, left)
+            code, element = self.scalar(op, left, left_type, f"{right}[k]", right_type.element)
+            shape = right_type
+        return self.elementwise(MatrixType(element, shape.rows, shape.columns), target, code)
+
+    def elementwise(self, type_: MatrixType, target: str | None, code: str) -> tuple:
+        array = target or self.array(type_)
+        self.emit(f"for (long k = 0; k < {type_.size}; k++) {array}[k] = {code};")
+        return array, type_
+
+    def product(self, left: str, left_type: MatrixType, right: str, right_type: MatrixType) -> tuple:
+        if left_type.element != INT or right_type.element != INT:
+            raise Unsupported("product of float matrices, whose sums are ordered differently by NumPy")
+        if left_type.columns != right_type.rows:
+            raise Unsupported("product of matrices of mismatched shapes")
+        type_ = MatrixType(INT, left_type.rows, right_type.columns)
+        array = self.array(type_)
+        inner = left_type.columns
+        self.emit(f"for (long i = 0; i < {type_.rows}; i++) for (long j = 0; j < {type_.columns}; j++) {{")
+        self.emit("    long long sum = 0;")
+        self.emit(f"    for (long k = 0; k < {inner}; k++) "
+                  f"sum = add_int(sum, mul_int({left}[i * {inner} + k], {right}[k * {type_.columns} + j]));")
+        self.emit(f"    {array}[i * {type_.columns} + j] = sum;")
+        self.emit("}")
+        return array, type_
+
+    @staticmethod
+    def scalar(op: str, left: str, left_type: str, right: str, right_type: str) -> tuple:
+        """
+        Returns the code and the type of the operation of scalars, whose type is the one Python gives.
+        """
+        type_ = TYPE_NAMES[type(eval(f"a {op} b", {'a': SAMPLES[left_type], 'b': SAMPLES[right_type]}))]
+        if op == '/':
+            if left_type != FLOAT:
+                left = f"exact({left})"
+            if right_type != FLOAT:
+                right = f"exact({right})"
+            return f"divide({left}, {right})", FLOAT
+        if type_ == INT:
+            function = {'+': 'add_int', '-': 'sub_int', '*': 'mul_int'}[op]
+            return f"{function}({left}, {right})", INT
+        if type_ == BOOL and FLOAT in (left_type, right_type) and left_type != right_type:
+            # an integer compared with a float
+            if left_type != FLOAT:
+                left = f"exact({left})"
+            else:
+                right = f"exact({right})"
+        return f"({left} {op} {right})", type_
+
+
+class CCompiler(object):
+    """
+    Execution backend that translates AST.Program to C, compiles it with the system C compiler to a shared object
+    and runs it through ctypes. Like the Interpreter, it is run with ast.accept(CCompiler()).
+
+    The shared objects are cached in a directory under the hash of their C source, so an unchanged program is only
+    compiled once. The directory must be private to the user, otherwise another user could plant a shared object
+    under the name of a program; the program is then interpreted. The output is buffered and printed once the native
+    program has ended, so that a program using constructs that cannot be compiled, nested too deeply to be translated,
+    or ending with an error, like an integer overflow, is run by the Interpreter instead, from the start; fallback then
+    tells why.
+    """
+    def __init__(self, cache_directory: str = CACHE_DIRECTORY):
+        self.cache_directory = cache_directory
+        self.fallback = None
+
+    def visit(self, node):
+        try:
+            with recursion_limit():  # the generator recurses as deep as the tree
+                source = CGenerator().generate(node)
+            library = self.load(source)
+        except (Unsupported, RecursionError, OSError, subprocess.CalledProcessError) as e:
+            return self.interpret(node, str(e) or type(e).__name__)
+        text, size = ctypes.POINTER(ctypes.c_char)(), ctypes.c_size_t()
+        error = library.run(ctypes.byref(text), ctypes.byref(size))
+        if error:
+            return self.interpret(node, ERRORS.get(error, f"error {error}"))
+        try:
+            sys.stdout.write(ctypes.string_at(text, size.value).decode())
+        finally:
+            library.release(text)
+
+    def interpret(self, node, reason: str):
+        self.fallback = reason
+        return Interpreter().visit(node)
+
+    def load(self, source: str):
+        """
+        Returns the shared object compiled from the C source, compiling it unless it is cached.
+        """
+        key = hashlib.sha256(source.encode()).hexdigest()
+        library = _libraries.get(key)
+        if library is not None:
+            return library
+        self.check_cache_directory()
+        path = os.path.join(self.cache_directory, key + '.so')
+        if not os.path.exists(path):
+            temporary = f"{path}.{os.getpid()}"
+            try:
+                subprocess.run([CC, *CFLAGS, '-x', 'c', '-', '-o', temporary, '-lm'], input=source.encode(),
+                               check=True, capture_output=True)
+                os.replace(temporary, path)  # concurrent runs never load a partial shared object
+            finally:
+                if os.path.exists(temporary):
+                    os.remove(temporary)
+        library = _libraries[key] = ctypes.CDLL(path)
+        library.run.argtypes = [ctypes.POINTER(ctypes.POINTER(ctypes.c_char)), ctypes.POINTER(ctypes.c_size_t)]
+        library.release.argtypes = [ctypes.POINTER(ctypes.c_char)]
+        return library
+
+    def check_cache_directory(self):
+        """
+        Creates the cache directory, accessible only to the user, and checks that it is a directory owned by the user
+        that no one else can write to.
+        """
+        os.makedirs(self.cache_directory, mode=0o700, exist_ok=True)
+        status = os.lstat(self.cache_directory)
+        owned = not hasattr(os, 'getuid') or status.st_uid == os.getuid()
+        if not stat.S_ISDIR(status.st_mode) or not owned or status.st_mode & 0o077:
+            raise OSError(f"cache directory {self.cache_directory} is not private to the user")
@@ -0,0 +1,389 @@
+import AST
+from SymbolTable import SymbolTable, VectorType
+from LexicalAnalyzer import ExpressionTypes, infer_types
+from interpreter.Memory import *
+from interpreter.Signals import BREAK, CONTINUE
+from interpreter.Operations import *
+from interpreter.Matrix import Matrix, arithmetic
+from interpreter.visit import *
+import operator
+
+
+def _scalar_closures(symbol: str) -> tuple:
+    """
+    Returns the factories of the closures computing left symbol right with the operator inlined, for two evaluated
+    operands, a constant right operand and a constant left operand, which is captured instead of evaluated.
+    """
+    return eval(f"(lambda left, right: lambda: left() {symbol} right(),"
+                f" lambda left, right: lambda: left() {symbol} right,"
+                f" lambda left, right: lambda: left {symbol} right())")
+
+
+# closures of the operations on numbers, which compute the same as the generic operators for any operands
+SCALAR_OPERATIONS = {op: _scalar_closures(op) for op in ('+', '-', '*', '/', '==', '!=', '>', '<', '>=', '<=')}
+
+ARRAY_OPERATIONS = {
+    '.+': operator.add,
+    '.-': operator.sub,
+    '.*': operator.mul,
+    './': operator.truediv,
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.matmul,
+}
+
+LITERALS = (AST.Integer, AST.Float, AST.String)
+
+
+def known_shape(type_) -> bool:
+    return isinstance(type_, VectorType) and type_.shape is not None and None not in type_.shape
+
+
+class ClosureCompiler(object):
+    """
+    Execution backend that compiles the AST once into a tree of pre-bound closures.
+
+    Every node is dispatched a single time during compilation: operators are resolved to plain functions
+    and child evaluators are captured, so running the program performs no per-node dispatch.
+    Variables are resolved during compilation to (depth, slot) pairs of the scopes' symbol tables
+    and stored in the flat frames of a FrameStack.
+    Like the Interpreter, it is run with ast.accept(ClosureCompiler()).
+
+    Break and continue are returned as signals by the statement closures. Only the statements that can end
+    with a signal, which are known during compilation, are compiled to closures checking for it.
+
+    Operations are specialized by the types the LexicalAnalyzer inferred for them, given as ExpressionTypes or
+    inferred when the program is compiled: arithmetic and comparisons of numbers inline the operator and capture
+    constant operands, and the operations of matrices of known shapes run the array kernel directly. As the types
+    of a variable can change later in a loop, a matrix kernel checks its operands and falls back to the generic
+    operation, while the scalar closures compute the same as the generic operators for any operands.
+    """
+    def __init__(self, types: ExpressionTypes | None = None):
+        self.frame_stack = FrameStack()
+        self.symbol_table = SymbolTable(parent_scope=None, name="global")
+        self.unresolved = []  # variables read before their declaration was compiled
+        self.signalling = set()  # statement closures which can return a signal
+        self.given_types = types
+        self.types = types or ExpressionTypes()
+
+    def visit(self, node):
+        self.frame_stack = FrameStack()
+        self.symbol_table = SymbolTable(parent_scope=None, name="global")
+        self.unresolved = []
+        self.signalling = set()
+        self.types = self.given_types if self.given_types is not None else infer_types(node)
+        with recursion_limit():  # compiling and running the closures recurses as deep as the tree
+            return self.compile(node)()
+
+    def enter_scope(self, name):
+        self.symbol_table = SymbolTable(parent_scope=self.symbol_table, name=name)
+        self.frame_stack.frame(self.symbol_table.depth)
+
+    def exit_scope(self):
+        self.frame_stack.allocate(self.symbol_table.depth, len(self.symbol_table.symbols))
+        self.symbol_table = self.symbol_table.parent_scope
+
+    def resolve_deferred(self):
+        """
+        Binds the variables read before their declaration, e.g. in loops, once all scopes have been compiled.
+        """
+        for symbol_table, name, location in self.unresolved:
+            resolved = symbol_table.resolve(name)
+            if resolved is not None:
+                depth, slot = resolved
+                location.extend((self.frame_stack.frames[depth], slot))
+        self.unresolved = []
+
+    def store(self, name):
+        """
+        Returns the frame and slot of an assignment target, declaring it in the current scope if it is not visible.
+        """
+        resolved = self.symbol_table.resolve(name)
+        if resolved is None:
+            resolved = self.symbol_table.depth, self.symbol_table.declare(name).slot
+        depth, slot = resolved
+        return self.frame_stack.frames[depth], slot
+
+    @on('node')
+    def compile(self, node):
+        pass
+
+    @when(AST.Program)
+    def compile(self, node):
+        self.frame_stack.frame(self.symbol_table.depth)
+        instructions = tuple(self.compile(instruction) for instruction in node.instructions)
+        self.frame_stack.allocate(self.symbol_table.depth, len(self.symbol_table.symbols))
+        self.resolve_deferred()
+
+        def program():
+            for instruction in instructions:
+                instruction()
+        return program
+
+    @when(AST.Block)
+    def compile(self, node):
+        self.enter_scope("block")
+        instructions = tuple(self.compile(instruction) for instruction in node.instructions)
+        frame, size = self.frame_stack.frames[self.symbol_table.depth], len(self.symbol_table.symbols)
+        self.exit_scope()
+
+        if size:
+            # the variables of the block are unassigned each time it is entered, e.g. by a loop
+            unassigned = (UNDEFINED,) * size
+
+            def reset():
+                frame[:size] = unassigned
+            instructions = (reset,) + instructions
+
+        if not self.signalling.intersection(instructions):
+            def block():
+                for instruction in instructions:
+                    instruction()
+            return block
+
+        def signalling_block():
+            for instruction in instructions:
+                signal = instruction()
+                if signal is not None:
+                    return signal
+        self.signalling.add(signalling_block)
+        return signalling_block
+
+    @when(AST.FunctionalInstruction)
+    def compile(self, node):
+        args = tuple(self.compile(arg) for arg in node.args)
+
+        if node.instruction == 'print':
+            def print_instruction():
+                print(format_values(*[arg() for arg in args]))
+            return print_instruction
+
+        constructor = MATRIX_CONSTRUCTORS[node.instruction]
+
+        def matrix():
+            return constructor(*[arg() for arg in args])
+        return matrix
+
+    @when(AST.WhileInstruction)
+    def compile(self, node):
+        condition = self.compile(node.condition)
+        body = self.compile(node.body)
+
+        if body not in self.signalling:
+            def while_loop():
+                while condition():
+                    body()
+            return while_loop
+
+        def signalling_while_loop():
+            while condition():
+                if body() is BREAK:
+                    break
+        return signalling_while_loop
+
+    @when(AST.ForLoopInstruction)
+    def compile(self, node):
+        start = self.compile(node.range.start)
+        end = self.compile(node.range.end)
+        # the loop variable is always declared in the current scope
+        frame = self.frame_stack.frames[self.symbol_table.depth]
+        slot = self.symbol_table.declare(node.id.name).slot
+        body = self.compile(node.body)
+
+        if body not in self.signalling:
+            def for_loop():
+                first = start()
+                last = end()
+                frame[slot] = first
+                for i in range(first, last):
+                    frame[slot] = i
+                    body()
+            return for_loop
+
+        def signalling_for_loop():
+            first = start()
+            last = end()
+            frame[slot] = first
+            for i in range(first, last):
+                frame[slot] = i
+                if body() is BREAK:
+                    break
+        return signalling_for_loop
+
+    @when(AST.FlowControlInstruction)
+    def compile(self, node):
+        if node.instruction == 'break':
+            def break_instruction():
+                return BREAK
+            self.signalling.add(break_instruction)
+            return break_instruction
+        elif node.instruction == 'continue':
+            def continue_instruction():
+                return CONTINUE
+            self.signalling.add(continue_instruction)
+            return continue_instruction
+        return lambda: None
+
+    @when(AST.Ifstatement)
+    def compile(self, node):
+        condition = self.compile(node.condition)
+        instruction = self.compile(node.instruction)
+        if not node.elsepart:
+            def if_statement():
+                if condition():
+                    return instruction()
+            if instruction in self.signalling:
+                self.signalling.add(if_statement)
+            return if_statement
+
+        elsepart = self.compile(node.elsepart)
+
+        def if_else_statement():
+            if condition():
+                return instruction()
+            else:
+                return elsepart()
+        if instruction in self.signalling or elsepart in self.signalling:
+            self.signalling.add(if_else_statement)
+        return if_else_statement
+
+    @when(AST.Assignment)
+    def compile(self, node):
+        expr = self.compile(node.expr)
+        if node.op in ASSIGNMENT_OPERATORS:
+            value = self.operation(node, ASSIGNMENT_OPERATORS[node.op], node.id, node.expr, self.compile(node.id), expr)
+        else:
+            value = expr
+
+        if not isinstance(node.id, AST.Reference):
+            frame, slot = self.store(node.id.name)
+
+            def assignment():
+                frame[slot] = value()
+            return assignment
+
+        variable = self.compile(node.id.id)
+        index = self.compile_index(node.id.index)
+
+        def reference_assignment():
+            variable()[index()] = value()
+        return reference_assignment
+
+    @when(AST.BinaryOperation)
+    def compile(self, node):
+        return self.operation(node, node.op, node.left, node.right, self.compile(node.left), self.compile(node.right))
+
+    def operation(self, node, op, left_node, right_node, left, right):
+        """
+        Returns the closure of the binary operation, specialized by the signature inferred for the node.
+        """
+        generic = BINARY_OPERATORS[op]
+        signature = self.types.get(node)
+        if signature is None:
+            return lambda: generic(left(), right())
+        result, left_type, right_type = signature
+
+        if left_type is AST.Numeric and right_type is AST.Numeric and op in SCALAR_OPERATIONS:
+            evaluated, constant_right, constant_left = SCALAR_OPERATIONS[op]
+            if isinstance(right_node, LITERALS):
+                return constant_right(left, right_node.value)
+            if isinstance(left_node, LITERALS):
+                return constant_left(left_node.value, right)
+            return evaluated(left, right)
+
+        if op in ARRAY_OPERATIONS and known_shape(left_type) and known_shape(right_type):
+            kernel = ARRAY_OPERATIONS[op]
+
+            def matrix_operation():
+                left_value = left()
+                right_value = right()
+                if type(left_value) is Matrix and type(right_value) is Matrix:
+                    return Matrix(arithmetic(kernel, left_value.array, right_value.array))
+                return generic(left_value, right_value)
+            return matrix_operation
+
+        if op == '*' and left_type is AST.Numeric and known_shape(right_type):
+            def scaling():
+                left_value = left()
+                right_value = right()
+                if type(right_value) is Matrix and type(left_value) is not Matrix:
+                    return Matrix(arithmetic(operator.mul, left_value, right_value.array))
+                return generic(left_value, right_value)
+            return scaling
+
+        return lambda: generic(left(), right())
+
+    @when(AST.UnaryOperation)
+    def compile(self, node):
+        op = UNARY_OPERATORS[node.op]
+        operand = self.compile(node.operand)
+        signature = self.types.get(node)
+        if signature is not None and node.op == '-' and signature[1] is AST.Numeric:
+            if isinstance(node.operand, LITERALS):
+                value = -node.operand.value
+                return lambda: value
+            return lambda: -operand()
+        return lambda: op(operand())
+
+    @when(AST.Vector)
+    def compile(self, node):
+        elements = tuple(self.compile(element) for element in node.elements)
+        return lambda: vector([element() for element in elements])
+
+    @when(AST.Reference)
+    def compile(self, node):
+        variable = self.compile(node.id)
+        index = self.compile_index(node.index)
+        return lambda: variable()[index()]
+
+    def compile_index(self, index):
+        """
+        Compiles the index of a reference to a single evaluator of the position, a scalar or a tuple.
+        """
+        if len(index.elements) == 1:
+            return self.compile(index.elements[0])
+        positions = tuple(self.compile(i) for i in index.elements)
+        return lambda: tuple([i() for i in positions])
+
+    @when(AST.Variable)
+    def compile(self, node):
+        name = node.name
+        resolved = self.symbol_table.resolve(name)
+        if resolved is None:
+            location = []  # filled with the frame and slot by resolve_deferred
+            self.unresolved.append((self.symbol_table, name, location))
+
+            def deferred_variable():
+                if not location:
+                    raise Exception(f"Variable {name} not found")
+                frame, slot = location
+                value = frame[slot]
+                if value is UNDEFINED:
+                    raise Exception(f"Variable {name} not found")
+                return value
+            return deferred_variable
+
+        depth, slot = resolved
+        frame = self.frame_stack.frames[depth]
+
+        def variable():
+            value = frame[slot]
+            if value is UNDEFINED:
+                raise Exception(f"Variable {name} not found")
+            return value
+        return variable
+
+    @when(AST.Integer)
+    def compile(self, node):
+        value = node.value
+        return lambda: value
+
+    @when(AST.Float)
+    def compile(self, node):
+        value = node.value
+        return lambda: value
+
+    @when(AST.String)
+    def compile(self, node):
+        value = node.value
+        return lambda: value
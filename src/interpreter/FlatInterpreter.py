@@ -0,0 +1,155 @@
+from FlatAST import FlatTree, KINDS, NONE, REFERENCE
+from interpreter.Memory import Memory, MemoryStack
+from interpreter.Signals import BREAK, CONTINUE
+from interpreter.Operations import vector, MATRIX_CONSTRUCTORS, BINARY_OPERATORS, UNARY_OPERATORS, \
+    ASSIGNMENT_OPERATORS
+from interpreter.visit import recursion_limit
+
+
+class FlatInterpreter(object):
+    """
+    Interpreter running a FlatTree directly: nodes are evaluated by index from the columns of the tree,
+    dispatching on the kind code through a list of handlers, so no node object is materialized.
+    Operators are resolved once per tree, by op code.
+
+    An AST given instead of a FlatTree is encoded first, so the interpreter runs like the other engines
+    with ast.accept(FlatInterpreter()).
+    """
+    def __init__(self, memory_stack=None):
+        if memory_stack is None:
+            memory_stack = MemoryStack()
+        self.memory_stack = memory_stack
+        self.handlers = [getattr(self, 'visit_' + kind.__name__) for kind in KINDS]
+
+    def visit(self, tree):
+        if not isinstance(tree, FlatTree):
+            tree = FlatTree.from_ast(tree)
+        self.kinds = tree.kinds
+        self.ops = tree.ops
+        self.first = tree.first
+        self.counts = tree.counts
+        self.literals = tree.literals
+        self.children = tree.children
+        self.pool = tree.pool
+        self.operators = tree.operators
+        self.binary = [BINARY_OPERATORS.get(ASSIGNMENT_OPERATORS.get(op, op)) for op in tree.operators]
+        self.unary = [UNARY_OPERATORS.get(op) for op in tree.operators]
+        with recursion_limit():  # the handlers evaluate the children of a node recursively
+            return self.evaluate(tree.root)
+
+    def evaluate(self, index: int):
+        return self.handlers[self.kinds[index]](index)
+
+    def arguments(self, index: int):
+        start = self.first[index]
+        return self.children[start:start + self.counts[index]]
+
+    def name(self, index: int) -> str:
+        return self.pool[self.literals[index]]
+
+    def visit_Program(self, index):
+        for instruction in self.arguments(index):
+            self.evaluate(instruction)
+
+    def visit_Block(self, index):
+        # statements return None or the signal of a break or continue, which ends the block
+        self.memory_stack.push(Memory("Block"))
+        for instruction in self.arguments(index):
+            signal = self.evaluate(instruction)
+            if signal is not None:
+                self.memory_stack.pop()
+                return signal
+        self.memory_stack.pop()
+
+    def visit_FunctionalInstruction(self, index):
+        instruction = self.operators[self.ops[index]]
+        if instruction == 'print':
+            print(" ".join(str(self.evaluate(arg)) for arg in self.arguments(index)))
+        elif instruction in MATRIX_CONSTRUCTORS:
+            return MATRIX_CONSTRUCTORS[instruction](*[self.evaluate(arg) for arg in self.arguments(index)])
+
+    def visit_WhileInstruction(self, index):
+        condition, body = self.arguments(index)
+        while self.evaluate(condition):
+            if self.evaluate(body) is BREAK:
+                break
+
+    def visit_ForLoopInstruction(self, index):
+        id, range_, body = self.arguments(index)
+        start, end = self.arguments(range_)
+        start = self.evaluate(start)
+        end = self.evaluate(end)
+        name = self.name(id)
+
+        self.memory_stack.insert(name, start)
+
+        for i in range(start, end):
+            self.memory_stack.set(name, i)
+            if self.evaluate(body) is BREAK:
+                break
+
+    def visit_Range(self, index):
+        pass  # evaluated by the loop
+
+    def visit_FlowControlInstruction(self, index):
+        instruction = self.operators[self.ops[index]]
+        if instruction == 'break':
+            return BREAK
+        elif instruction == 'continue':
+            return CONTINUE
+
+    def visit_Ifstatement(self, index):
+        condition, instruction, elsepart = self.arguments(index)
+        if self.evaluate(condition):
+            return self.evaluate(instruction)
+        elif elsepart != NONE:
+            return self.evaluate(elsepart)
+
+    def visit_Assignment(self, index):
+        target, expr = self.arguments(index)
+        op = self.ops[index]
+        if self.operators[op] in ASSIGNMENT_OPERATORS:
+            value = self.binary[op](self.evaluate(target), self.evaluate(expr))
+        else:
+            value = self.evaluate(expr)
+
+        if self.kinds[target] != REFERENCE:
+            self.memory_stack.set(self.name(target), value)
+        else:
+            id, positions = self.arguments(target)
+            base = self.memory_stack.get(self.name(id))
+            base[self.index(positions)] = value
+
+    def index(self, index: int):
+        positions = tuple(self.evaluate(position) for position in self.arguments(index))
+        return positions[0] if len(positions) == 1 else positions
+
+    def visit_BinaryOperation(self, index):
+        left, right = self.arguments(index)
+        return self.binary[self.ops[index]](self.evaluate(left), self.evaluate(right))
+
+    def visit_UnaryOperation(self, index):
+        operand, = self.arguments(index)
+        return self.unary[self.ops[index]](self.evaluate(operand))
+
+    def visit_Vector(self, index):
+        return vector([self.evaluate(element) for element in self.arguments(index)])
+
+    def visit_Reference(self, index):
+        id, positions = self.arguments(index)
+        return self.memory_stack.get(self.name(id))[self.index(positions)]
+
+    def visit_Variable(self, index):
+        return self.memory_stack.get(self.name(index))
+
+    def visit_Integer(self, index):
+        return self.pool[self.literals[index]]
+
+    def visit_Float(self, index):
+        return self.pool[self.literals[index]]
+
+    def visit_String(self, index):
+        return self.pool[self.literals[index]]
+
+    def visit_Error(self, index):
+        pass
@@ -1,208 +1,149 @@
 import AST
 from interpreter.Memory import *
-from interpreter.Exceptions import *
+from interpreter.Signals import BREAK, CONTINUE
+from interpreter.Operations import transpose, vector, MATRIX_CONSTRUCTORS, BINARY_OPERATORS, \
+    ASSIGNMENT_OPERATORS
 from interpreter.visit import *
-import sys
-import operator
-
-sys.setrecursionlimit(10000)
 
 
 class Interpreter(object):
+    """
+    Tree-walking interpreter. The evaluation of a node with children is a generator, which yields the children
+    to evaluate and is sent their values, driven by the trampoline of visit instead of recursive calls.
+    """
     def __init__(self, memory_stack = None):
         if memory_stack is None:
             memory_stack = MemoryStack()
         self.memory_stack = memory_stack
 
-    @on('node')
     def visit(self, node):
+        return trampoline(self.evaluate, node)
+
+    @on('node')
+    def evaluate(self, node):
         pass
 
     @when(AST.Program)
-    def visit(self, node):
+    def evaluate(self, node):
         for instruction in node.instructions:
-            instruction.accept(self)
+            yield instruction
 
     @when(AST.Block)
-    def visit(self, node):
-        # TODO: try finally
+    def evaluate(self, node):
+        # statements return None or the signal of a break or continue, which ends the block
         self.memory_stack.push(Memory("Block"))
         for instruction in node.instructions:
-            instruction.accept(self)
+            signal = yield instruction
+            if signal is not None:
+                self.memory_stack.pop()
+                return signal
         self.memory_stack.pop()
 
 
     @when(AST.FunctionalInstruction)
-    def visit(self, node):
+    def evaluate(self, node):
+        values = []
+        for arg in node.args:
+            values.append((yield arg))
         if node.instruction == 'print':
-            print(" ".join(str(arg.accept(self)) for arg in node.args))
-        elif node.instruction == 'zeros':
-            n = [arg.accept(self) for arg in node.args]
-            if len(n) == 1:
-                n = (n[0], n[0])
-            return [[0 for _ in range(n[0])] for _ in range(n[1])]
-        elif node.instruction == 'ones':
-            n = [arg.accept(self) for arg in node.args]
-            if len(n) == 1:
-                n = (n[0], n[0])
-            return [[1 for _ in range(n[0])] for _ in range(n[1])]
-        elif node.instruction == 'eye':
-            return [[1 if i == j else 0 for j in range(node.args[0].accept(self))] for i in range(node.args[0].accept(self))]
+            print(" ".join(str(value) for value in values))
+        elif node.instruction in MATRIX_CONSTRUCTORS:
+            return MATRIX_CONSTRUCTORS[node.instruction](*values)
 
 
     @when(AST.WhileInstruction)
-    def visit(self, node):
-        while node.condition.accept(self):
-            try:
-                node.body.accept(self)
-            except BreakException:
+    def evaluate(self, node):
+        condition, body = node.args
+        while (yield condition):
+            if (yield body) is BREAK:
                 break
-            except ContinueException:
-                continue
 
     @when(AST.ForLoopInstruction)
-    def visit(self, node):
-        start = node.range.start.accept(self)
-        end = node.range.end.accept(self)
+    def evaluate(self, node):
+        id, range_, body = node.args
+        start = yield range_.start
+        end = yield range_.end
 
-        self.memory_stack.insert(node.id.name, start)
+        self.memory_stack.insert(id.name, start)
 
         for i in range(start, end):
-            self.memory_stack.set(node.id.name, i)  # TODO: scope for loop variable
-            try:
-                node.body.accept(self)
-            except BreakException:
+            self.memory_stack.set(id.name, i)  # TODO: scope for loop variable
+            if (yield body) is BREAK:
                 break
-            except ContinueException:
-                continue
 
 
     @when(AST.FlowControlInstruction)
-    def visit(self, node):
+    def evaluate(self, node):
         if node.instruction == 'break':
-            raise BreakException()
+            return BREAK
         elif node.instruction == 'continue':
-            raise ContinueException()
+            return CONTINUE
 
     @when(AST.Ifstatement)
-    def visit(self, node):
-        if node.condition.accept(self):
-            node.instruction.accept(self)
+    def evaluate(self, node):
+        if (yield node.condition):
+            return (yield node.instruction)
         elif node.elsepart:
-            node.elsepart.accept(self)
+            return (yield node.elsepart)
 
     @when(AST.Assignment)
-    def visit(self, node):
-        TRANSLATION_TABLE = {
-            '+=': '+',
-            '-=': '-',
-            '*=': '*',
-            '/=': '/'
-        }
-        if node.op in TRANSLATION_TABLE:
-            op = TRANSLATION_TABLE[node.op]
-            value = AST.BinaryOperation(op, node.id, node.expr).accept(self)
+    def evaluate(self, node):
+        if node.op in ASSIGNMENT_OPERATORS:
+            op = BINARY_OPERATORS[ASSIGNMENT_OPERATORS[node.op]]
+            value = op((yield node.id), (yield node.expr))
         else:
-            value = node.expr.accept(self)
+            value = yield node.expr
 
         if not isinstance(node.id, AST.Reference):
             self.memory_stack.set(node.id.name, value)
         else:
             base = self.memory_stack.get(node.id.id.name)
-            index = node.id.index.accept(self)
-
-            if isinstance(index, list):
-
-                for j in range(len(index)): # needed to access elements
-                    index[j] = index[j].accept(self)
+            base[(yield from self.index(node.id.index))] = value
 
-                for i in index[:-1]:  # recursively accesses the nested lists
-                    base = base[i]
-            base[index[-1]] = value
+    def index(self, index):
+        positions = []
+        for i in index.elements:
+            positions.append((yield i))
+        return positions[0] if len(positions) == 1 else tuple(positions)
 
 
     @when(AST.BinaryOperation)
-    def visit(self, node):
-        def elementwise_operation(op, matrix1, matrix2):
-            if isinstance(matrix1[0], list):  # both matrices are 2D (checked in semantic analysis)
-                return [[op(matrix1[i][j], matrix2[i][j]) for j in range(len(matrix1[0]))] for i in range(len(matrix1))]
-            else: # both matrices are 1D
-                return [op(matrix1[i], matrix2[i]) for i in range(len(matrix1))]
-
-
-        left = node.left.accept(self)
-        right = node.right.accept(self)
-        if node.op == '+':
-            return left + right
-        elif node.op == '-':
-            return left - right
-        elif node.op == '*':
-            return left * right
-        elif node.op == '/':
-            return left / right
-        elif node.op == '==':
-            return left == right
-        elif node.op == '!=':
-            return left != right
-        elif node.op == '>':
-            return left > right
-        elif node.op == '<':
-            return left < right
-        elif node.op == '>=':
-            return left >= right
-        elif node.op == '<=':
-            return left <= right
-        elif node.op == '.+':
-            return elementwise_operation(operator.add, left, right)
-        elif node.op == '.-':
-            return elementwise_operation(operator.sub, left, right)
-        elif node.op == '.*':
-            return elementwise_operation(operator.mul, left, right)
-        elif node.op == './':
-            return elementwise_operation(operator.truediv, left, right)
+    def evaluate(self, node):
+        left = yield node.left
+        right = yield node.right
+        return BINARY_OPERATORS[node.op](left, right)
 
     @when(AST.UnaryOperation)
-    def visit(self, node):
-        operand = node.operand.accept(self)
+    def evaluate(self, node):
+        operand = yield node.operand
         if node.op == '-':
             return -operand
         elif node.op == "'":
-            return [[node.operand[j][i] for j in range(len(node.operand))] for i in range(len(node.operand[0].accept(self)))]
+            return transpose(operand)
 
     @when(AST.Vector)
-    def visit(self, node):
-        return node.elements
+    def evaluate(self, node):
+        elements = []
+        for element in node.elements:
+            elements.append((yield element))
+        return vector(elements)
 
     @when(AST.Reference)
-    def visit(self, node):
-        base = self.memory_stack.get(node.id.name)
-        index = node.index.accept(self)
-
-        if isinstance(index, list):
-            for i in index:
-                i = i.accept(self)
-                base = base[i]
-        else:
-            index = index.accept(self)
-            base = base[index]
-        return base
+    def evaluate(self, node):
+        return self.memory_stack.get(node.id.name)[(yield from self.index(node.index))]
 
     @when(AST.Variable)
-    def visit(self, node):
+    def evaluate(self, node):
         return self.memory_stack.get(node.name)
 
     @when(AST.Integer)
-    def visit(self, node):
+    def evaluate(self, node):
         return node.value
 
     @when(AST.Float)
-    def visit(self, node):
+    def evaluate(self, node):
         return node.value
 
     @when(AST.String)
-    def visit(self, node):
+    def evaluate(self, node):
         return node.value
-
-
-
-
@@ -0,0 +1,432 @@
+import math
+import operator
+import numpy as np
+
+SPARSE_DENSITY = 0.1  # fraction of stored elements above which a sparse array is converted to a dense one
+INT64_MAX = int(np.iinfo(np.int64).max)
+
+# operation: largest magnitude of its result, from the largest magnitudes of the operands and the inner dimension
+RESULT_BOUNDS = {
+    operator.add: lambda left, right, inner: left + right,
+    operator.sub: lambda left, right, inner: left + right,
+    operator.mul: lambda left, right, inner: left * right,
+    operator.matmul: lambda left, right, inner: left * right * inner,
+}
+
+
+def _dtype(values):
+    """
+    Chooses the array dtype for the scalars, falling back to Python objects for mixed or non-numeric values,
+    so that every element keeps the type (and printed form) it would have as a plain Python value.
+    """
+    types = set(map(type, values))
+    if types == {int}:
+        return np.int64
+    if types == {float}:
+        return np.float64
+    return object
+
+
+def _flatten(nested):
+    if isinstance(nested, Matrix):
+        nested = nested.tolist()
+    if isinstance(nested, list):
+        return [value for element in nested for value in _flatten(element)]
+    return [nested]
+
+
+def _identical(value, other) -> bool:
+    """
+    Tells if the scalars are printed the same, unlike 0 and 0.0 or 0.0 and -0.0, which are equal.
+    """
+    if type(value) is not type(other) or value != other:
+        return False
+    return type(value) is not float or math.copysign(1.0, value) == math.copysign(1.0, other)
+
+
+def _dense(array):
+    return array.toarray() if isinstance(array, SparseArray) else array
+
+
+def _magnitude(operand) -> int | None:
+    """
+    Returns the largest magnitude of the elements of an integer array or of an integer, None for other operands,
+    whose operations do not wrap around.
+    """
+    if isinstance(operand, np.ndarray):
+        if operand.dtype != np.int64:
+            return None
+        return max(-int(operand.min()), int(operand.max())) if operand.size else 0
+    if isinstance(operand, SparseArray):
+        values = [operand.fill, *operand.values.values()]
+        return max(map(abs, values)) if all(type(value) is int for value in values) else None
+    if isinstance(operand, (int, np.integer)):
+        return abs(int(operand))
+    return None
+
+
+def _exact(operand):
+    """
+    Returns the operand with Python ints in place of int64 elements.
+    """
+    if isinstance(operand, np.ndarray):
+        return operand.astype(object)
+    if isinstance(operand, SparseArray):
+        return operand._filled(object)
+    return int(operand) if isinstance(operand, np.integer) else operand
+
+
+def _has_zero(operand) -> bool:
+    if isinstance(operand, SparseArray):
+        rows, columns = operand.shape
+        return any(value == 0 for value in operand.values.values()) \
+            or (operand.fill == 0 and len(operand.values) < rows * columns)
+    return bool(np.any(np.asarray(operand) == 0))
+
+
+def arithmetic(op, left, right):
+    """
+    Applies the operation to arrays or scalars like NumPy, except that int64 elements whose result could leave
+    the int64 range, where NumPy silently wraps around, are computed as Python ints, like plain Python values,
+    and that a division by zero raises ZeroDivisionError, where NumPy gives inf or nan.
+    """
+    if op is operator.truediv and _has_zero(right):
+        raise ZeroDivisionError("division by zero")
+    bound = RESULT_BOUNDS.get(op)
+    if bound is not None and (isinstance(left, np.ndarray) or isinstance(right, np.ndarray)):
+        left_magnitude = _magnitude(left)
+        right_magnitude = _magnitude(right) if left_magnitude is not None else None
+        if right_magnitude is not None:
+            inner = left.shape[-1] if op is operator.matmul else 1
+            if bound(left_magnitude, right_magnitude, inner) > INT64_MAX:
+                left, right = _exact(left), _exact(right)
+    return op(left, right)
+
+
+class SparseArray:
+    """
+    Two-dimensional array stored as a dictionary of keys: only the elements differing from a common fill value
+    are kept, by (row, column), like the ones of an identity matrix or the few elements written to zeros(n).
+
+    Operations touch the stored elements only and apply the operation once to the fill value for all the others,
+    so ones(n) + 1 stays as small as ones(n). It implements the part of the ndarray interface used by Matrix,
+    operations it cannot keep sparse, like a division by zero, are done on the dense array.
+    """
+    __slots__ = ('shape', 'values', 'fill')
+    __array_ufunc__ = None  # NumPy defers operators with an ndarray operand to the reflected methods
+    dtype = np.dtype(object)  # elements are plain Python scalars
+
+    def __init__(self, shape: tuple, values: dict | None = None, fill=0):
+        if min(shape) < 0:
+            raise ValueError("negative dimensions are not allowed")
+        self.shape = shape
+        self.values = {} if values is None else values
+        self.fill = fill
+
+    @classmethod
+    def eye(cls, n: int):
+        return cls((n, n), {(i, i): 1 for i in range(n)})
+
+    @property
+    def density(self) -> float:
+        rows, columns = self.shape
+        return len(self.values) / (rows * columns) if rows * columns else 0.0
+
+    def toarray(self) -> np.ndarray:
+        elements = list(self.values.values())
+        if len(elements) < self.shape[0] * self.shape[1]:
+            elements.append(self.fill)
+        try:
+            return self._filled(_dtype(elements))
+        except OverflowError:  # integers outside of the int64 range
+            return self._filled(object)
+
+    def _filled(self, dtype) -> np.ndarray:
+        array = np.full(self.shape, self.fill, dtype=dtype)
+        for position, value in self.values.items():
+            array[position] = value
+        return array
+
+    def tolist(self) -> list:
+        rows, columns = self.shape
+        nested = [[self.fill] * columns for _ in range(rows)]
+        for (row, column), value in self.values.items():
+            nested[row][column] = value
+        return nested
+
+    def copy(self):
+        return SparseArray(self.shape, dict(self.values), self.fill)
+
+    @property
+    def T(self):
+        return SparseArray(self.shape[::-1], {(column, row): value for (row, column), value in self.values.items()},
+                           self.fill)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def _position(self, index) -> tuple:
+        """
+        Returns the index as a tuple of non-negative positions, raising IndexError like NumPy when out of bounds.
+        """
+        index = index if isinstance(index, tuple) else (index,)
+        if len(index) > len(self.shape):
+            raise IndexError(f"too many indices for array: array is 2-dimensional, but {len(index)} were indexed")
+        position = []
+        for axis, (i, size) in enumerate(zip(index, self.shape)):
+            i = operator.index(i)
+            if not -size <= i < size:
+                raise IndexError(f"index {i} is out of bounds for axis {axis} with size {size}")
+            position.append(i % size)
+        return tuple(position)
+
+    def _store(self, position: tuple, value):
+        if _identical(value, self.fill):
+            self.values.pop(position, None)
+        else:
+            self.values[position] = value
+
+    def __getitem__(self, index):
+        position = self._position(index)
+        if len(position) == 2:
+            return self.values.get(position, self.fill)
+        row = [self.values.get((position[0], column), self.fill) for column in range(self.shape[1])]
+        return np.array(row, dtype=_dtype(row))
+
+    def __setitem__(self, index, value):
+        position = self._position(index)
+        if len(position) == 2:
+            self._store(position, value)
+            return
+        row = np.broadcast_to(np.asarray(_dense(value)), (self.shape[1],)).tolist()
+        for column, element in enumerate(row):
+            self._store((position[0], column), element)
+
+    def _apply(self, op, other, reflected: bool = False):
+        """
+        Applies the binary operation elementwise with another array of the same shape or a scalar.
+        """
+        function = (lambda value, other_value: op(other_value, value)) if reflected else op
+        if isinstance(other, np.ndarray) or (isinstance(other, SparseArray) and other.shape != self.shape):
+            return self._dense_apply(op, other, reflected)
+        try:
+            if isinstance(other, SparseArray):
+                fill = function(self.fill, other.fill)
+                values = {position: function(self.values.get(position, self.fill),
+                                             other.values.get(position, other.fill))
+                          for position in self.values.keys() | other.values.keys()}
+            else:
+                fill = function(self.fill, other)
+                values = {position: function(value, other) for position, value in self.values.items()}
+        except ZeroDivisionError:  # raised by the dense operation unless the divisor is not used, e.g. has no elements
+            return self._dense_apply(op, other, reflected)
+        result = SparseArray(self.shape, {}, fill)
+        for position, value in values.items():
+            result._store(position, value)
+        return result
+
+    def _dense_apply(self, op, other, reflected: bool = False):
+        """
+        Applies the binary operation to the dense arrays, with the integers as exact as in the sparse array.
+        """
+        if reflected:
+            return arithmetic(op, _dense(other), self.toarray())
+        return arithmetic(op, self.toarray(), _dense(other))
+
+    def __add__(self, other):
+        return self._apply(operator.add, other)
+
+    def __radd__(self, other):
+        return self._apply(operator.add, other, reflected=True)
+
+    def __sub__(self, other):
+        return self._apply(operator.sub, other)
+
+    def __rsub__(self, other):
+        return self._apply(operator.sub, other, reflected=True)
+
+    def __mul__(self, other):
+        return self._apply(operator.mul, other)
+
+    def __rmul__(self, other):
+        return self._apply(operator.mul, other, reflected=True)
+
+    def __truediv__(self, other):
+        return self._apply(operator.truediv, other)
+
+    def __rtruediv__(self, other):
+        return self._apply(operator.truediv, other, reflected=True)
+
+    def equals(self, other) -> bool:
+        """
+        Tells if the arrays of the same shape have equal elements.
+        """
+        rows, columns = self.shape
+        positions = self.values.keys() | other.values.keys()
+        if len(positions) < rows * columns and self.fill != other.fill:
+            return False
+        return all(self.values.get(position, self.fill) == other.values.get(position, other.fill)
+                   for position in positions)
+
+    def __neg__(self):
+        return SparseArray(self.shape, {position: -value for position, value in self.values.items()}, -self.fill)
+
+    def _zero_filled(self, kind: type) -> bool:
+        """
+        Tells if the array is filled with the zero of the kind and only stores scalars of this kind, so that sums of
+        products of its elements are the ones of a dense int64 or float64 array.
+        """
+        return _identical(self.fill, kind(0)) and all(type(value) is kind for value in self.values.values())
+
+    def __matmul__(self, other):
+        kind = type(self.fill)
+        if not isinstance(other, SparseArray) or kind not in (int, float) or self.shape[1] != other.shape[0] \
+                or not self._zero_filled(kind) or not other._zero_filled(kind):
+            return self._dense_apply(operator.matmul, other)
+        rows = {}  # row of the other array -> its stored (column, value) pairs
+        for (row, column), value in other.values.items():
+            rows.setdefault(row, []).append((column, value))
+        fill = self.fill * other.fill
+        products = {}
+        for (row, k), left in self.values.items():
+            for column, right in rows.get(k, ()):
+                products[row, column] = products.get((row, column), fill) + left * right
+        result = SparseArray((self.shape[0], other.shape[1]), {}, fill)
+        for position, value in products.items():
+            result._store(position, value)
+        return result
+
+    def __rmatmul__(self, other):
+        return self._dense_apply(operator.matmul, other, reflected=True)
+
+
+class Matrix:
+    """
+    Matrix value backed by a NumPy array.
+
+    Elementwise operations, transposition and the matrix product are vectorized, while elements are read back
+    as Python scalars and printing matches the formatting of nested Python lists. Integer matrices are int64
+    arrays, moved to Python ints when a result could overflow. Matrices are equal when they have the same shape
+    and equal elements.
+    zeros, ones and eye are backed by a SparseArray instead, until more than SPARSE_DENSITY of it is stored.
+    """
+    __slots__ = ('array',)
+
+    def __init__(self, array):
+        if isinstance(array, SparseArray) and array.density > SPARSE_DENSITY:
+            array = array.toarray()
+        self.array = array
+
+    @classmethod
+    def from_nested(cls, nested: list):
+        nested = [element.tolist() if isinstance(element, Matrix) else element for element in nested]
+        dtype = _dtype(_flatten(nested))
+        if dtype is object:
+            array = np.empty(np.shape(nested), dtype=object)
+            array[...] = nested
+            return cls(array)
+        try:
+            return cls(np.array(nested, dtype=dtype))
+        except OverflowError:  # integers outside of the int64 range
+            return cls(np.array(nested, dtype=object))
+
+    @classmethod
+    def zeros(cls, rows: int, columns: int):
+        return cls(SparseArray((rows, columns)))
+
+    @classmethod
+    def ones(cls, rows: int, columns: int):
+        return cls(SparseArray((rows, columns), fill=1))
+
+    @classmethod
+    def eye(cls, n: int):
+        return cls(SparseArray.eye(n))
+
+    @property
+    def shape(self) -> tuple:
+        return self.array.shape
+
+    def tolist(self):
+        return self.array.tolist()
+
+    def transpose(self):
+        return Matrix(self.array.T.copy())
+
+    def elementwise(self, op, other):
+        return Matrix(arithmetic(op, self.array, other.array))
+
+    @property
+    def sparse(self) -> bool:
+        return isinstance(self.array, SparseArray)
+
+    def __getitem__(self, index):
+        value = self.array[index]
+        if isinstance(value, np.ndarray):
+            return Matrix(value)
+        return value.item() if isinstance(value, np.generic) else value
+
+    def __setitem__(self, index, value):
+        if isinstance(value, Matrix):
+            value = value.array
+        elif self.array.dtype != object and (_dtype([value]) != self.array.dtype
+                                             or type(value) is int and abs(value) > INT64_MAX):
+            # e.g. a float stored in an integer matrix; other elements must stay integers
+            self.array = self.array.astype(object)
+        self.array[index] = value
+        if self.sparse and self.array.density > SPARSE_DENSITY:
+            self.array = self.array.toarray()
+
+    def __len__(self):
+        return len(self.array)
+
+    @staticmethod
+    def _operand(other):
+        return other.array if isinstance(other, Matrix) else other
+
+    def __add__(self, other):
+        return Matrix(arithmetic(operator.add, self.array, self._operand(other)))
+
+    def __radd__(self, other):
+        return Matrix(arithmetic(operator.add, self._operand(other), self.array))
+
+    def __sub__(self, other):
+        return Matrix(arithmetic(operator.sub, self.array, self._operand(other)))
+
+    def __rsub__(self, other):
+        return Matrix(arithmetic(operator.sub, self._operand(other), self.array))
+
+    def __mul__(self, other):
+        if isinstance(other, Matrix):
+            return Matrix(arithmetic(operator.matmul, self.array, other.array))
+        return Matrix(arithmetic(operator.mul, self.array, other))
+
+    def __rmul__(self, other):
+        return Matrix(arithmetic(operator.mul, other, self.array))
+
+    def __truediv__(self, other):
+        return Matrix(arithmetic(operator.truediv, self.array, self._operand(other)))
+
+    def __eq__(self, other):
+        if not isinstance(other, Matrix):
+            return NotImplemented
+        if self.shape != other.shape:
+            return False
+        if self.sparse and other.sparse:
+            return self.array.equals(other.array)
+        return bool(np.all(_dense(self.array) == _dense(other.array)))
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __neg__(self):
+        array = self.array
+        if isinstance(array, np.ndarray) and _magnitude(array) == INT64_MAX + 1:  # the negated minimum overflows
+            array = array.astype(object)
+        return Matrix(-array)
+
+    def __str__(self):
+        return str(self.tolist())
+
+    def __repr__(self):
+        return f"Matrix({self.tolist()})"
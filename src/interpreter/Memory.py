@@ -40,3 +40,24 @@ class MemoryStack:
         return self.stack.pop()
 
 
+UNDEFINED = object()  # content of a slot whose variable has not been assigned yet
+
+
+class FrameStack:
+    """
+    Slot-indexed variable storage used with variables resolved ahead of execution.
+
+    There is one flat frame per scope depth. Scopes at the same depth are never active at the same time,
+    so they share the frame, which is allocated once and sized for the largest of them.
+    """
+    def __init__(self):
+        self.frames = []
+
+    def frame(self, depth: int) -> list:
+        while len(self.frames) <= depth:
+            self.frames.append([])
+        return self.frames[depth]
+
+    def allocate(self, depth: int, size: int):
+        frame = self.frame(depth)
+        frame.extend([UNDEFINED] * (size - len(frame)))
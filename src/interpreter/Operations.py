@@ -0,0 +1,78 @@
+"""
+Runtime operations shared by the execution backends.
+Operators are resolved once to plain functions so that backends can bind them ahead of execution.
+"""
+import operator
+from interpreter.Matrix import Matrix
+
+
+def elementwise(op):
+    def apply(matrix1, matrix2):
+        return matrix1.elementwise(op, matrix2)
+    return apply
+
+
+def transpose(matrix):
+    return matrix.transpose()
+
+
+def _dimensions(n):
+    return (n[0], n[0]) if len(n) == 1 else n
+
+
+def zeros(*n):
+    columns, rows = _dimensions(n)
+    return Matrix.zeros(rows, columns)
+
+
+def ones(*n):
+    columns, rows = _dimensions(n)
+    return Matrix.ones(rows, columns)
+
+
+def eye(n, *_):
+    return Matrix.eye(n)
+
+
+def vector(elements):
+    return Matrix.from_nested(elements)
+
+
+def format_values(*values):
+    return " ".join(str(value) for value in values)
+
+
+BINARY_OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '<': operator.lt,
+    '>=': operator.ge,
+    '<=': operator.le,
+    '.+': elementwise(operator.add),
+    '.-': elementwise(operator.sub),
+    '.*': elementwise(operator.mul),
+    './': elementwise(operator.truediv),
+}
+
+UNARY_OPERATORS = {
+    '-': operator.neg,
+    "'": transpose,
+}
+
+ASSIGNMENT_OPERATORS = {
+    '+=': '+',
+    '-=': '-',
+    '*=': '*',
+    '/=': '/',
+}
+
+MATRIX_CONSTRUCTORS = {
+    'zeros': zeros,
+    'ones': ones,
+    'eye': eye,
+}
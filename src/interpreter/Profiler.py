@@ -0,0 +1,126 @@
+from time import perf_counter
+from types import GeneratorType
+import AST
+from interpreter.Interpreter import Interpreter
+
+
+class NodeProfile:
+    __slots__ = ('node', 'lineno', 'count', 'cumulative', 'self_time')
+
+    def __init__(self, node, lineno):
+        self.node = node
+        self.lineno = lineno
+        self.count = 0
+        self.cumulative = 0.0
+        self.self_time = 0.0
+
+    @property
+    def label(self) -> str:
+        node = self.node
+        if isinstance(node, AST.Instruction):
+            detail = node.instruction
+        elif isinstance(node, (AST.Assignment, AST.BinaryOperation, AST.UnaryOperation)):
+            detail = node.op
+        elif isinstance(node, AST.Variable):
+            detail = node.name
+        elif isinstance(node, (AST.Numeric, AST.String)):
+            detail = node.value
+        else:
+            return type(node).__name__
+        return f"{type(node).__name__} {detail}"
+
+    @property
+    def frame(self) -> str:
+        """
+        Name of the node in a collapsed stack, which cannot contain ';'.
+        """
+        line = f" (line {self.lineno})" if self.lineno is not None else ""
+        return (self.label + line).replace(';', ',')
+
+
+class ProfilingInterpreter(Interpreter):
+    """
+    Interpreter recording, for every AST node, the number of evaluations and the cumulative and self time.
+
+    Every evaluation is timed around the dispatch of the Interpreter, so all node types are covered; the evaluation
+    of a node with children lasts until its generator returns, after the evaluation of the children.
+    The source line of a node is taken from the parser's position tracking when the parser is given.
+    Besides the report, the time spent in each stack of nodes can be dumped in the collapsed-stack format
+    read by flame graph tools.
+    """
+    def __init__(self, parser=None, memory_stack=None):
+        super().__init__(memory_stack)
+        self.parser = parser
+        self.profiles = {}  # id(node) -> NodeProfile, the profile keeps the node alive
+        self.stacks = {}  # collapsed stack -> self time
+        self.path = [""]  # collapsed stacks of the nodes being visited
+        self.children_time = [0.0]  # time spent in the children of the nodes being visited
+
+    def profile(self, node) -> NodeProfile:
+        profile = self.profiles.get(id(node))
+        if profile is None:
+            lineno = None
+            if self.parser is not None:
+                try:
+                    lineno = self.parser.line_position(node)
+                except KeyError:
+                    pass
+            profile = self.profiles[id(node)] = NodeProfile(node, lineno)
+        return profile
+
+    def evaluate(self, node):
+        profile = self.profile(node)
+        parent_path = self.path[-1]
+        path = f"{parent_path};{profile.frame}" if parent_path else profile.frame
+        self.path.append(path)
+        self.children_time.append(0.0)
+        start = perf_counter()
+        try:
+            result = super().evaluate(node)
+        except BaseException:
+            self.record(profile, path, start)
+            raise
+        if type(result) is GeneratorType:
+            return self.timed(result, profile, path, start)
+        self.record(profile, path, start)
+        return result
+
+    def timed(self, generator, profile: NodeProfile, path: str, start: float):
+        """
+        Wraps the evaluation of a node with children, whose children are evaluated between its steps.
+        """
+        try:
+            return (yield from generator)
+        finally:
+            self.record(profile, path, start)
+
+    def record(self, profile: NodeProfile, path: str, start: float):
+        elapsed = perf_counter() - start
+        self.path.pop()
+        self_time = elapsed - self.children_time.pop()
+        self.children_time[-1] += elapsed
+
+        profile.count += 1
+        profile.cumulative += elapsed
+        profile.self_time += self_time
+        self.stacks[path] = self.stacks.get(path, 0.0) + self_time
+
+    def report(self, sort: str = 'self_time', limit: int | None = 20) -> str:
+        """
+        Returns a table of the node profiles sorted by the attribute ('self_time', 'cumulative' or 'count').
+        """
+        profiles = sorted(self.profiles.values(), key=lambda profile: getattr(profile, sort), reverse=True)
+        lines = [f"{'count':>10} {'cumulative [ms]':>16} {'self [ms]':>12} {'line':>6}  node"]
+        for profile in profiles[:limit]:
+            lineno = profile.lineno if profile.lineno is not None else "-"
+            lines.append(f"{profile.count:>10} {profile.cumulative * 1000:>16.3f} {profile.self_time * 1000:>12.3f} "
+                         f"{lineno:>6}  {profile.label}")
+        return "\n".join(lines)
+
+    def dump_collapsed_stacks(self, filename: str):
+        """
+        Writes the self time of every stack of nodes in microseconds, one 'frame;frame;frame time' line per stack.
+        """
+        with open(filename, "w") as file:
+            for path, self_time in sorted(self.stacks.items()):
+                file.write(f"{path} {round(self_time * 1e6)}\n")
@@ -0,0 +1,311 @@
+import ast
+import re
+import AST
+from interpreter.Interpreter import Interpreter
+from interpreter.Operations import *
+from interpreter.visit import *
+
+
+def _print(*values):
+    print(format_values(*values))
+
+
+RUNTIME = {
+    '_print': _print,
+    '_transpose': transpose,
+    '_vector': vector,
+    **{f'_{name}': constructor for name, constructor in MATRIX_CONSTRUCTORS.items()},
+}
+
+MATRIX_HELPERS = {
+    '.+': '_matrix_add',
+    '.-': '_matrix_sub',
+    '.*': '_matrix_mul',
+    './': '_matrix_div',
+}
+RUNTIME.update({helper: BINARY_OPERATORS[op] for op, helper in MATRIX_HELPERS.items()})
+
+ARITHMETIC_OPERATORS = {
+    '+': ast.Add,
+    '-': ast.Sub,
+    '*': ast.Mult,
+    '/': ast.Div,
+}
+
+COMPARISON_OPERATORS = {
+    '==': ast.Eq,
+    '!=': ast.NotEq,
+    '>': ast.Gt,
+    '<': ast.Lt,
+    '>=': ast.GtE,
+    '<=': ast.LtE,
+}
+
+
+class PythonCompiler(object):
+    """
+    Execution backend that lowers AST.Program to a Python ast.Module and runs the compiled code object with exec.
+
+    Loops, conditionals, break and continue are mapped to their Python counterparts, scalar arithmetic to native
+    operators and matrix operations to calls of the runtime helpers. Block scoping is resolved statically by giving
+    every variable declared in a block its own Python name; a block run again by a loop first unbinds its names,
+    so it does not see the values of its previous run. A variable read before its declaration, e.g. in a loop, is
+    bound once the whole program has been lowered, and reading an unbound name raises the error of the Interpreter.
+    A break or continue outside of loops ends the top-level statement, which is then lowered as a loop run once.
+    A program Python cannot compile, e.g. nested deeper than its blocks can be, is run by the Interpreter instead;
+    fallback then tells why.
+    """
+    ENTRY_POINT = '__program__'
+
+    def __init__(self):
+        self.scopes = []
+        self.names = 0
+        self.variables = {}  # Python name -> name in the program
+        self.unresolved = []  # (scopes, name, Python name node) of the variables read before their declaration
+        self.loops = 0  # loops around the node being lowered
+        self.ends_statement = False  # a break or continue outside of loops was lowered in the top-level statement
+        self.fallback = None
+
+    def visit(self, node):
+        try:
+            code = self.compile_module(node)
+        except (SyntaxError, RecursionError) as e:
+            self.fallback = str(e) or type(e).__name__
+            return Interpreter().visit(node)
+        namespace = dict(RUNTIME)
+        exec(code, namespace)
+        try:
+            namespace[self.ENTRY_POINT]()
+        except NameError as e:  # also UnboundLocalError, for a variable unbound by its block or never assigned
+            match = re.search(r"'(\w+)'", str(e))
+            if match is None or match.group(1) not in self.variables:
+                raise
+            raise Exception(f"Variable {self.variables[match.group(1)]} not found") from None
+
+    def compile_module(self, program):
+        """
+        Returns the code object defining the entry point function for the program.
+        """
+        with recursion_limit():  # the lowering to a Python AST and its compilation are recursive
+            return compile(self.lower(program), '<program>', 'exec')
+
+    def lower(self, program):
+        """
+        Lowers the program to a Python module with a single function, so that variables are fast locals.
+        """
+        self.scopes = [{}]
+        self.names = 0
+        self.variables = {}
+        self.unresolved = []
+        self.loops = 0
+        body = []
+        for instruction in program.instructions:
+            self.ends_statement = False
+            statement = self.lower_node(instruction)
+            if self.ends_statement:
+                statement = [ast.For(
+                    target=ast.Name(id='_', ctx=ast.Store()),
+                    iter=ast.Tuple(elts=[ast.Constant(value=0)], ctx=ast.Load()),
+                    body=statement,
+                    orelse=[],
+                )]
+            body.extend(statement)
+        self.resolve_deferred()
+        function = ast.FunctionDef(
+            name=self.ENTRY_POINT,
+            args=ast.arguments(posonlyargs=[], args=[], kwonlyargs=[], kw_defaults=[], defaults=[]),
+            body=body or [ast.Pass()],
+            decorator_list=[],
+        )
+        return ast.fix_missing_locations(ast.Module(body=[function], type_ignores=[]))
+
+    def resolve_deferred(self):
+        """
+        Binds the variables read before their declaration once all scopes have been lowered. A variable that is
+        never declared gets a name that is never assigned, so reading it raises NameError.
+        """
+        for scopes, name, node in self.unresolved:
+            node.id = self.lookup(name, scopes) or self.new_name(name)
+        self.unresolved = []
+
+    def statements(self, instructions):
+        body = []
+        for instruction in instructions:
+            body.extend(self.lower_node(instruction))
+        return body or [ast.Pass()]
+
+    def body(self, instruction):
+        return self.statements([instruction])
+
+    def new_name(self, name):
+        self.names += 1
+        python_name = f"v{self.names}_" + re.sub(r'\W', '_', name)
+        self.variables[python_name] = name
+        return python_name
+
+    def lookup(self, name, scopes=None):
+        for scope in reversed(self.scopes if scopes is None else scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    def declare(self, name):
+        """
+        Returns the Python name for an assignment target, declaring it in the current scope if it is not visible.
+        """
+        python_name = self.lookup(name)
+        if python_name is None:
+            python_name = self.scopes[-1][name] = self.new_name(name)
+        return python_name
+
+    @staticmethod
+    def call(function, *args):
+        return ast.Call(func=ast.Name(id=function, ctx=ast.Load()), args=list(args), keywords=[])
+
+    @staticmethod
+    def unbind(python_name):
+        """
+        Returns the statement deleting the variable if it is bound.
+        """
+        return ast.Try(
+            body=[ast.Delete(targets=[ast.Name(id=python_name, ctx=ast.Del())])],
+            handlers=[ast.ExceptHandler(type=ast.Name(id='NameError', ctx=ast.Load()), name=None, body=[ast.Pass()])],
+            orelse=[],
+            finalbody=[],
+        )
+
+    def loop_body(self, instruction):
+        self.loops += 1
+        body = self.body(instruction)
+        self.loops -= 1
+        return body
+
+    @on('node')
+    def lower_node(self, node):
+        pass
+
+    @when(AST.Block)
+    def lower_node(self, node):
+        self.scopes.append({})
+        body = self.statements(node.instructions)
+        scope = self.scopes.pop()
+        if self.loops:
+            body = [self.unbind(python_name) for python_name in scope.values()] + body
+        return body
+
+    @when(AST.FunctionalInstruction)
+    def lower_node(self, node):
+        args = [self.lower_node(arg) for arg in node.args]
+        if node.instruction == 'print':
+            return [ast.Expr(value=self.call('_print', *args))]
+        return self.call(f'_{node.instruction}', *args)
+
+    @when(AST.WhileInstruction)
+    def lower_node(self, node):
+        return [ast.While(test=self.lower_node(node.condition), body=self.loop_body(node.body), orelse=[])]
+
+    @when(AST.ForLoopInstruction)
+    def lower_node(self, node):
+        # range bounds are evaluated before the loop variable is bound, as in the Interpreter
+        start, end = self.new_name('start'), self.new_name('end')
+        bounds = [
+            ast.Assign(targets=[ast.Name(id=start, ctx=ast.Store())], value=self.lower_node(node.range.start)),
+            ast.Assign(targets=[ast.Name(id=end, ctx=ast.Store())], value=self.lower_node(node.range.end)),
+        ]
+        name = node.id.name
+        scope = self.scopes[-1]
+        if name not in scope:
+            scope[name] = self.new_name(name)
+        variable = scope[name]
+
+        return bounds + [
+            ast.Assign(targets=[ast.Name(id=variable, ctx=ast.Store())], value=ast.Name(id=start, ctx=ast.Load())),
+            ast.For(
+                target=ast.Name(id=variable, ctx=ast.Store()),
+                iter=self.call('range', ast.Name(id=start, ctx=ast.Load()), ast.Name(id=end, ctx=ast.Load())),
+                body=self.loop_body(node.body),
+                orelse=[],
+            ),
+        ]
+
+    @when(AST.FlowControlInstruction)
+    def lower_node(self, node):
+        if not self.loops:
+            self.ends_statement = True
+            return [ast.Break()]
+        if node.instruction == 'break':
+            return [ast.Break()]
+        elif node.instruction == 'continue':
+            return [ast.Continue()]
+        return [ast.Pass()]
+
+    @when(AST.Ifstatement)
+    def lower_node(self, node):
+        return [ast.If(
+            test=self.lower_node(node.condition),
+            body=self.body(node.instruction),
+            orelse=self.body(node.elsepart) if node.elsepart else [],
+        )]
+
+    @when(AST.Assignment)
+    def lower_node(self, node):
+        value = self.lower_node(node.expr)
+        if node.op in ASSIGNMENT_OPERATORS:
+            # x op= v is lowered to x = x op v, as augmented assignment would mutate lists in place
+            value = self.operation(ASSIGNMENT_OPERATORS[node.op], self.lower_node(node.id), value)
+
+        if isinstance(node.id, AST.Reference):
+            target = self.lower_node(node.id)
+            target.ctx = ast.Store()
+        else:
+            target = ast.Name(id=self.declare(node.id.name), ctx=ast.Store())
+        return [ast.Assign(targets=[target], value=value)]
+
+    def operation(self, op, left, right):
+        if op in MATRIX_HELPERS:
+            return self.call(MATRIX_HELPERS[op], left, right)
+        if op in COMPARISON_OPERATORS:
+            return ast.Compare(left=left, ops=[COMPARISON_OPERATORS[op]()], comparators=[right])
+        return ast.BinOp(left=left, op=ARITHMETIC_OPERATORS[op](), right=right)
+
+    @when(AST.BinaryOperation)
+    def lower_node(self, node):
+        return self.operation(node.op, self.lower_node(node.left), self.lower_node(node.right))
+
+    @when(AST.UnaryOperation)
+    def lower_node(self, node):
+        operand = self.lower_node(node.operand)
+        if node.op == '-':
+            return ast.UnaryOp(op=ast.USub(), operand=operand)
+        return self.call('_transpose', operand)
+
+    @when(AST.Vector)
+    def lower_node(self, node):
+        return self.call('_vector', ast.List(elts=[self.lower_node(element) for element in node.elements], ctx=ast.Load()))
+
+    @when(AST.Reference)
+    def lower_node(self, node):
+        index = [self.lower_node(i) for i in node.index.elements]
+        if len(index) > 1:
+            index = [ast.Tuple(elts=index, ctx=ast.Load())]
+        return ast.Subscript(value=self.lower_node(node.id), slice=index[0], ctx=ast.Load())
+
+    @when(AST.Variable)
+    def lower_node(self, node):
+        python_name = self.lookup(node.name)
+        name = ast.Name(id=python_name, ctx=ast.Load())
+        if python_name is None:
+            self.unresolved.append((list(self.scopes), node.name, name))
+        return name
+
+    @when(AST.Integer)
+    def lower_node(self, node):
+        return ast.Constant(value=node.value)
+
+    @when(AST.Float)
+    def lower_node(self, node):
+        return ast.Constant(value=node.value)
+
+    @when(AST.String)
+    def lower_node(self, node):
+        return ast.Constant(value=node.value)
@@ -0,0 +1,595 @@
+from array import array
+import AST
+from SymbolTable import SymbolTable, VariableSymbol
+from interpreter.Memory import UNDEFINED
+from interpreter.Operations import *
+from interpreter.visit import *
+
+
+# Instructions are an opcode and three operands A, B, C. Operands are registers, except for jump targets,
+# which are instruction indices, and operand lists, which are an offset and a count into Bytecode.operands.
+
+MOVE = 0            # A = B
+ADD = 1             # A = B + C, the binary operations up to EDIV in the order of BINARY
+SUB = 2
+MUL = 3
+DIV = 4
+EQ = 5
+NE = 6
+GT = 7
+LT = 8
+GE = 9
+LE = 10
+EADD = 11
+ESUB = 12
+EMUL = 13
+EDIV = 14
+NEG = 15            # A = -B
+TRANSPOSE = 16      # A = B'
+JUMP = 17           # jump to A
+JUMP_IF = 18        # jump to A if B
+JUMP_IF_EQ = 19     # jump to A if B == C, the comparisons up to JUMP_IF_LE in the order of EQ to LE
+JUMP_IF_NE = 20
+JUMP_IF_GT = 21
+JUMP_IF_LT = 22
+JUMP_IF_GE = 23
+JUMP_IF_LE = 24
+RANGE = 25          # A = iterator of range(B, C)
+FOR_NEXT = 26       # C = next item of iterator B and jump to A, unless it is exhausted
+CHECK = 27          # raise if variable A is not assigned
+LOAD = 28           # A = B, raising if variable B is not assigned
+INDEX = 29          # A = B[C]
+STORE_INDEX = 30    # A[B] = C
+TUPLE = 31          # A = tuple of the operand list B, C
+VECTOR = 32         # A = matrix of the operand list B, C
+ZEROS = 33          # A = constructor called with the operand list B, C
+ONES = 34
+EYE = 35
+PRINT = 36          # print the operand list A, B
+CLEAR = 37          # set the variables of the operand list A, B to unassigned
+
+BINARY = {'+': ADD, '-': SUB, '*': MUL, '/': DIV, '==': EQ, '!=': NE, '>': GT, '<': LT, '>=': GE, '<=': LE,
+          '.+': EADD, '.-': ESUB, '.*': EMUL, './': EDIV}
+UNARY = {'-': NEG, "'": TRANSPOSE}
+CONSTRUCTORS = {'zeros': ZEROS, 'ones': ONES, 'eye': EYE}
+BRANCH_OFFSET = JUMP_IF_EQ - EQ  # from a comparison to the jump taken if it holds
+
+FUNCTIONS = [None] * (CLEAR + 1)  # implementation of the opcodes run outside of the fast path of the loop
+for _op, _opcode in BINARY.items():
+    FUNCTIONS[_opcode] = BINARY_OPERATORS[_op]
+for _op, _opcode in UNARY.items():
+    FUNCTIONS[_opcode] = UNARY_OPERATORS[_op]
+for _name, _opcode in CONSTRUCTORS.items():
+    FUNCTIONS[_opcode] = MATRIX_CONSTRUCTORS[_name]
+for _opcode in range(JUMP_IF_EQ, JUMP_IF_LE + 1):
+    FUNCTIONS[_opcode] = FUNCTIONS[_opcode - BRANCH_OFFSET]
+
+# opcode: (name, kinds of the operands: r register, j jump target, l operand list taking two operands)
+OPCODES = {
+    MOVE: ('MOVE', 'rr'),
+    **{opcode: (name, 'rrr') for opcode, name in [(ADD, 'ADD'), (SUB, 'SUB'), (MUL, 'MUL'), (DIV, 'DIV'),
+                                                  (EQ, 'EQ'), (NE, 'NE'), (GT, 'GT'), (LT, 'LT'), (GE, 'GE'),
+                                                  (LE, 'LE'), (EADD, 'EADD'), (ESUB, 'ESUB'), (EMUL, 'EMUL'),
+                                                  (EDIV, 'EDIV')]},
+    NEG: ('NEG', 'rr'),
+    TRANSPOSE: ('TRANSPOSE', 'rr'),
+    JUMP: ('JUMP', 'j'),
+    JUMP_IF: ('JUMP_IF', 'jr'),
+    **{opcode: (name, 'jrr') for opcode, name in [(JUMP_IF_EQ, 'JUMP_IF_EQ'), (JUMP_IF_NE, 'JUMP_IF_NE'),
+                                                  (JUMP_IF_GT, 'JUMP_IF_GT'), (JUMP_IF_LT, 'JUMP_IF_LT'),
+                                                  (JUMP_IF_GE, 'JUMP_IF_GE'), (JUMP_IF_LE, 'JUMP_IF_LE')]},
+    RANGE: ('RANGE', 'rrr'),
+    FOR_NEXT: ('FOR_NEXT', 'jrr'),
+    CHECK: ('CHECK', 'r'),
+    LOAD: ('LOAD', 'rr'),
+    INDEX: ('INDEX', 'rrr'),
+    STORE_INDEX: ('STORE_INDEX', 'rrr'),
+    TUPLE: ('TUPLE', 'rl'),
+    VECTOR: ('VECTOR', 'rl'),
+    ZEROS: ('ZEROS', 'rl'),
+    ONES: ('ONES', 'rl'),
+    EYE: ('EYE', 'rl'),
+    PRINT: ('PRINT', 'l'),
+    CLEAR: ('CLEAR', 'l'),
+}
+
+
+class Bytecode(object):
+    """
+    Compiled program: the instructions, four ints each, and the operand lists of the instructions with a variable
+    number of operands, in int arrays, with the initial contents of the registers. Registers hold the variables,
+    which start UNDEFINED, the constants of the program and the temporaries of the expressions.
+    """
+    WIDTH = 4
+
+    def __init__(self):
+        self.code = array('i')
+        self.operands = array('i')
+        self.registers = []
+        self.names = {}  # register: name of the variable it holds
+        self.constants = set()
+
+    def __len__(self):
+        return len(self.code) // self.WIDTH
+
+    def instruction(self, index: int) -> tuple:
+        start = index * self.WIDTH
+        return tuple(self.code[start:start + self.WIDTH])
+
+    def instructions(self) -> list:
+        """
+        Returns the instructions as (opcode, a, b, c) tuples, decoded once for the dispatch loop,
+        as every read of an array item creates a new int.
+        """
+        code = self.code.tolist()
+        return list(zip(code[0::4], code[1::4], code[2::4], code[3::4]))
+
+    def register(self, register: int) -> str:
+        if register in self.constants:
+            return repr(self.registers[register])
+        if register in self.names:
+            return self.names[register]
+        return f"r{register}"
+
+    def disassemble(self) -> str:
+        """
+        Returns the listing of the instructions, with the index of every instruction, marked with >> if it is
+        the target of a jump, its opcode and its operands: variables by name, constants by value,
+        temporaries as r<register> and jump targets as the index of the instruction.
+        """
+        instructions = self.instructions()
+        targets = {a for opcode, a, b, c in instructions if OPCODES[opcode][1].startswith('j')}
+        lines = []
+        for index, (opcode, *operands) in enumerate(instructions):
+            name, kinds = OPCODES[opcode]
+            formatted = []
+            operands = iter(operands)
+            for kind in kinds:
+                operand = next(operands)
+                if kind == 'r':
+                    formatted.append(self.register(operand))
+                elif kind == 'j':
+                    formatted.append(str(operand))
+                else:
+                    count = next(operands)
+                    formatted.append("(" + ", ".join(self.register(register)
+                                                     for register in self.operands[operand:operand + count]) + ")")
+            marker = ">>" if index in targets else ""
+            lines.append(f"{marker:>2}{index:>6}  {name:<12}{', '.join(formatted)}")
+        return "\n".join(lines)
+
+
+class BytecodeCompiler(object):
+    """
+    Compiles AST.Program to Bytecode for the RegisterMachine.
+
+    Variables are resolved during compilation to registers through the symbol tables of the scopes, like in the
+    ClosureCompiler, with the register as the slot of the symbol; every variable declared in a block gets its own
+    register. Expressions are computed in registers reused between statements, and an expression assigned to a
+    variable is computed into its register directly. Conditions of comparisons are fused with the jump.
+
+    The registers of the variables assigned on every path to a read are tracked, so a variable is checked for
+    an assignment only when it may not have one. Variables read before their declaration, e.g. in loops,
+    are loaded from the register bound once all scopes have been compiled. A block in a loop declares its
+    variables up front and clears them each time it is entered, as its previous run must not assign them.
+    """
+    def __init__(self):
+        self.bytecode = Bytecode()
+        self.symbol_table = SymbolTable(parent_scope=None, name="global")
+        self.constant_registers = {}  # (type, repr) of a constant: register
+        self.temporaries = []  # registers of the temporaries, by depth
+        self.top = 0  # depth of the next free temporary
+        self.assigned = set()  # registers of the variables assigned on every path to the current instruction
+        self.jumps = []  # (breaks, continues): positions of the jumps to patch, per enclosing loop
+        self.loops = 0  # loops around the instruction being compiled
+        self.unresolved = []  # (symbol table, name, position) of the loads of variables read before their declaration
+
+    def compile_program(self, program) -> Bytecode:
+        with recursion_limit():  # the compilation recurses as deep as the tree
+            self.compile(program, None)
+        for symbol_table, name, position in self.unresolved:
+            symbol = symbol_table.get(name)
+            if symbol is not None:
+                self.bytecode.code[position * Bytecode.WIDTH + 2] = symbol.slot
+        return self.bytecode
+
+    def emit(self, opcode: int, a: int = 0, b: int = 0, c: int = 0) -> int:
+        position = len(self.bytecode)
+        self.bytecode.code.extend((opcode, a, b, c))
+        return position
+
+    def patch(self, position: int, target: int):
+        """
+        Sets the target of the jump at the position.
+        """
+        self.bytecode.code[position * Bytecode.WIDTH + 1] = target
+
+    def new_register(self, value=None) -> int:
+        self.bytecode.registers.append(value)
+        return len(self.bytecode.registers) - 1
+
+    def temporary(self) -> int:
+        if self.top == len(self.temporaries):
+            self.temporaries.append(self.new_register())
+        register = self.temporaries[self.top]
+        self.top += 1
+        return register
+
+    def constant(self, value) -> int:
+        key = (type(value), repr(value))
+        register = self.constant_registers.get(key)
+        if register is None:
+            register = self.constant_registers[key] = self.new_register(value)
+            self.bytecode.constants.add(register)
+        return register
+
+    def declare(self, name: str, symbol_table: SymbolTable) -> int:
+        register = self.new_register(UNDEFINED)
+        symbol_table.put(VariableSymbol(name=name, type_=None, slot=register))
+        self.bytecode.names[register] = name
+        return register
+
+    def store(self, name: str) -> int:
+        """
+        Returns the register of an assignment target, declaring it in the current scope if it is not visible.
+        """
+        symbol = self.symbol_table.get(name)
+        if symbol is None:
+            return self.declare(name, self.symbol_table)
+        return symbol.slot
+
+    def operand_list(self, nodes) -> tuple:
+        """
+        Computes the nodes and returns the offset and the count of the operand list of their registers.
+        """
+        registers = [self.compile(node, None) for node in nodes]
+        offset = len(self.bytecode.operands)
+        self.bytecode.operands.extend(registers)
+        return offset, len(registers)
+
+    def statement(self, node):
+        top = self.top
+        self.compile(node, None)
+        self.top = top
+
+    def branch(self, condition) -> int:
+        """
+        Emits the jump taken if the condition holds and returns its position, to patch with the target.
+        """
+        if isinstance(condition, AST.BinaryOperation) and EQ <= BINARY[condition.op] <= LE:
+            left = self.compile(condition.left, None)
+            right = self.compile(condition.right, None)
+            return self.emit(BINARY[condition.op] + BRANCH_OFFSET, 0, left, right)
+        return self.emit(JUMP_IF, 0, self.compile(condition, None))
+
+    def loop_body(self, body, assigned: set) -> tuple:
+        """
+        Compiles the body of a loop and returns the positions of its breaks and continues.
+        """
+        self.jumps.append(([], []))
+        self.assigned = set(assigned)
+        self.loops += 1
+        self.statement(body)
+        self.loops -= 1
+        return self.jumps.pop()
+
+    def block_declarations(self, block) -> list:
+        """
+        Returns the names of the variables the block declares: the targets of its assignments not visible outside
+        of it and its loop variables, without those of the blocks nested in it. A loop variable whose name is read
+        earlier in the block, from the enclosing scope, is left to be declared when its loop is compiled.
+        """
+        names = {}
+        mentioned = set()  # names of the variables referenced so far, in the order of the source
+        stack = [(instruction, False) for instruction in reversed(block.instructions)]
+        while stack:
+            node, nested = stack.pop()
+            if isinstance(node, str):  # the loop variable of a for loop, bound after its range is evaluated
+                if self.symbol_table.get(node) is None or node not in mentioned:
+                    names[node] = None
+            elif isinstance(node, (list, tuple)):
+                stack.extend((element, nested) for element in reversed(node))
+            elif isinstance(node, AST.Variable):
+                mentioned.add(node.name)
+            elif isinstance(node, AST.ForLoopInstruction):
+                stack.append((node.body, nested))
+                if not nested:
+                    stack.append((node.id.name, nested))
+                stack.append((node.range, nested))
+            elif isinstance(node, AST.Node):
+                if isinstance(node, AST.Assignment) and not nested and isinstance(node.id, AST.Variable) \
+                        and self.symbol_table.get(node.id.name) is None:
+                    names[node.id.name] = None
+                nested = nested or isinstance(node, AST.Block)
+                stack.extend((value, nested) for name, value in reversed(AST.fields(node)))
+        return list(names)
+
+    @on('node')
+    def compile(self, node, target):
+        pass
+
+    @when(AST.Program)
+    def compile(self, node, target):
+        # a break or continue outside of a loop ends the top-level instruction, as in the Interpreter
+        for instruction in node.instructions:
+            self.jumps.append(([], []))
+            self.statement(instruction)
+            for position in sum(self.jumps.pop(), []):
+                self.patch(position, len(self.bytecode))
+
+    @when(AST.Block)
+    def compile(self, node, target):
+        names = self.block_declarations(node) if self.loops else []
+        self.symbol_table = SymbolTable(parent_scope=self.symbol_table, name="block")
+        if names:
+            registers = [self.declare(name, self.symbol_table) for name in names]
+            offset = len(self.bytecode.operands)
+            self.bytecode.operands.extend(registers)
+            self.emit(CLEAR, offset, len(registers))
+        for instruction in node.instructions:
+            self.statement(instruction)
+        self.symbol_table = self.symbol_table.parent_scope
+
+    @when(AST.FunctionalInstruction)
+    def compile(self, node, target):
+        offset, count = self.operand_list(node.args)
+        if node.instruction == 'print':
+            self.emit(PRINT, offset, count)
+            return None
+        register = self.temporary() if target is None else target
+        self.emit(CONSTRUCTORS[node.instruction], register, offset, count)
+        return register
+
+    @when(AST.WhileInstruction)
+    def compile(self, node, target):
+        assigned = self.assigned
+        start = self.emit(JUMP)
+        breaks, continues = self.loop_body(node.body, assigned)
+        test = len(self.bytecode)
+        self.assigned = set(assigned)
+        self.patch(self.branch(node.condition), start + 1)
+        self.patch(start, test)
+        for position in continues:
+            self.patch(position, test)
+        for position in breaks:
+            self.patch(position, len(self.bytecode))
+
+    @when(AST.ForLoopInstruction)
+    def compile(self, node, target):
+        # range bounds are evaluated before the loop variable is bound, as in the Interpreter
+        start = self.compile(node.range.start, None)
+        end = self.compile(node.range.end, None)
+        # the loop variable is always declared in the current scope
+        symbol = self.symbol_table.symbols.get(node.id.name)
+        variable = symbol.slot if symbol is not None else self.declare(node.id.name, self.symbol_table)
+        iterator = self.temporary()
+        self.emit(RANGE, iterator, start, end)  # before the move, as the end may be the loop variable
+        self.emit(MOVE, variable, start)
+        self.assigned.add(variable)
+        jump = self.emit(JUMP)
+
+        assigned = self.assigned
+        breaks, continues = self.loop_body(node.body, assigned)
+        self.assigned = assigned
+        self.patch(jump, len(self.bytecode))
+        for position in continues:
+            self.patch(position, len(self.bytecode))
+        self.emit(FOR_NEXT, jump + 1, iterator, variable)
+        for position in breaks:
+            self.patch(position, len(self.bytecode))
+
+    @when(AST.FlowControlInstruction)
+    def compile(self, node, target):
+        breaks, continues = self.jumps[-1]
+        if node.instruction == 'break':
+            breaks.append(self.emit(JUMP))
+        elif node.instruction == 'continue':
+            continues.append(self.emit(JUMP))
+
+    @when(AST.Ifstatement)
+    def compile(self, node, target):
+        # the else part follows the jump to the instruction, which is placed last
+        jump = self.branch(node.condition)
+        assigned = self.assigned
+        if node.elsepart:
+            self.assigned = set(assigned)
+            self.statement(node.elsepart)
+            assigned_else = self.assigned
+        else:
+            assigned_else = assigned
+        end = self.emit(JUMP)
+        self.patch(jump, len(self.bytecode))
+        self.assigned = set(assigned)
+        self.statement(node.instruction)
+        self.assigned &= assigned_else
+        self.patch(end, len(self.bytecode))
+
+    @when(AST.Assignment)
+    def compile(self, node, target):
+        if not isinstance(node.id, AST.Reference):
+            if node.op in ASSIGNMENT_OPERATORS:
+                current = self.compile(node.id, None)
+                expr = self.compile(node.expr, None)
+                register = self.store(node.id.name)
+                self.emit(BINARY[ASSIGNMENT_OPERATORS[node.op]], register, current, expr)
+            else:
+                # the expression is computed into the register of the variable, which it may read
+                register = self.store(node.id.name)
+                value = self.compile(node.expr, register)
+                if value != register:
+                    self.emit(MOVE, register, value)
+            self.assigned.add(register)
+            return
+
+        value = self.compile(node.expr, None)
+        if node.op in ASSIGNMENT_OPERATORS:
+            current = self.compile(node.id, None)
+            result = self.temporary()
+            self.emit(BINARY[ASSIGNMENT_OPERATORS[node.op]], result, current, value)
+            value = result
+        base = self.compile(node.id.id, None)
+        self.emit(STORE_INDEX, base, self.index(node.id.index), value)
+
+    def index(self, index) -> int:
+        """
+        Computes the index of a reference to a single register, holding a scalar or a tuple.
+        """
+        if len(index.elements) == 1:
+            return self.compile(index.elements[0], None)
+        offset, count = self.operand_list(index.elements)
+        register = self.temporary()
+        self.emit(TUPLE, register, offset, count)
+        return register
+
+    @when(AST.BinaryOperation)
+    def compile(self, node, target):
+        left = self.compile(node.left, None)
+        right = self.compile(node.right, None)
+        register = self.temporary() if target is None else target
+        self.emit(BINARY[node.op], register, left, right)
+        return register
+
+    @when(AST.UnaryOperation)
+    def compile(self, node, target):
+        operand = self.compile(node.operand, None)
+        register = self.temporary() if target is None else target
+        self.emit(UNARY[node.op], register, operand)
+        return register
+
+    @when(AST.Vector)
+    def compile(self, node, target):
+        offset, count = self.operand_list(node.elements)
+        register = self.temporary() if target is None else target
+        self.emit(VECTOR, register, offset, count)
+        return register
+
+    @when(AST.Reference)
+    def compile(self, node, target):
+        base = self.compile(node.id, None)
+        index = self.index(node.index)
+        register = self.temporary() if target is None else target
+        self.emit(INDEX, register, base, index)
+        return register
+
+    @when(AST.Variable)
+    def compile(self, node, target):
+        symbol = self.symbol_table.get(node.name)
+        if symbol is None:
+            # bound by compile_program, to a register which stays UNDEFINED if the variable is never declared
+            placeholder = self.new_register(UNDEFINED)
+            self.bytecode.names[placeholder] = node.name
+            register = self.temporary() if target is None else target
+            self.unresolved.append((self.symbol_table, node.name, self.emit(LOAD, register, placeholder)))
+            return register
+
+        register = symbol.slot
+        if register not in self.assigned:
+            self.emit(CHECK, register)
+            self.assigned.add(register)
+        return register
+
+    @when(AST.Integer)
+    def compile(self, node, target):
+        return self.constant(node.value)
+
+    @when(AST.Float)
+    def compile(self, node, target):
+        return self.constant(node.value)
+
+    @when(AST.String)
+    def compile(self, node, target):
+        return self.constant(node.value)
+
+
+class RegisterMachine(object):
+    """
+    Execution backend that compiles the AST to Bytecode and runs it in a single dispatch loop over the
+    instructions, without recursion or per-node dispatch. Like the Interpreter, it is run with
+    ast.accept(RegisterMachine()).
+
+    The scalar arithmetic, moves, comparisons with their jumps and loop steps are executed inline, in the order
+    of their frequency, and the other opcodes through the functions implementing them.
+    """
+    def __init__(self):
+        self.registers = []
+
+    def visit(self, node):
+        return self.run(BytecodeCompiler().compile_program(node))
+
+    def run(self, bytecode: Bytecode):
+        instructions = bytecode.instructions()
+        operands = bytecode.operands.tolist()
+        self.registers = r = list(bytecode.registers)
+        functions = FUNCTIONS
+        end = len(instructions)
+        pc = 0
+        while pc < end:
+            op, a, b, c = instructions[pc]
+            pc += 1
+            if op == ADD:
+                r[a] = r[b] + r[c]
+            elif op == FOR_NEXT:
+                value = next(r[b], None)
+                if value is not None:
+                    r[c] = value
+                    pc = a
+            elif op == MOVE:
+                r[a] = r[b]
+            elif op == SUB:
+                r[a] = r[b] - r[c]
+            elif op == MUL:
+                r[a] = r[b] * r[c]
+            elif op == DIV:
+                r[a] = r[b] / r[c]
+            elif op == JUMP_IF_LT:
+                if r[b] < r[c]:
+                    pc = a
+            elif op == JUMP_IF_GT:
+                if r[b] > r[c]:
+                    pc = a
+            elif op == JUMP:
+                pc = a
+            elif op == JUMP_IF_EQ:
+                if r[b] == r[c]:
+                    pc = a
+            elif op == JUMP_IF_NE:
+                if r[b] != r[c]:
+                    pc = a
+            elif op == JUMP_IF_GE:
+                if r[b] >= r[c]:
+                    pc = a
+            elif op == JUMP_IF_LE:
+                if r[b] <= r[c]:
+                    pc = a
+            elif op == JUMP_IF:
+                if r[b]:
+                    pc = a
+            elif op == INDEX:
+                r[a] = r[b][r[c]]
+            elif op <= EDIV:
+                r[a] = functions[op](r[b], r[c])
+            elif op <= TRANSPOSE:
+                r[a] = functions[op](r[b])
+            elif op == RANGE:
+                r[a] = iter(range(r[b], r[c]))
+            elif op == CHECK:
+                if r[a] is UNDEFINED:
+                    raise Exception(f"Variable {bytecode.names[a]} not found")
+            elif op == LOAD:
+                value = r[b]
+                if value is UNDEFINED:
+                    raise Exception(f"Variable {bytecode.names[b]} not found")
+                r[a] = value
+            elif op == STORE_INDEX:
+                r[a][r[b]] = r[c]
+            elif op == TUPLE:
+                r[a] = tuple([r[i] for i in operands[b:b + c]])
+            elif op == VECTOR:
+                r[a] = vector([r[i] for i in operands[b:b + c]])
+            elif op <= EYE:
+                r[a] = functions[op](*[r[i] for i in operands[b:b + c]])
+            elif op == PRINT:
+                print(format_values(*[r[i] for i in operands[a:a + b]]))
+            elif op == CLEAR:
+                for i in operands[a:a + b]:
+                    r[i] = UNDEFINED
@@ -0,0 +1,16 @@
+class Signal:
+    """
+    Control flow signal returned by a statement to the enclosing loop instead of raising an exception.
+    Statements completing normally return None.
+    """
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return f"Signal({self.name})"
+
+
+BREAK = Signal('break')
+CONTINUE = Signal('continue')
@@ -0,0 +1,412 @@
+import AST
+from interpreter.Interpreter import Interpreter
+from interpreter.Signals import BREAK, CONTINUE
+from interpreter.Operations import format_values
+
+# exits of a trace, returned with the number of iterations it ran and the values of the variables
+DONE = 0  # the loop condition was false or the range was exhausted
+EXIT = 1  # a guard failed at the start of an iteration, which the interpreter runs instead
+BROKEN = 2  # the iteration ended with a break
+
+TRACED_TYPES = (int, float, bool)
+SAMPLES = {int: 1, float: 1.0, bool: True}  # values whose operations give the result type of every other value
+OPERATORS = ('+', '-', '*', '/', '==', '!=', '>', '<', '>=', '<=')
+
+
+class TraceAbort(Exception):
+    """
+    Raised when the recorded path of an iteration contains a statement or a value the traces do not support.
+    """
+
+
+class Trace:
+    """
+    Compiled path of a loop iteration, run for as long as the guards of the iteration hold.
+
+    The function of the trace takes the next value of the loop variable of a for loop, the end of the range
+    and the values of the variables read or written by the iteration outside of its own blocks, and returns
+    the exit, the number of iterations it ran, the next value and the new values of the variables.
+    """
+    __slots__ = ('function', 'source', 'names', 'guards', 'local_names')
+
+    def __init__(self, function, source: str, names: list, guards: list, local_names: list):
+        self.function = function
+        self.source = source
+        self.names = names
+        self.guards = guards  # type the value of each variable must have at the entry, or None
+        self.local_names = local_names  # variables declared in the blocks of the iteration
+
+    def enter(self, memory_stack):
+        """
+        Returns the memories holding the variables and their values, or None when the trace cannot be entered.
+        """
+        stack = memory_stack.stack
+        memories = []
+        values = []
+        for name, guard in zip(self.names, self.guards):
+            for memory in reversed(stack):
+                if name in memory.variables:
+                    break
+            else:
+                return None
+            value = memory.variables[name]
+            if guard is not None and type(value) is not guard:
+                return None
+            memories.append(memory)
+            values.append(value)
+        for name in self.local_names:  # the blocks of the iteration would assign them instead of declaring them
+            for memory in stack:
+                if name in memory.variables:
+                    return None
+        return memories, values
+
+
+class TraceCompiler:
+    """
+    Compiles the path a loop iteration took, given by the outcomes of its if statements, to a Python function.
+
+    The iteration is compiled in static single assignment form: every assignment gets a new local, and
+    the variables of the loop are only updated at the end of the iteration, so when the condition of an if
+    statement takes the other branch, the function returns the values from the start of the iteration,
+    which the interpreter then runs. The types of the values are known from the types at the entry,
+    checked by the trace; the variables whose type changes during the iteration are checked again at the start
+    of every iteration. Printing is not undone, so a path printing before the condition of an if statement
+    is not compiled.
+    """
+    def __init__(self, memory_stack, branches: dict):
+        self.memory_stack = memory_stack
+        self.branches = branches  # id(if statement) -> whether its condition was true
+        self.names = {}  # variable of the loop -> index of its parameter
+        self.guards = []
+        self.current = {}  # variable of the loop -> code of its value in the iteration
+        self.scopes = []  # variables declared in the blocks of the iteration -> code of their value
+        self.local_names = set()
+        self.types = {}  # code of a value -> its type
+        self.lines = []
+        self.temporaries = 0
+        self.printed = False
+
+    def compile(self, node) -> Trace:
+        if isinstance(node, AST.ForLoopInstruction):
+            id, _, body = node.args
+            self.assign(id.name, self.temporary("value", int))
+            exhausted, advance = "value >= stop", ["value += 1"]
+        else:
+            condition, body = node.args
+            exhausted, advance = f"not ({self.expression(condition)})", []
+        signal = self.statement(body)
+
+        parameters = list(self.parameters())
+        values = ", ".join(["value"] + parameters)
+        changed = [(parameter, self.current[name]) for name, parameter in zip(self.names, parameters)
+                   if self.current[name] != parameter]
+        commit = [f"{', '.join(parameter for parameter, _ in changed)} = {', '.join(code for _, code in changed)}"]
+        header = [f"if type({parameter}) is not {guard.__name__}: return {EXIT}, iterations, {values}"
+                  for name, parameter, guard in zip(self.names, parameters, self.guards)
+                  if guard is not None and self.types[self.current[name]] is not guard]
+        header.append(f"if {exhausted}: return {DONE}, iterations, {values}")
+        footer = (commit if changed else []) + ["iterations += 1"]
+        footer += [f"return {BROKEN}, iterations, {values}"] if signal is BREAK else advance
+
+        source = "\n".join([f"def trace({', '.join(['value', 'stop'] + parameters)}):",
+                            "    iterations = 0",
+                            "    while True:"]
+                           + ["        " + line.replace("{values}", values) for line in header + self.lines + footer])
+        namespace = {'_print': lambda *values: print(format_values(*values))}
+        exec(compile(source, "<trace>", "exec"), namespace)
+        return Trace(namespace['trace'], source, list(self.names), self.guards, sorted(self.local_names))
+
+    def parameters(self):
+        return (f"v{index}" for index in range(len(self.names)))
+
+    def temporary(self, code: str, type_) -> str:
+        name = f"t{self.temporaries}"
+        self.temporaries += 1
+        self.lines.append(f"{name} = {code}")
+        self.types[name] = type_
+        return name
+
+    def variable(self, name: str, declare: bool = False) -> dict:
+        """
+        Returns the scope of the variable: a block of the iteration or the variables of the loop.
+        """
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope
+        if name not in self.names:
+            for memory in reversed(self.memory_stack.stack):
+                if name in memory.variables:
+                    value = memory.variables[name]
+                    break
+            else:
+                if not declare or not self.scopes:
+                    raise TraceAbort(f"variable {name} outside of the blocks of the iteration")
+                self.local_names.add(name)
+                return self.scopes[-1]
+            parameter = f"v{len(self.names)}"
+            self.names[name] = len(self.names)
+            self.current[name] = parameter
+            self.guards.append(type(value) if not declare else None)
+            self.types[parameter] = type(value)
+        return self.current
+
+    def assign(self, name: str, code: str):
+        self.variable(name, declare=True)[name] = code
+
+    def guard(self, code: str):
+        if self.printed:
+            raise TraceAbort("guard after print")
+        # the variables of the loop are only known at the end, so the values returned are filled in then
+        self.lines.append(f"if {code}: return {EXIT}, iterations, {{values}}")
+
+    def statement(self, node):
+        kind = type(node)
+        if kind is AST.Block:
+            self.scopes.append({})
+            for instruction in node.instructions:
+                signal = self.statement(instruction)
+                if signal is not None:
+                    break
+            else:
+                signal = None
+            self.scopes.pop()
+            return signal
+        if kind is AST.Assignment:
+            if type(node.id) is not AST.Variable:
+                raise TraceAbort("assignment to a reference")
+            code, type_ = self.typed(node.expr)
+            if node.op != '=':
+                current = self.variable(node.id.name)[node.id.name]
+                self.check_type(current)
+                code, type_ = self.operation(node.op[0], (current, self.types[current]), (code, type_))
+            self.assign(node.id.name, self.temporary(code, type_))
+            return None
+        if kind is AST.Ifstatement:
+            taken = self.branches.get(id(node))
+            if taken is None:
+                raise TraceAbort("if statement not recorded")
+            condition = self.expression(node.condition)
+            self.guard(f"not ({condition})" if taken else condition)
+            if taken:
+                return self.statement(node.instruction)
+            return self.statement(node.elsepart) if node.elsepart is not None else None
+        if kind is AST.FlowControlInstruction:
+            if node.instruction == 'break':
+                return BREAK
+            if node.instruction == 'continue':
+                return CONTINUE
+        if kind is AST.FunctionalInstruction and node.instruction == 'print':
+            self.lines.append(f"_print({', '.join(self.expression(arg) for arg in node.args)})")
+            self.printed = True
+            return None
+        raise TraceAbort(f"{kind.__name__} in the iteration")
+
+    def expression(self, node) -> str:
+        return self.typed(node)[0]
+
+    def typed(self, node) -> tuple:
+        """
+        Returns the code of the expression and the type of its value.
+        """
+        kind = type(node)
+        if kind is AST.Variable:
+            code = self.variable(node.name)[node.name]
+            self.check_type(code)
+            return code, self.types[code]
+        if kind is AST.Integer or kind is AST.Float:
+            return repr(node.value), type(node.value)
+        if kind is AST.BinaryOperation and node.op in OPERATORS:
+            return self.operation(node.op, self.typed(node.left), self.typed(node.right))
+        if kind is AST.UnaryOperation and node.op == '-':
+            code, type_ = self.typed(node.operand)
+            return f"(-{code})", type(-SAMPLES[type_])
+        raise TraceAbort(f"{kind.__name__} in the iteration")
+
+    def check_type(self, code: str):
+        if self.types[code] not in TRACED_TYPES:
+            raise TraceAbort(f"value of type {self.types[code].__name__}")
+
+    def operation(self, op: str, left: tuple, right: tuple) -> tuple:
+        (left, left_type), (right, right_type) = left, right
+        sample = eval(f"a {op} b", {'a': SAMPLES[left_type], 'b': SAMPLES[right_type]})
+        return f"({left} {op} {right})", type(sample)
+
+
+class LoopStats:
+    __slots__ = ('node', 'lineno', 'iterations', 'traced_iterations', 'traces', 'entries', 'exits', 'aborts')
+
+    def __init__(self, node, lineno):
+        self.node = node
+        self.lineno = lineno
+        self.iterations = 0  # iterations run by the interpreter
+        self.traced_iterations = 0
+        self.traces = []
+        self.entries = 0
+        self.exits = 0  # entries ended by a failed guard
+        self.aborts = 0  # recorded iterations which could not be compiled
+
+    @property
+    def label(self) -> str:
+        return f"{type(self.node).__name__} {self.node.instruction}"
+
+
+class TracingInterpreter(Interpreter):
+    """
+    Interpreter compiling the hot loops: once a while or for loop has run hot_loop iterations, the path of its
+    next iteration is recorded, compiled to a trace specialized for the types of the variables, and the loop runs
+    in the trace until a guard fails, when the interpreter takes over for an iteration.
+
+    Only innermost loops over numbers are compiled. A loop whose iterations fail to compile max_aborts times,
+    or which has max_traces traces, is left to the interpreter. The counters of the loops are kept in loops.
+    """
+    hot_loop = 50
+    max_traces = 4
+    max_aborts = 3
+
+    def __init__(self, parser=None, memory_stack=None):
+        super().__init__(memory_stack)
+        self.parser = parser
+        self.loops = {}  # id(node) -> LoopStats, which keeps the node alive
+        self.recorder = None  # id(if statement) -> outcome, while an iteration is recorded
+
+    @property
+    def traced_iterations(self) -> int:
+        return sum(loop.traced_iterations for loop in self.loops.values())
+
+    @property
+    def iterations(self) -> int:
+        return sum(loop.iterations for loop in self.loops.values())
+
+    def loop(self, node) -> LoopStats:
+        loop = self.loops.get(id(node))
+        if loop is None:
+            lineno = None
+            if self.parser is not None:
+                try:
+                    lineno = self.parser.line_position(node)
+                except (KeyError, AttributeError):  # not parsed by the parser, e.g. loaded from the cache
+                    pass
+            loop = self.loops[id(node)] = LoopStats(node, lineno)
+        return loop
+
+    def evaluate(self, node):
+        kind = type(node)
+        if kind is AST.WhileInstruction:
+            return self.while_loop(node)
+        if kind is AST.ForLoopInstruction:
+            return self.for_loop(node)
+        if kind is AST.Ifstatement and self.recorder is not None:
+            return self.recorded_if(node)
+        return super().evaluate(node)
+
+    def recorded_if(self, node):
+        condition = yield node.condition
+        self.recorder[id(node)] = bool(condition)
+        if condition:
+            return (yield node.instruction)
+        elif node.elsepart:
+            return (yield node.elsepart)
+
+    def hot(self, loop: LoopStats) -> bool:
+        return loop.iterations >= self.hot_loop and (loop.traces or loop.aborts < self.max_aborts)
+
+    def run_trace(self, loop: LoopStats, value, stop):
+        """
+        Runs the traces of the loop which can be entered, until one of them runs an iteration, and returns
+        its exit and the next value of a for loop. The exit is None when no trace ran an iteration.
+        """
+        for trace in loop.traces:
+            entry = trace.enter(self.memory_stack)
+            if entry is None:
+                continue
+            memories, values = entry
+            exit, iterations, value, *values = trace.function(value, stop, *values)
+            for memory, name, new in zip(memories, trace.names, values):
+                memory.variables[name] = new
+            loop.entries += 1
+            loop.traced_iterations += iterations
+            if exit != EXIT:
+                return exit, value
+            loop.exits += 1
+            if iterations:
+                return exit, value
+        return None, value
+
+    def record(self, loop: LoopStats) -> bool:
+        if self.recorder is None and loop.aborts < self.max_aborts and len(loop.traces) < self.max_traces:
+            self.recorder = {}
+            return True
+        return False
+
+    def compile_trace(self, loop: LoopStats):
+        branches, self.recorder = self.recorder, None
+        try:
+            loop.traces.append(TraceCompiler(self.memory_stack, branches).compile(loop.node))
+        except TraceAbort:
+            loop.aborts += 1
+
+    def iteration(self, loop: LoopStats, body, hot: bool):
+        """
+        Evaluates the body of the loop, recording the path of the iteration when the loop is hot and
+        no trace could run it.
+        """
+        loop.iterations += 1
+        if not (hot and self.record(loop)):
+            return (yield body)
+        try:
+            signal = yield body
+        except BaseException:
+            self.recorder = None
+            raise
+        self.compile_trace(loop)
+        return signal
+
+    def while_loop(self, node):
+        condition, body = node.args
+        loop = self.loop(node)
+        while True:
+            hot = self.hot(loop)
+            if hot:
+                exit, _ = self.run_trace(loop, None, None)
+                if exit == DONE or exit == BROKEN:
+                    return
+            if not (yield condition):
+                break
+            if (yield from self.iteration(loop, body, hot)) is BREAK:
+                break
+
+    def for_loop(self, node):
+        id, range_, body = node.args
+        start = yield range_.start
+        end = yield range_.end
+
+        self.memory_stack.insert(id.name, start)
+
+        values = range(start, end)
+        value, stop = values.start, values.stop
+        loop = self.loop(node)
+        while value < stop:
+            hot = self.hot(loop)
+            if hot:
+                exit, value = self.run_trace(loop, value, stop)
+                if exit == DONE or exit == BROKEN:
+                    return
+            self.memory_stack.set(id.name, value)
+            if (yield from self.iteration(loop, body, hot)) is BREAK:
+                break
+            value += 1
+
+    def report(self) -> str:
+        """
+        Returns a table of the counters of the loops, with the iterations run by the interpreter and the traces.
+        """
+        lines = [f"{'iterations':>12} {'traced':>12} {'traces':>7} {'entries':>8} {'exits':>6} {'aborts':>7} "
+                 f"{'line':>6}  loop"]
+        for loop in sorted(self.loops.values(), key=lambda loop: loop.traced_iterations + loop.iterations,
+                           reverse=True):
+            lineno = loop.lineno if loop.lineno is not None else "-"
+            lines.append(f"{loop.iterations:>12} {loop.traced_iterations:>12} {len(loop.traces):>7} "
+                         f"{loop.entries:>8} {loop.exits:>6} {loop.aborts:>7} {lineno:>6}  {loop.label}")
+        traced, total = self.traced_iterations, self.traced_iterations + self.iterations
+        lines.append(f"{traced} of {total} iterations run in traces")
+        return "\n".join(lines)
@@ -1,11 +1,14 @@
+import sys
 import inspect
+import contextlib
+from types import GeneratorType
 
 """
 Implementation of visitor pattern by Curtis Schlak.
 https://curtis.schlak.com/2013/06/20/follow-up-to-python-visitor-pattern.html
 """
 
-__all__ = ['on', 'when']
+__all__ = ['on', 'when', 'trampoline', 'recursion_limit']
 
 
 def on(param_name):
@@ -58,3 +61,57 @@ class Dispatcher(object):
             return inspect.getfullargspec(fn)
         else:
             return inspect.getargspec(fn)
+
+
+def trampoline(dispatch, node):
+    """
+    Runs a visitor over the tree without recursion.
+
+    dispatch(node) returns the result of a node directly, or a generator which yields the children to visit,
+    is sent their results and returns the result of the node. The generators in progress are kept on an explicit
+    stack, so the depth of the tree is not limited by the call stack. An exception is thrown into the generator
+    of the parent, where it propagates as it would through recursive calls.
+    """
+    result = dispatch(node)
+    if type(result) is not GeneratorType:
+        return result
+    stack = []
+    generator, value, error = result, None, None
+    while True:
+        try:
+            child = generator.send(value) if error is None else generator.throw(error)
+        except StopIteration as stop:
+            if not stack:
+                return stop.value
+            generator, value, error = stack.pop(), stop.value, None
+            continue
+        except Exception as exception:
+            if not stack:
+                raise
+            generator, value, error = stack.pop(), None, exception
+            continue
+
+        try:
+            result = dispatch(child)
+        except Exception as exception:
+            value, error = None, exception
+            continue
+        if type(result) is GeneratorType:
+            stack.append(generator)
+            generator, value, error = result, None, None
+        else:
+            value, error = result, None
+
+
+@contextlib.contextmanager
+def recursion_limit(limit: int = 10000):
+    """
+    Raises the recursion limit to at least the limit for the backends which recurse as deep as the tree,
+    restoring the previous one afterwards, so importing or running them leaves the interpreter unchanged.
+    """
+    previous = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(previous, limit))
+    try:
+        yield
+    finally:
+        sys.setrecursionlimit(previous)
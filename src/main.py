@@ -1,27 +1,122 @@
 import sys
+import argparse
+import warnings
 from Scanner import Scanner
+from FastScanner import FastScanner
 from Parser import Parser
+from FlatAST import FlatTree
+from ASTCache import ASTCache
 from TreePrinter import TreePrinter
-from NodeVisitor import NodeVisitor
+from LexicalAnalyzer import LexicalAnalyzer
+from Optimizer import Optimizer
+from interpreter.Interpreter import Interpreter
+from interpreter.ClosureCompiler import ClosureCompiler
+from interpreter.PythonCompiler import PythonCompiler
+from interpreter.FlatInterpreter import FlatInterpreter
+from interpreter.RegisterMachine import RegisterMachine, BytecodeCompiler
+from interpreter.Profiler import ProfilingInterpreter
+from interpreter.TracingJIT import TracingInterpreter
+from interpreter.CCompiler import CCompiler
+
+
+SCANNERS = {
+    'sly': Scanner,
+    'fast': FastScanner,
+}
+
+ENGINES = {
+    'interpreter': Interpreter,
+    'closure': ClosureCompiler,
+    'python': PythonCompiler,
+    'flat': FlatInterpreter,
+    'vm': RegisterMachine,
+    'jit': TracingInterpreter,
+    'c': CCompiler,
+}
 
 
 if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser()
+    argument_parser.add_argument('filename', nargs='?', default="example.txt")
+    argument_parser.add_argument('--engine', choices=ENGINES.keys(), default='interpreter',
+                                 help="execution backend used to run the program")
+    argument_parser.add_argument('--scanner', choices=SCANNERS.keys(), default='sly',
+                                 help="scanner implementation used to tokenize the program")
+    argument_parser.add_argument('--profile', metavar='STACKS_FILE',
+                                 help="profile the interpreter: print the hottest nodes to stderr "
+                                      "and write the collapsed stacks for flame graphs to the file")
+    argument_parser.add_argument('--no-optimize', action='store_true',
+                                 help="run the program without folding constants and hoisting loop invariants")
+    argument_parser.add_argument('--cache', metavar='DIRECTORY',
+                                 help="store the analyzed AST in the directory and load it on later runs "
+                                      "of the same source instead of scanning and parsing it")
+    argument_parser.add_argument('--disassemble', action='store_true',
+                                 help="print the bytecode of the program for the vm engine instead of running it")
+    argument_parser.add_argument('--jit-stats', action='store_true',
+                                 help="print the iterations of every loop run by the jit engine in traces to stderr")
+    args = argument_parser.parse_args()
+    if args.profile and args.engine != 'interpreter':
+        argument_parser.error("--profile requires the interpreter engine")
+    if args.profile and args.cache:
+        argument_parser.error("--profile reads the source positions of the nodes, which are not cached")
+    if args.jit_stats and args.engine != 'jit':
+        argument_parser.error("--jit-stats requires the jit engine")
 
     try:
-        filename = sys.argv[1] if len(sys.argv) > 1 else "example.txt"
-        file = open(filename, "r")
+        file = open(args.filename, "r")
     except IOError:
-        print("Cannot open {0} file".format(filename))
+        print("Cannot open {0} file".format(args.filename))
         sys.exit(0)
 
-    text = file.read()
-    lexer = Scanner()
+    lexer = SCANNERS[args.scanner]()
     parser = Parser()
+    parser.intern_leaves = not args.profile  # the profile reports the line of every node
+
+    types = None  # inferred by the closure engine itself when the tree is loaded from the cache
+    if args.cache:
+        cache = ASTCache(args.cache)
+        source = file.read()
+        cached = cache.load(source)
+        if cached is None:
+            ast = parser.parse(lexer.tokenize(source))
+            lexical_analyzer = LexicalAnalyzer()
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                lexical_analyzer.visit(ast)
+            types = lexical_analyzer.types
+            messages = [str(warning.message) for warning in caught]
+            cache.store(source, FlatTree.from_ast(ast), messages)
+        else:
+            tree, messages = cached
+            ast = tree.view()
+            parser = None  # the tree was not parsed, so there are no source positions
+        ast.printTree()
+        for message in messages:
+            warnings.warn(message)
+    else:
+        ast = parser.parse(lexer.tokenize_stream(file))
+        ast.printTree()
 
-    ast = parser.parse(lexer.tokenize(text))
-    ast.printTree()
+        lexical_analyzer = LexicalAnalyzer()
+        lexical_analyzer.visit(ast)
+        types = lexical_analyzer.types
 
-    node_visitor = NodeVisitor()
-    node_visitor.visit(ast)
+    if not args.no_optimize:
+        ast = Optimizer().optimize(ast)
 
-    # ast.accept(Interpreter())
+    if args.disassemble:
+        print(BytecodeCompiler().compile_program(ast).disassemble())
+    elif args.profile:
+        profiler = ProfilingInterpreter(parser)
+        ast.accept(profiler)
+        print(profiler.report(), file=sys.stderr)
+        profiler.dump_collapsed_stacks(args.profile)
+    elif args.engine == 'jit':
+        jit = TracingInterpreter(parser)
+        ast.accept(jit)
+        if args.jit_stats:
+            print(jit.report(), file=sys.stderr)
+    elif args.engine == 'closure':
+        ast.accept(ClosureCompiler(types))
+    else:
+        ast.accept(ENGINES[args.engine]())
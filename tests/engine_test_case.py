@@ -0,0 +1,68 @@
+import io
+import unittest
+import contextlib
+from Scanner import Scanner
+from Parser import Parser
+from interpreter.Interpreter import Interpreter
+from interpreter.ClosureCompiler import ClosureCompiler
+from interpreter.PythonCompiler import PythonCompiler
+from interpreter.FlatInterpreter import FlatInterpreter
+from interpreter.RegisterMachine import RegisterMachine
+from interpreter.TracingJIT import TracingInterpreter
+from interpreter.CCompiler import CCompiler
+
+
+class EngineTestCase(unittest.TestCase):
+	"""
+	Base of the test cases running programs, checking the output of the execution backends against each other.
+	"""
+	PROGRAMS = ['fibonacci', 'matrix', 'pi', 'primes', 'sqrt', 'triangle']
+	ENGINES = [lambda: Interpreter(), lambda: ClosureCompiler(), lambda: PythonCompiler(), lambda: FlatInterpreter(),
+			   lambda: RegisterMachine(), lambda: TracingInterpreter(), lambda: CCompiler()]
+	interpreter_output = {}  # shared between test cases, the reference Interpreter is slow on the loop-heavy programs
+
+	def setUp(self):
+		self.scanner = Scanner()
+		self.parser = Parser()
+
+	def parse(self, text):
+		return self.parser.parse(self.scanner.tokenize(text))
+
+	@staticmethod
+	def read(program):
+		with open(f'./test_data/interpreter_example/{program}.txt', 'r') as file:
+			return file.read()
+
+	def run_program(self, program, engine):
+		"""
+		Runs the program, its text, AST or FlatTree, with the engine and returns the printed output.
+		"""
+		if isinstance(program, str):
+			program = self.parse(program)
+		output = io.StringIO()
+		with contextlib.redirect_stdout(output):
+			engine.visit(program)
+		return output.getvalue()
+
+	def assertSameOutputAsInterpreter(self, engine_factory):
+		for program in self.PROGRAMS:
+			if program not in self.interpreter_output:
+				self.interpreter_output[program] = self.run_program(self.read(program), Interpreter())
+			with self.subTest(program=program):
+				self.assertEqual(self.interpreter_output[program], self.run_program(self.read(program), engine_factory()))
+
+	def assertOutputThenError(self, expected, text):
+		ast = self.parse(text)
+		for engine_factory in self.ENGINES:
+			engine = engine_factory()
+			with self.subTest(engine=type(engine).__name__):
+				output = io.StringIO()
+				with contextlib.redirect_stdout(output), self.assertRaises(Exception):
+					ast.accept(engine)
+				self.assertEqual(expected, output.getvalue())
+
+	def assertOutput(self, expected, text):
+		for engine_factory in self.ENGINES:
+			engine = engine_factory()
+			with self.subTest(engine=type(engine).__name__):
+				self.assertEqual(expected, self.run_program(text, engine))
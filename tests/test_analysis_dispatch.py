@@ -0,0 +1,57 @@
+import unittest
+import warnings
+import AST
+from Scanner import Scanner
+from Parser import Parser
+from LexicalAnalyzer import LexicalAnalyzer
+
+
+class CountingAnalyzer(LexicalAnalyzer):
+	def __init__(self):
+		super().__init__()
+		self.integers = 0
+
+	def visit_Integer(self, node):
+		self.integers += 1
+		return super().visit_Integer(node)
+
+
+class AnalysisDispatchTest(unittest.TestCase):
+	def setUp(self):
+		self.scanner = Scanner()
+		self.parser = Parser()
+
+	def analyze(self, text, analyzer=None):
+		analyzer = analyzer or LexicalAnalyzer()
+		with warnings.catch_warnings(record=True) as caught:
+			warnings.simplefilter('always')
+			analyzer.visit(self.parser.parse(self.scanner.tokenize(text)))
+		return analyzer, [str(warning.message) for warning in caught]
+
+	def test_table_is_shared_per_class(self):
+		analyzer, _ = self.analyze("x = 1 + 2.5; { y = x * 2; }")
+		self.assertIs(analyzer.visitors, LexicalAnalyzer().visitors)
+		self.assertIs(LexicalAnalyzer.visit_BinaryOperation, analyzer.visitors[AST.BinaryOperation])
+		self.assertIs(LexicalAnalyzer.generic_visit, analyzer.visitors[AST.Program])
+
+	def test_subclass_overrides(self):
+		self.analyze("x = 1;")
+		analyzer, _ = self.analyze("x = 1 + 2; y = x * 3;", CountingAnalyzer())
+		self.assertEqual(3, analyzer.integers)
+		self.assertIsNot(LexicalAnalyzer().visitors, analyzer.visitors)
+		self.assertIs(LexicalAnalyzer.visit_Integer, LexicalAnalyzer().visitors[AST.Integer])
+
+	def test_operation_types(self):
+		analyzer, caught = self.analyze("a = 1 + 2.5; b = 'x' * 3; c = a / 2; d = 2 * b;")
+		self.assertEqual([], caught)
+		types = {name: analyzer.symbol_table.get(name).type for name in 'abcd'}
+		self.assertEqual({'a': AST.Numeric, 'b': AST.String, 'c': AST.Numeric, 'd': AST.String}, types)
+
+	def test_unsupported_operation(self):
+		_, caught = self.analyze("a = 'x' + 1; b = 2; b += 'y';")
+		self.assertEqual(2, len(caught))
+		self.assertTrue(all("Unsupported operation" in message for message in caught))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,75 @@
+import io
+import os
+import tempfile
+import unittest
+import warnings
+from contextlib import redirect_stdout
+import TreePrinter
+from Scanner import Scanner
+from Parser import Parser
+from LexicalAnalyzer import LexicalAnalyzer
+from FlatAST import FlatTree
+from ASTCache import ASTCache
+
+
+def analyzed(ast):
+	with warnings.catch_warnings(record=True) as caught:
+		warnings.simplefilter('always')
+		LexicalAnalyzer().visit(ast)
+	return [str(warning.message) for warning in caught]
+
+
+def printed(ast):
+	output = io.StringIO()
+	with redirect_stdout(output):
+		ast.printTree()
+	return output.getvalue()
+
+
+class ASTCacheTest(unittest.TestCase):
+	SOURCE = "A = zeros(3); x = 2.5; s = \"text\"; while (x < 10) { x += 1; if (x == 5) break; } print A[1, 2], x, s;"
+
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		self.cache = ASTCache(self.directory.name)
+		self.ast = Parser().parse(Scanner().tokenize(self.SOURCE))
+
+	def tearDown(self):
+		self.directory.cleanup()
+
+	def test_round_trip(self):
+		data = FlatTree.from_ast(self.ast).to_bytes()
+		self.assertEqual(printed(self.ast), printed(FlatTree.from_bytes(data).view()))
+
+	def test_invalid_data(self):
+		data = FlatTree.from_ast(self.ast).to_bytes()
+		for invalid in (data[:-1], data[:10], b'NOPE' + data[4:], data + b'\0'):
+			with self.assertRaises(ValueError):
+				FlatTree.from_bytes(invalid)
+
+	def test_hit(self):
+		self.assertIsNone(self.cache.load(self.SOURCE))
+		self.cache.store(self.SOURCE, FlatTree.from_ast(self.ast), ["warning"])
+		tree, messages = self.cache.load(self.SOURCE)
+		self.assertEqual(["warning"], messages)
+		self.assertEqual(printed(self.ast), printed(tree.view()))
+		self.assertEqual(analyzed(self.ast), analyzed(tree.view()))
+
+	def test_miss(self):
+		self.cache.store(self.SOURCE, FlatTree.from_ast(self.ast), [])
+		self.assertIsNone(self.cache.load(self.SOURCE + " "))
+		self.assertIsNone(ASTCache(os.path.join(self.directory.name, "missing")).load(self.SOURCE))
+
+	def test_corrupt_entry(self):
+		self.cache.store(self.SOURCE, FlatTree.from_ast(self.ast), [])
+		with open(self.cache.path(self.SOURCE), 'r+b') as f:
+			f.truncate(os.path.getsize(self.cache.path(self.SOURCE)) // 2)
+		self.assertIsNone(self.cache.load(self.SOURCE))
+		self.cache.store(self.SOURCE, FlatTree.from_ast(self.ast), [])
+		self.assertIsNotNone(self.cache.load(self.SOURCE))
+		self.assertEqual([self.cache.path(self.SOURCE)],
+						 [os.path.join(self.directory.name, name) for name in os.listdir(self.directory.name)])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,65 @@
+import io
+import copy
+import unittest
+import contextlib
+import AST
+import TreePrinter
+from Scanner import Scanner
+from Parser import Parser
+from Optimizer import walk
+
+
+class ASTNodesTest(unittest.TestCase):
+	PROGRAMS = ['fibonacci', 'matrix', 'pi', 'primes', 'sqrt', 'triangle']
+
+	def parse(self, program):
+		with open(f'./test_data/interpreter_example/{program}.txt', 'r') as file:
+			return Parser().parse(Scanner().tokenize(file.read()))
+
+	def test_nodes_have_no_dictionary(self):
+		for program in self.PROGRAMS:
+			with self.subTest(program=program):
+				for node in walk(self.parse(program)):
+					self.assertFalse(hasattr(node, '__dict__'), type(node).__name__)
+
+	def test_named_fields_alias_arguments(self):
+		loop = AST.ForLoopInstruction("FOR", AST.Variable("i"), AST.Range(AST.Integer(0), AST.Integer(3)), AST.Block([]))
+		self.assertIs(loop.range, loop.args[1])
+		loop.body = AST.Block([AST.Error()])
+		self.assertIs(loop.body, loop.args[2])
+		self.assertEqual(3, len(loop.args))
+
+		loop = AST.WhileInstruction("WHILE", AST.Integer(1), AST.Block([]))
+		loop.condition = AST.Integer(0)
+		self.assertEqual((AST.Integer(0), AST.Block([])), loop.args)
+
+	def test_numeric_value(self):
+		self.assertEqual(5, AST.Integer("5").value)
+		self.assertIs(int, type(AST.Integer("5").value))
+		self.assertEqual(0.5, AST.Float("0.5").value)
+		self.assertEqual(AST.Integer(2), AST.Float(2.0))
+		self.assertEqual("Integer(value=5)", repr(AST.Integer(5)))
+		self.assertEqual(AST.Integer(7), copy.deepcopy(AST.Integer(7)))
+
+	def test_fields(self):
+		assignment = AST.Assignment('=', AST.Variable("x"), AST.Integer(1))
+		self.assertEqual([('op', '='), ('id', AST.Variable("x")), ('expr', AST.Integer(1))], AST.fields(assignment))
+		self.assertEqual([('instructions', [])], AST.fields(AST.Block([])))
+		loop = AST.WhileInstruction("WHILE", AST.Integer(1), AST.Block([]))
+		self.assertEqual([('instruction', "WHILE"), ('args', (AST.Integer(1), AST.Block([])))], AST.fields(loop))
+
+	def test_walk_visits_nested_loops_once(self):
+		loop = AST.Block([])
+		for depth in range(14):
+			loop = AST.WhileInstruction("WHILE", AST.Integer(1), loop)
+		self.assertEqual(29, len(list(walk(loop))))
+
+	def test_print_tree(self):
+		output = io.StringIO()
+		with contextlib.redirect_stdout(output):
+			self.parse('triangle').printTree()
+		self.assertIn("FOR", output.getvalue())
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+import batch
+
+
+class BatchTest(unittest.TestCase):
+	PROGRAMS = {
+		'valid.txt': "x = 1; print x;",
+		'warning.txt': "break;",
+		'syntax_error.txt': "x = ;",
+		'lex_error.txt': "x = 1 $ 2;",
+	}
+
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		for name, text in self.PROGRAMS.items():
+			with open(os.path.join(self.directory.name, name), "w") as file:
+				file.write(text)
+
+	def tearDown(self):
+		self.directory.cleanup()
+
+	def path(self, name):
+		return os.path.join(self.directory.name, name)
+
+	@staticmethod
+	def without_timings(results):
+		return [{key: value for key, value in result.items() if key != 'timings'} for result in results]
+
+	def test_diagnostics(self):
+		results = {os.path.basename(result['file']): result
+				   for result in batch.check_files(batch.expand([self.path('*.txt')]), jobs=1)}
+		self.assertEqual('ok', results['valid.txt']['status'])
+		self.assertEqual(['read', 'parse', 'analyze'], list(results['valid.txt']['timings']))
+		self.assertEqual('warning', results['warning.txt']['status'])
+		self.assertEqual('analyze', results['warning.txt']['diagnostics'][0]['stage'])
+		self.assertEqual(('error', 'parse'), (results['syntax_error.txt']['status'],
+											 results['syntax_error.txt']['diagnostics'][0]['stage']))
+		self.assertEqual(('error', 'scan'), (results['lex_error.txt']['status'],
+											 results['lex_error.txt']['diagnostics'][0]['stage']))
+
+	def test_workers_report_the_same_results(self):
+		files = batch.expand([self.path('*.txt')]) * 3
+		self.assertEqual(self.without_timings(batch.check_files(files, jobs=1)),
+						 self.without_timings(batch.check_files(files, jobs=2)))
+
+	def test_expand(self):
+		files = batch.expand([self.path('v*.txt'), self.path('*.txt'), self.path('missing.txt')])
+		self.assertEqual(self.path('valid.txt'), files[0])
+		self.assertEqual(len(self.PROGRAMS) + 1, len(files))
+		result, = batch.check_files([self.path('missing.txt')])
+		self.assertEqual(('error', 'read'), (result['status'], result['diagnostics'][0]['stage']))
+
+	def test_summary(self):
+		results = batch.check_files(batch.expand([self.path('*.txt')]), jobs=1)
+		summary = batch.summarize(results, 1.0, 1)
+		self.assertEqual({'files': 4, 'seconds': 1.0, 'jobs': 1, 'ok': 1, 'warning': 1, 'error': 2}, summary)
+
+
+if __name__ == '__main__':
+	unittest.main()
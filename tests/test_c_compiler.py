@@ -0,0 +1,131 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import contextlib
+from unittest import mock
+from interpreter.Interpreter import Interpreter
+from interpreter.CCompiler import CCompiler, CGenerator, Unsupported, CC
+from engine_test_case import EngineTestCase
+
+
+@unittest.skipUnless(shutil.which(CC), "no C compiler")
+class CCompilerTest(EngineTestCase):
+	def setUp(self):
+		super().setUp()
+		self.directory = tempfile.TemporaryDirectory()
+
+	def tearDown(self):
+		self.directory.cleanup()
+
+	def assertCompiled(self, text):
+		"""
+		Checks that the program runs natively, with the output of the Interpreter.
+		"""
+		ast = self.parse(text)
+		compiler = CCompiler(self.directory.name)
+		self.assertEqual(self.run_program(ast, Interpreter()), self.run_program(ast, compiler))
+		self.assertIsNone(compiler.fallback)
+
+	def assertFallback(self, text, reason):
+		ast = self.parse(text)
+		compiler = CCompiler(self.directory.name)
+		expected, output = io.StringIO(), io.StringIO()
+		with contextlib.redirect_stdout(expected):
+			try:
+				ast.accept(Interpreter())
+			except Exception as e:
+				expected.write(repr(e))
+		with contextlib.redirect_stdout(output):
+			try:
+				ast.accept(compiler)
+			except Exception as e:
+				output.write(repr(e))
+		self.assertEqual(expected.getvalue(), output.getvalue())
+		self.assertIn(reason, compiler.fallback)
+
+	def test_same_output_as_interpreter(self):
+		for program in ['fibonacci', 'matrix', 'pi', 'primes', 'sqrt']:
+			with self.subTest(program=program):
+				self.assertCompiled(self.read(program))
+
+	def test_floats(self):
+		values = ["10000000000000000.0", "15000000000000000.0", "1.0 / 100000", "0.0001", "0.1 + 0.2", "1.0 / 3",
+				  "123456789.0", "-0.0", "1000000000000000.0", "123456789012345678.0", "2.675", "7 / 2"]
+		self.assertCompiled(" ".join(f"print {value};" for value in values))
+		self.assertCompiled("x = 1.0; y = 1.0; for i = 0:800 { x *= 2.7; y /= 3.3; print x; print y; }")
+
+	def test_matrices(self):
+		self.assertCompiled("A = eye(3); B = ones(3); C = A .+ B; print C; print A * 2; print 2.5 * A; print A / 2; "
+							"print -A; D = zeros(3, 4); D[0, 0] = 42; i = -1; D[i, 1] += 5; print D'; print D[2, 2];")
+		self.assertCompiled("A = [[1, 2], [3, 4]]; A = A * A; A += 1; print A; C = [[1.5, 2.5], [3.0, 4.0]]; "
+							"print C .* C; print C ./ C; print A ./ A; B = zeros(0, 2); print B;")
+
+	def test_control_flow_and_scopes(self):
+		self.assertCompiled("x = 0; while (x < 10) { x += 1; if (x == 5) break; } print x; break; print 1;")
+		self.assertCompiled("for i = 0:5 { if (i == 2) continue; print i; } print i; for j = 3:1 print j; print j;")
+		self.assertCompiled("x = 1; { x = 2; y = 3; print y; } print x; a = 0; for i = 0:a + 3 a += i; print a;")
+		self.assertCompiled("s = 0; for i = 1:1000 { for j = 1:100 { if (j > i) break; s += i * j; } } print s;")
+		self.assertCompiled("for i = 0:3 { if (i < 5) z = i; print z; }")
+
+	def test_runtime_errors(self):
+		self.assertFallback("print 1; x = 9223372036854775807; x += 1; print x;", "overflow")
+		self.assertFallback("print 1; x = 1; print x / 0;", "division by zero")
+		self.assertFallback("A = eye(2); print A[2, 0];", "index")
+		self.assertFallback("if (1 > 2) x = 1; print x;", "assignment")
+		self.assertFallback("for i = 0:3 { if (i == 0) z = 1; print z; }", "assignment")
+		self.assertFallback("x = 9007199254740993; if (x > 1.5) print x;", "float")
+
+	def test_unsupported(self):
+		self.assertFallback("n = 3; print \"*\" * n;", "string")
+		self.assertFallback("x = 1; x = 1.5; print x;", "type")
+		self.assertFallback("A = [[1.5, 2], [3, 4]]; print A;", "mixed")
+		self.assertFallback("A = [[1, 2], [3, 4]]; A[0, 0] = 2.5; print A;", "float stored")
+		self.assertFallback("A = eye(2); B = A; B[0, 0] = 7; print A;", "assignment of a matrix")
+		self.assertFallback("n = 2; A = eye(n);", "shape")
+		with self.assertRaises(Unsupported):
+			CGenerator().generate(self.parse("C = [[1.5]] * [[2.5]];"))
+
+	def test_cache(self):
+		ast = self.parse("x = 2; print x * 21;")
+		self.assertEqual("42\n", self.run_program(ast, CCompiler(self.directory.name)))
+		entries = os.listdir(self.directory.name)
+		self.assertEqual(1, len(entries))
+		path = os.path.join(self.directory.name, entries[0])
+		modified = os.path.getmtime(path)
+		self.assertEqual("42\n", self.run_program(self.parse("x = 2; print x * 21;"), CCompiler(self.directory.name)))
+		self.assertEqual(modified, os.path.getmtime(path))
+		self.run_program(self.parse("x = 2; print x * 20;"), CCompiler(self.directory.name))
+		self.assertEqual(2, len(os.listdir(self.directory.name)))
+
+	def test_insecure_cache_directory(self):
+		ast = self.parse("print 1;")
+		directory = os.path.join(self.directory.name, 'shared')
+		os.mkdir(directory)
+		os.chmod(directory, 0o777)
+		with mock.patch.dict('interpreter.CCompiler._libraries', clear=True):
+			compiler = CCompiler(directory)
+			self.assertEqual("1\n", self.run_program(ast, compiler))
+		self.assertIn("not private", compiler.fallback)
+		self.assertEqual([], os.listdir(directory))
+
+		private = os.path.join(self.directory.name, 'private')
+		CCompiler(private).check_cache_directory()
+		self.assertEqual(0o700, os.stat(private).st_mode & 0o777)
+
+	def test_deep_expressions(self):
+		self.assertCompiled("x = 0" + " + 1" * 600 + "; print x;")
+		self.assertFallback("x = 0" + " + 1" * 20000 + "; print x;", "recursion")
+
+	def test_missing_compiler(self):
+		ast = self.parse("print 1;")
+		with mock.patch('interpreter.CCompiler.CC', os.path.join(self.directory.name, 'missing-cc')), \
+				mock.patch.dict('interpreter.CCompiler._libraries', clear=True):
+			compiler = CCompiler(os.path.join(self.directory.name, 'cache'))
+			self.assertEqual("1\n", self.run_program(ast, compiler))
+		self.assertIsNotNone(compiler.fallback)
+
+
+if __name__ == '__main__':
+	unittest.main()
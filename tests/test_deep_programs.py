@@ -0,0 +1,65 @@
+import io
+import sys
+import unittest
+import contextlib
+import TreePrinter
+from LexicalAnalyzer import LexicalAnalyzer
+from interpreter.Interpreter import Interpreter
+from interpreter.Profiler import ProfilingInterpreter
+from interpreter.ClosureCompiler import ClosureCompiler
+from interpreter.FlatInterpreter import FlatInterpreter
+from interpreter.PythonCompiler import PythonCompiler
+from interpreter.RegisterMachine import RegisterMachine
+from engine_test_case import EngineTestCase
+
+
+class DeepProgramsTest(EngineTestCase):
+	def setUp(self):
+		super().setUp()
+		self.depth = sys.getrecursionlimit() * 2  # deeper than any recursive traversal could go
+
+	def test_deep_expression(self):
+		ast = self.parse("x = 0" + " + 1" * self.depth + "; print x;")
+		LexicalAnalyzer().visit(ast)
+		self.assertEqual(f"{self.depth}\n", self.run_program(ast, Interpreter()))
+		printed = io.StringIO()
+		with contextlib.redirect_stdout(printed):
+			ast.printTree()
+		self.assertEqual(self.depth * 2 + 5, len(printed.getvalue().splitlines()))
+
+	def test_recursive_backends_restore_the_recursion_limit(self):
+		limit = sys.getrecursionlimit()
+		ast = self.parse("x = 0" + " + 1" * limit + "; print x;")
+		for engine in (ClosureCompiler(), PythonCompiler(), FlatInterpreter(), RegisterMachine()):
+			with self.subTest(engine=type(engine).__name__):
+				self.assertEqual(f"{limit}\n", self.run_program(ast, engine))
+				self.assertEqual(limit, sys.getrecursionlimit())
+
+	def test_deep_blocks(self):
+		ast = self.parse("x = 0; " + "{ x += 1; " * self.depth + "}" * self.depth + " print x;")
+		LexicalAnalyzer().visit(ast)
+		interpreter = Interpreter()
+		self.assertEqual(f"{self.depth}\n", self.run_program(ast, interpreter))
+		self.assertEqual(1, len(interpreter.memory_stack.stack))
+
+	def test_error_propagates_through_blocks(self):
+		ast = self.parse("{ { x = 1; y = z; } }")
+		interpreter = Interpreter()
+		self.assertRaisesRegex(Exception, "Variable z not found", self.run_program, ast, interpreter)
+
+	def test_profiler_on_deep_expression(self):
+		depth = 1500  # the collapsed stacks grow with the square of the depth
+		ast = self.parse("x = 0" + " + 1" * depth + "; print x;")
+		profiler = ProfilingInterpreter()
+		self.assertEqual(f"{depth}\n", self.run_program(ast, profiler))
+		self.assertEqual([""], profiler.path)
+		self.assertEqual(depth * 2 + 5, sum(profile.count for profile in profiler.profiles.values()))
+
+	def test_long_statement_list(self):
+		statements = 20000
+		ast = self.parse("x = 0; " * statements + "print x;")
+		self.assertEqual(statements + 1, len(ast.instructions))
+
+
+if __name__ == '__main__':
+	unittest.main()
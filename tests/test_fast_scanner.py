@@ -0,0 +1,57 @@
+import unittest
+import glob
+from sly.lex import LexError
+from Scanner import Scanner
+from FastScanner import FastScanner
+
+
+class FastScannerTest(unittest.TestCase):
+	def setUp(self):
+		self.scanner = FastScanner()
+
+		with open("./test_data/scanner_example/example.txt", "r") as file:
+			self.text = file.read()
+
+	def tokens(self, scanner, text):
+		return self.tokens_of(scanner.tokenize(text))
+
+	def tokens_of(self, tokens):
+		return [(token.type, token.value, token.lineno, token.index, token.end) for token in tokens]
+
+	def test_tokenize(self):
+		with open("./test_data/scanner_expected/expected_output.txt", "r") as file:
+			expected_output = file.read().splitlines()
+
+		tokens = list(self.scanner.tokenize(self.text))
+		self.assertEqual(len(expected_output), len(tokens))
+		for token, expected_token in zip(tokens, expected_output):
+			self.assertEqual(expected_token, str(token.type), f"Unexpected token: {token}")
+
+	def test_same_tokens_as_scanner(self):
+		for filename in sorted(glob.glob("./test_data/*_example/*.txt")):
+			with open(filename, "r") as file:
+				text = file.read()
+			with self.subTest(filename=filename):
+				self.assertEqual(self.tokens(Scanner(), text), self.tokens(self.scanner, text))
+
+	def test_tokenize_stream(self):
+		chunks = [self.text[i:i + 3] for i in range(0, len(self.text), 3)]
+		self.assertEqual(self.tokens(Scanner(), self.text), self.tokens_of(self.scanner.tokenize_stream(chunks)))
+
+	def test_ambiguous_tokens(self):
+		text = "x = a' * 'str' .+ 1.5e-3 .5 1.e+ 1. ; # comment\nb <= c != d == 'e\n\"f\" 3e5"
+		self.assertEqual(self.tokens(Scanner(), text), self.tokens(self.scanner, text))
+
+	def test_illegal_character(self):
+		for text in ["x = 1;\ny = @;", "a ! b", "\"unterminated\nstring\""]:
+			with self.subTest(text=text):
+				with self.assertRaises(LexError) as expected:
+					list(Scanner().tokenize(text))
+				with self.assertRaises(LexError) as error:
+					list(self.scanner.tokenize(text))
+				self.assertEqual(str(expected.exception), str(error.exception))
+				self.assertEqual(expected.exception.error_index, error.exception.error_index)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,71 @@
+import io
+import unittest
+import contextlib
+import AST
+from FlatAST import FlatTree, VARIABLE
+from LexicalAnalyzer import LexicalAnalyzer
+from interpreter.Interpreter import Interpreter
+from interpreter.FlatInterpreter import FlatInterpreter
+from engine_test_case import EngineTestCase
+
+
+class FlatASTTest(EngineTestCase):
+	@staticmethod
+	def printed(node):
+		output = io.StringIO()
+		with contextlib.redirect_stdout(output):
+			node.printTree()
+		return output.getvalue()
+
+	def test_view_matches_parsed_tree(self):
+		for program in self.PROGRAMS:
+			text = self.read(program)
+			with self.subTest(program=program):
+				tree = self.parser.parse_flat(self.scanner.tokenize(text))
+				expected = self.printed(self.parser.parse(self.scanner.tokenize(text)))
+				self.assertEqual(expected, self.printed(tree.view()))
+
+	def test_view_is_analyzed(self):
+		tree = self.parser.parse_flat(self.scanner.tokenize(self.read('primes')))
+		LexicalAnalyzer().visit(tree.view())
+		self.assertIs(tree.view(), tree.view())
+
+	def test_nodes_materialized_on_demand(self):
+		tree = self.parser.parse_flat(self.scanner.tokenize("x = 1; y = x + 2; print y;"))
+		first, second, third = tree.child_indices(tree.root)
+		assignment = tree.node(second)
+		self.assertEqual('+', assignment.expr.op)
+		self.assertNotIn(first, tree._nodes)
+		self.assertNotIn(tree.root, tree._nodes)
+
+	def test_literals_are_interned(self):
+		tree = self.parser.parse_flat(self.scanner.tokenize("x = 1; x = x + 1; x = x + 1.0; print x;"))
+		variables = [index for index in range(len(tree)) if tree.kinds[index] == VARIABLE]
+		self.assertEqual(6, len(variables))
+		self.assertEqual({tree.literals[index] for index in variables}, {tree.pool.index('x')})
+		self.assertEqual(['x', 1, 1.0], tree.pool)
+
+	def test_from_ast(self):
+		ast = self.parser.parse(self.scanner.tokenize(self.read('matrix')))
+		self.assertEqual(self.printed(ast), self.printed(FlatTree.from_ast(ast).view()))
+
+	def test_same_output_as_interpreter(self):
+		for program in ['fibonacci', 'matrix', 'sqrt', 'triangle']:
+			text = self.read(program)
+			with self.subTest(program=program):
+				expected = self.run_program(text, Interpreter())
+				tree = self.parser.parse_flat(self.scanner.tokenize(text))
+				self.assertEqual(expected, self.run_program(tree, FlatInterpreter()))
+
+	def test_missing_children(self):
+		tree = self.parser.parse_flat(self.scanner.tokenize("for i = 0:3 { if (i == 1) break; } print i;"))
+		self.assertEqual("1\n", self.run_program(tree, FlatInterpreter()))
+		loop = tree.view().instructions[0]
+		self.assertIsNone(loop.body.instructions[0].elsepart)
+		self.assertEqual(('break', None), (loop.body.instructions[0].instruction.instruction,
+										   loop.body.instructions[0].instruction.args[0]))
+		self.assertIsInstance(loop, AST.ForLoopInstruction)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import builtins
+from Scanner import Scanner
+from Parser import Parser
+from IncrementalParser import IncrementalParser
+import TreePrinter
+import AST
+
+
+class IncrementalParserTest(unittest.TestCase):
+	def setUp(self):
+		self.scanner = Scanner()
+		self.parser = Parser()
+
+		with open("./test_data/interpreter_example/primes.txt", "r") as file:
+			self.text = file.read() + "\nx = 1;\ny = 2;\n"
+
+	def tree(self, program):
+		output = []
+		original_print = builtins.print
+		builtins.print = lambda *args, **kwargs: output.append(" ".join(args))
+		try:
+			program.printTree()
+		finally:
+			builtins.print = original_print
+		return "\n".join(output)
+
+	def assertSameAsFullParse(self, incremental_parser):
+		expected = self.parser.parse(self.scanner.tokenize(incremental_parser.text))
+		self.assertEqual(self.tree(expected), self.tree(incremental_parser.program))
+
+	def test_edits(self):
+		incremental_parser = IncrementalParser(self.text)
+		self.assertSameAsFullParse(incremental_parser)
+
+		edits = [
+			("2:100", "3:50"),  # inside of a nested block
+			("x = 1;", "x = 1; z = x * 2;"),  # new statement
+			("p = 1;\n", ""),  # deleted statement
+			("print n;", "print n; else print 0;"),  # breaks the if statement, fixed below
+			("print n; else print 0;", "print n;"),
+		]
+		for old, new in edits:
+			start = incremental_parser.text.index(old)
+			incremental_parser.edit(start, start + len(old), new)
+			if incremental_parser.errors:
+				continue
+			with self.subTest(edit=new):
+				self.assertSameAsFullParse(incremental_parser)
+
+	def test_untouched_statements_are_reused(self):
+		incremental_parser = IncrementalParser(self.text)
+		loop, x, y = incremental_parser.program.instructions
+
+		start = incremental_parser.text.index("x = 1;")
+		program = incremental_parser.edit(start + 4, start + 5, "42")
+
+		self.assertIs(loop, program.instructions[0])
+		self.assertIsNot(x, program.instructions[1])
+		self.assertIs(y, program.instructions[2])
+		self.assertEqual(42, program.instructions[1].expr.value)
+
+	def test_syntax_error_is_confined_to_statement(self):
+		incremental_parser = IncrementalParser(self.text)
+		start = incremental_parser.text.index("x = 1;")
+		program = incremental_parser.edit(start, start + 6, "x = ;")
+
+		self.assertEqual(1, len(incremental_parser.errors))
+		self.assertEqual(self.text.count("\n", 0, start) + 1, incremental_parser.errors[0][0])
+		self.assertIsInstance(program.instructions[1], AST.Error)
+		self.assertIsInstance(program.instructions[2], AST.Assignment)
+
+		incremental_parser.edit(start, start + 5, "x = 3;")
+		self.assertEqual([], incremental_parser.errors)
+		self.assertSameAsFullParse(incremental_parser)
+
+
+if __name__ == '__main__':
+	unittest.main()
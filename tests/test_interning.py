@@ -0,0 +1,62 @@
+import unittest
+import AST
+from FlatAST import VARIABLE
+from Scanner import Scanner
+from FastScanner import FastScanner
+from interpreter.Interpreter import Interpreter
+from engine_test_case import EngineTestCase
+
+
+class InterningTest(EngineTestCase):
+	TEXT = "x = 1; y = x + 1.0; for i = 1:3 { x += i * 1; } print x, y;"
+
+	@staticmethod
+	def leaves(ast):
+		leaves = []
+		stack = [ast]
+		while stack:
+			node = stack.pop()
+			if isinstance(node, (list, tuple)):
+				stack.extend(node)
+			elif isinstance(node, (AST.Variable, AST.Numeric)):
+				leaves.append(node)
+			elif isinstance(node, AST.Node):
+				stack.extend(value for name, value in AST.fields(node))
+		return leaves
+
+	def test_identical_leaves_are_shared(self):
+		leaves = self.leaves(self.parse(self.TEXT))
+		self.assertEqual(13, len(leaves))
+		self.assertEqual(6, len({id(leaf) for leaf in leaves}))  # x, y, i, 1, 1.0, 3
+		floats = [leaf for leaf in leaves if isinstance(leaf, AST.Float)]
+		self.assertEqual([AST.Float(1.0)], floats)
+
+	def test_leaves_are_not_shared_between_programs(self):
+		first, second = self.parse("x = 1;"), self.parse("x = 1;")
+		self.assertIsNot(first.instructions[0].expr, second.instructions[0].expr)
+
+	def test_interning_disabled(self):
+		self.parser.intern_leaves = False
+		leaves = self.leaves(self.parse(self.TEXT))
+		self.assertEqual(13, len({id(leaf) for leaf in leaves}))
+
+	def test_same_output(self):
+		outputs = []
+		for intern_leaves in (True, False):
+			self.parser.intern_leaves = intern_leaves
+			outputs.append(self.run_program(self.TEXT, Interpreter()))
+		self.assertEqual(outputs[1], outputs[0])
+
+	def test_flat_tree_keeps_a_node_per_occurrence(self):
+		tree = self.parser.parse_flat(self.scanner.tokenize(self.TEXT))
+		self.assertEqual(8, list(tree.kinds).count(VARIABLE))
+
+	def test_scanners_intern_names(self):
+		for scanner in (Scanner(), FastScanner()):
+			with self.subTest(scanner=type(scanner).__name__):
+				names = [token.value for token in scanner.tokenize("counter = counter + 1;") if token.type == 'ID']
+				self.assertIs(names[0], names[1])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -1,15 +1,19 @@
 import unittest
 from Scanner import Scanner
-from Mparser import Mparser
-from NodeVisitor import NodeVisitor
+from Parser import Parser
+from LexicalAnalyzer import LexicalAnalyzer
 from interpreter.Interpreter import Interpreter
+from interpreter.ClosureCompiler import ClosureCompiler
+from interpreter.PythonCompiler import PythonCompiler
+from interpreter.RegisterMachine import RegisterMachine, BytecodeCompiler
+from engine_test_case import EngineTestCase
 
 
 class TestInterpreter(unittest.TestCase):
 	def setUp(self):
 		self.scanner = Scanner()
-		self.parser = Mparser()
-		self.semantic = NodeVisitor()
+		self.parser = Parser()
+		self.semantic = LexicalAnalyzer()
 		self.interpreter = Interpreter()
 
 	def test_interpreter_fibonacci(self):
@@ -56,5 +60,152 @@ class TestInterpreter(unittest.TestCase):
 		ast.accept(self.interpreter)
 
 
+class TestEngines(EngineTestCase):
+	def test_same_output_as_interpreter(self):
+		for engine_factory in self.ENGINES[1:]:
+			with self.subTest(engine=type(engine_factory()).__name__):
+				self.assertSameOutputAsInterpreter(engine_factory)
+
+
+class TestClosureCompiler(EngineTestCase):
+	def test_block_scoped_variables(self):
+		text = "x = 1; { x = 2; y = 3; } { y = 4; print x, y; }"
+		compiler = ClosureCompiler()
+		self.assertEqual("2 4\n", self.run_program(text, compiler))
+		self.assertEqual([[2], [4]], compiler.frame_stack.frames)  # sibling blocks share the frame of their depth
+
+	def test_variable_read_before_declaration_in_loop(self):
+		text = "for i = 0:2 if (i == 1) print x; else x = 7;"
+		self.assertEqual("7\n", self.run_program(text, ClosureCompiler()))
+
+	def test_undefined_variable(self):
+		self.assertRaises(Exception, self.run_program, "{ x = 1; } print x;", ClosureCompiler())
+
+
+class TestPythonCompiler(EngineTestCase):
+	def test_range_bounds_evaluated_before_loop_variable(self):
+		text = "i = 3; for i = 0:i { x = i; } print i;"
+		self.assertEqual("2\n", self.run_program(text, PythonCompiler()))
+
+	def test_block_scoped_variables(self):
+		text = "x = 1; { x = 2; y = 3; } { y = 4; print x, y; }"
+		self.assertEqual("2 4\n", self.run_program(text, PythonCompiler()))
+
+	def test_block_variables_reset_by_loop(self):
+		text = "for i = 0:3 { if (i == 0) z = 1; print z; }"
+		with self.assertRaisesRegex(Exception, "Variable z not found"):
+			self.run_program(text, PythonCompiler())
+		self.assertEqual("1\n1\n", self.run_program("for i = 0:2 { z = 1; print z; }", PythonCompiler()))
+
+	def test_variable_read_before_declaration_in_loop(self):
+		text = "for i = 0:3 if (i > 0) print y; else y = 5;"
+		self.assertEqual("5\n5\n", self.run_program(text, PythonCompiler()))
+		with self.assertRaisesRegex(Exception, "Variable w not found"):
+			self.run_program("print w;", PythonCompiler())
+
+	def test_flow_control_outside_loop(self):
+		text = "{ print 1; break; print 2; } print 3; if (1 < 2) { continue; } print 4;"
+		self.assertEqual("1\n3\n4\n", self.run_program(text, PythonCompiler()))
+
+	def test_fallback_for_deep_nesting(self):
+		text = "x = 0; " + "while (x < 1) { " * 30 + "x = 1; " + "} " * 30 + "print x;"
+		engine = PythonCompiler()
+		self.assertEqual("1\n", self.run_program(text, engine))
+		self.assertIn("nested", engine.fallback)
+
+
+class TestRegisterMachine(EngineTestCase):
+	def test_range_bounds_evaluated_before_loop_variable(self):
+		text = "i = 3; for i = 0:i { x = i; } print i;"
+		self.assertEqual("2\n", self.run_program(text, RegisterMachine()))
+
+	def test_block_scoped_variables(self):
+		text = "x = 1; { x = 2; y = 3; } { y = 4; print x, y; }"
+		self.assertEqual("2 4\n", self.run_program(text, RegisterMachine()))
+
+	def test_variable_read_before_declaration_in_loop(self):
+		text = "for i = 0:2 if (i == 1) print x; else x = 7;"
+		self.assertEqual("7\n", self.run_program(text, RegisterMachine()))
+
+	def test_undefined_variable(self):
+		for text in ["{ x = 1; } print x;", "if (1 > 2) x = 1; print x;", "x += 1;", "while (1 > 2) z = 1; print z;",
+					 "for i = 0:3 { if (i == 0) z = 1; print z; }", "for i = 0:3 { if (i > 0) print z; z = 1; }"]:
+			with self.subTest(text=text):
+				self.assertRaisesRegex(Exception, "Variable [xz] not found", self.run_program, text, RegisterMachine())
+
+	def test_loop_variable_shadowing_a_variable_read_earlier_in_the_block(self):
+		text = "for i = 0:3 { b = i; for i = 0:1 { a = 1; } } print i;"
+		self.assertEqual(self.run_program(text, Interpreter()), self.run_program(text, RegisterMachine()))
+		text = "i = 7; for k = 0:2 { print i; for i = 0:1 { print i; } }"
+		self.assertEqual("7\n0\n7\n0\n", self.run_program(text, RegisterMachine()))
+
+	def test_flow_control_outside_loop(self):
+		text = "{ print 1; break; print 2; } print 3; if (1 < 2) { continue; } print 4;"
+		self.assertEqual(self.run_program(text, Interpreter()), self.run_program(text, RegisterMachine()))
+
+	def test_disassemble(self):
+		ast = self.parser.parse(self.scanner.tokenize("x = 0; while (x < 10) x += 2; print x;"))
+		self.assertEqual([
+			"       0  MOVE        x, 0",
+			"       1  JUMP        3",
+			">>     2  ADD         x, x, 2",
+			">>     3  JUMP_IF_LT  2, x, 10",
+			"       4  PRINT       (x)",
+		], BytecodeCompiler().compile_program(ast).disassemble().splitlines())
+
+
+class TestMatrixOperations(EngineTestCase):
+	def test_matrix_product(self):
+		self.assertOutput("[[5, 11], [11, 25]]\n", "A = [[1, 2], [3, 4]]; print A * A';")
+
+	def test_elementwise_operations(self):
+		self.assertOutput("[[2, 1], [1, 2]]\n[[1.0, 1.0], [1.0, 1.0]]\n", "A = eye(2) .+ ones(2); print A; print A ./ A;")
+
+	def test_element_assignment_keeps_element_types(self):
+		self.assertOutput("[[0, 0.5, 0], [0, 0, 0]]\n0.5 0\n", "D = zeros(3, 2); D[0, 1] = 0.5; print D; print D[0, 1], D[1, 1];")
+
+	def test_integer_overflow_is_exact(self):
+		text = ("A = [[9223372036854775807, 2], [2, 2]]; print A .+ A; print 2 * A; print A * A;"
+				"m = -9223372036854775807 - 1; print -[[m]]; B = [[1, 2]]; B[0, 0] = 100000000000000000000; print B;")
+		self.assertOutput("[[18446744073709551614, 4], [4, 4]]\n[[18446744073709551614, 4], [4, 4]]\n"
+						  "[[85070591730234615847396907784232501253, 18446744073709551618], [18446744073709551618, 8]]\n"
+						  "[[9223372036854775808]]\n[[100000000000000000000, 2]]\n", text)
+
+	def test_division_by_zero(self):
+		self.assertOutputThenError("", "print [[1, 2]] ./ [[0, 1]];")
+		self.assertOutputThenError("", "print zeros(20) ./ zeros(20);")
+		self.assertOutputThenError("", "print [[1.5, 2]] / 0;")
+		self.assertOutput("[[0.5, 2.0]]\n", "print [[1, 4]] ./ [[2, 2]];")
+
+	def test_matrix_equality(self):
+		text = ("a = [[1, 2]]; b = [[1, 2]]; if (a == b) print 1; else print 0; if (a != b) print 1; else print 0;"
+				"if (a == [[1, 3]]) print 1; else print 0; if (a == [[1], [2]]) print 1; else print 0;"
+				"if (zeros(3) == zeros(3)) print 1; else print 0; if (zeros(3) == eye(3)) print 1; else print 0;"
+				"if (eye(2) == [[1, 0], [0, 1]]) print 1; else print 0;")
+		self.assertOutput("1\n0\n0\n0\n1\n0\n1\n", text)
+
+	def test_large_sparse_matrices(self):
+		text = "A = zeros(10000); A[5, 7] = 3; B = eye(10000); D = A .+ B; C = (2 * D' - B) * B; print C[7, 5], C[9999, 9999], C[1, 2];"
+		self.assertOutput("6 1 0\n", text)
+
+
+class TestControlFlow(EngineTestCase):
+	def test_break_and_continue(self):
+		text = (
+			"s = 0; for i = 0:10 { if (i == 5) break; if (i == 1) { continue; } s += i; } print s;"
+			"k = 0; while (k < 5) { k += 1; { if (k == 2) continue; } print k; }"
+		)
+		self.assertOutput("9\n1\n3\n4\n5\n", text)
+
+	def test_block_variables_unassigned_on_each_entry(self):
+		self.assertOutputThenError("1\n", "for i = 0:3 { if (i == 0) z = 1; print z; }")
+		self.assertOutput("0\n1\n2\n", "for i = 0:3 { if (i < 5) z = i; print z; }")
+
+	def test_break_leaves_no_block_memory(self):
+		interpreter = Interpreter()
+		self.run_program("for i = 0:3 { for j = 0:3 { if (j == 1) { x = j; break; } } }", interpreter)
+		self.assertEqual(1, len(interpreter.memory_stack.stack))
+
+
 if __name__ == '__main__':
 	unittest.main()
\ No newline at end of file
@@ -0,0 +1,69 @@
+import unittest
+import AST
+from Optimizer import Optimizer
+from engine_test_case import EngineTestCase
+
+
+class OptimizerTest(EngineTestCase):
+	def optimize(self, text):
+		return Optimizer().optimize(self.parse(text))
+
+	def assertSameOutput(self, text):
+		for engine_factory in self.ENGINES:
+			with self.subTest(engine=type(engine_factory()).__name__):
+				expected = self.run_program(text, engine_factory())
+				self.assertEqual(expected, self.run_program(self.optimize(text), engine_factory()))
+
+	def test_example_programs(self):
+		for program in self.PROGRAMS:
+			with self.subTest(program=program):
+				self.assertSameOutput(self.read(program))
+
+	def test_constant_folding(self):
+		x, y, z, e = self.optimize("x = 2 * (3 + 4) - -1; y = 1 / 4 + 1; z = ones(3, 2)'; e = eye(2 * 2);").instructions
+		self.assertEqual(AST.Integer(15), x.expr)
+		self.assertIsInstance(x.expr, AST.Integer)
+		self.assertEqual(AST.Float(1.25), y.expr)
+		self.assertEqual('ones', z.expr.instruction)
+		self.assertEqual((AST.Integer(2), AST.Integer(3)), z.expr.args)
+		self.assertEqual((AST.Integer(4),), e.expr.args)
+		self.assertSameOutput("z = ones(3, 2)'; e = eye(2 * 2); x = 2 * (3 + 4) - -1; y = 1 / 4 + 1; print z; print e; print x; print y;")
+
+	def test_division_by_zero_is_not_folded(self):
+		x, = self.optimize("x = 1 / 0;").instructions
+		self.assertIsInstance(x.expr, AST.BinaryOperation)
+
+	def test_dead_branches(self):
+		program = self.optimize("if (1 < 2) x = 1; else x = 2; if (2 < 1) y = 1; while (0 > 1) z = 1; print x;")
+		self.assertEqual(2, len(program.instructions))
+		self.assertEqual(AST.Integer(1), program.instructions[0].expr)
+
+	def test_loop_invariants_are_hoisted(self):
+		text = "a = 3; s = 0; for i = 0:n { s += a * 2 + i; } print s;"
+		program = self.optimize("n = 4; " + text)
+		hoisted, loop = program.instructions[3:5]
+		self.assertIsInstance(hoisted, AST.Ifstatement)  # guarded by the range of the loop
+		self.assertEqual(AST.Variable("inv$0"), loop.body.instructions[0].expr.left)
+		self.assertSameOutput("n = 4; " + text)
+		self.assertSameOutput("n = 0; " + text)
+
+	def test_expressions_not_always_evaluated_stay_in_loop(self):
+		text = "for i = 0:3 { if (i > 5) print x + 1; print i; }"
+		program = self.optimize(text)
+		self.assertIsInstance(program.instructions[0], AST.ForLoopInstruction)
+		self.assertSameOutput(text)
+
+	def test_no_hoisting_behind_print(self):
+		text = "b = 0; for i = 0:3 { print i; x = 1 / b; }"
+		self.assertIsInstance(self.optimize(text).instructions[1], AST.ForLoopInstruction)
+		self.assertOutputThenError("0\n", text)
+
+	def test_no_hoisting_with_element_assignment(self):
+		text = "A = 0; C = 0; B = zeros(2); for i = 0:2 { A = ones(2) .+ B; if (i == 0) C = A; } C[0, 0] = 5; print A;"
+		program = self.optimize(text)
+		self.assertEqual(6, len(program.instructions))
+		self.assertSameOutput(text)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+import builtins
+from Scanner import Scanner
+from Parser import Parser, CachedTable
+import TreePrinter
+
+
+class ParserTablesTest(unittest.TestCase):
+	def setUp(self):
+		self.tablefile = Parser.tablefile
+		self.lrtable = Parser._lrtable
+		self.directory = tempfile.TemporaryDirectory()
+		Parser.tablefile = os.path.join(self.directory.name, "tables.pickle")
+
+	def tearDown(self):
+		Parser.tablefile = self.tablefile
+		Parser._lrtable = self.lrtable
+		self.directory.cleanup()
+
+	def tree(self, program):
+		output = []
+		original_print = builtins.print
+		builtins.print = lambda *args, **kwargs: output.append(" ".join(args))
+		try:
+			program.printTree()
+		finally:
+			builtins.print = original_print
+		return "\n".join(output)
+
+	def test_tables_are_reused_for_the_same_grammar(self):
+		grammar_hash = Parser._grammar_hash()
+		Parser._save_tables(grammar_hash)
+		tables = Parser._load_tables(grammar_hash)
+
+		self.assertEqual(Parser._lrtable.lr_action, tables['lr_action'])
+		self.assertEqual(Parser._lrtable.lr_goto, tables['lr_goto'])
+		self.assertIsNone(Parser._load_tables("other grammar"))
+
+	def test_parsing_with_cached_tables(self):
+		with open("./test_data/parser_example/example1.txt", "r") as file:
+			text = file.read()
+		expected = self.tree(Parser().parse(Scanner().tokenize(text)))
+
+		grammar_hash = Parser._grammar_hash()
+		Parser._save_tables(grammar_hash)
+		Parser._lrtable = CachedTable(**Parser._load_tables(grammar_hash))
+		self.assertEqual(expected, self.tree(Parser().parse(Scanner().tokenize(text))))
+
+	def test_unreadable_cache(self):
+		with open(Parser.tablefile, "w") as file:
+			file.write("not a pickle")
+		self.assertIsNone(Parser._load_tables(Parser._grammar_hash()))
+
+
+if __name__ == '__main__':
+	unittest.main()
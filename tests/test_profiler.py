@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+from interpreter.Interpreter import Interpreter
+from interpreter.Profiler import ProfilingInterpreter
+from engine_test_case import EngineTestCase
+
+
+class ProfilerTest(EngineTestCase):
+	def setUp(self):
+		super().setUp()
+		self.ast = self.parse(self.read('primes'))
+		self.profiler = ProfilingInterpreter(self.parser)
+
+	def test_same_output_as_interpreter(self):
+		self.assertEqual(self.run_program(self.ast, Interpreter()), self.run_program(self.ast, self.profiler))
+
+	def test_node_profiles(self):
+		self.run_program(self.ast, self.profiler)
+		profiles = {profile.label: profile for profile in self.profiler.profiles.values() if profile.lineno == 5}
+
+		while_loop = profiles['WhileInstruction while']
+		self.assertEqual(1108, while_loop.count)
+		self.assertEqual(profiles['Assignment -='].count, profiles['BinaryOperation >'].count - while_loop.count)
+		self.assertGreaterEqual(while_loop.cumulative, profiles['BinaryOperation >'].cumulative)
+
+		program = self.profiler.profiles[id(self.ast)]
+		total_self_time = sum(profile.self_time for profile in self.profiler.profiles.values())
+		self.assertAlmostEqual(program.cumulative, total_self_time, delta=program.cumulative * 1e-6)
+		self.assertIn("WhileInstruction while", self.profiler.report(sort='cumulative', limit=6))
+
+	def test_collapsed_stacks(self):
+		self.run_program(self.ast, self.profiler)
+		with tempfile.TemporaryDirectory() as directory:
+			filename = os.path.join(directory, "stacks.folded")
+			self.profiler.dump_collapsed_stacks(filename)
+			with open(filename, "r") as file:
+				lines = file.read().splitlines()
+
+		stacks = dict(line.rsplit(" ", 1) for line in lines)
+		self.assertIn("Program (line 1);ForLoopInstruction for (line 1)", stacks)
+		self.assertTrue(all(time.isdigit() for time in stacks.values()))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -1,4 +1,6 @@
+import io
 import unittest
+from sly.lex import LexError
 from Scanner import Scanner
 
 
@@ -17,6 +19,29 @@ class ScannerTest(unittest.TestCase):
 		for token, expected_token in zip(self.scanner.tokenize(self.text), expected_output):
 			self.assertEqual(expected_token, str(token.type), f"Unexpected token: {token}")
 
+	def tokens(self, tokens):
+		return [(token.type, token.value, token.lineno, token.index, token.end) for token in tokens]
+
+	def test_tokenize_stream(self):
+		text = self.text + "\nx = 1.5e-3 .+ 'str' .5;\n"
+		expected = self.tokens(self.scanner.tokenize(text))
+
+		for size in range(1, 8):
+			chunks = [text[i:i + size] for i in range(0, len(text), size)]
+			with self.subTest(size=size):
+				self.assertEqual(expected, self.tokens(self.scanner.tokenize_stream(chunks)))
+
+		self.scanner.chunk_size = 5
+		self.assertEqual(expected, self.tokens(self.scanner.tokenize_stream(io.StringIO(text))))
+
+	def test_tokenize_stream_error(self):
+		text = "x = 1;\ny = 2 @ 3;\n"
+		with self.assertRaises(LexError) as expected:
+			list(self.scanner.tokenize(text))
+		with self.assertRaises(LexError) as error:
+			list(self.scanner.tokenize_stream([text[:9], text[9:]]))
+		self.assertEqual(str(expected.exception), str(error.exception))
+
 
 if __name__ == '__main__':
 	unittest.main()
\ No newline at end of file
@@ -0,0 +1,68 @@
+import unittest
+import warnings
+import AST
+from Scanner import Scanner
+from Parser import Parser
+from LexicalAnalyzer import LexicalAnalyzer
+from SymbolTable import VectorType
+
+
+class ShapeInferenceTest(unittest.TestCase):
+	def setUp(self):
+		self.scanner = Scanner()
+		self.parser = Parser()
+
+	def analyze(self, text):
+		analyzer = LexicalAnalyzer()
+		with warnings.catch_warnings(record=True) as caught:
+			warnings.simplefilter('always')
+			analyzer.visit(self.parser.parse(self.scanner.tokenize(text)))
+		return analyzer.symbol_table, [str(warning.message) for warning in caught]
+
+	def test_functions(self):
+		symbols, caught = self.analyze("n = 4; A = eye(3); B = zeros(2, 5); C = ones(n); D = ones(n, 2); E = eye(2, 3);")
+		self.assertEqual(VectorType(shape=(3, 3)), symbols.get('A').type)
+		self.assertEqual(VectorType(shape=(5, 2)), symbols.get('B').type)
+		self.assertEqual(VectorType(shape=(None, None)), symbols.get('C').type)
+		self.assertEqual(VectorType(shape=(2, None)), symbols.get('D').type)
+		self.assertEqual(VectorType(shape=(2, 2)), symbols.get('E').type)
+
+	def test_non_square_matches_runtime(self):
+		symbols, caught = self.analyze("A = zeros(2, 3); C = A * ones(4, 2);")
+		self.assertEqual([], caught)
+		self.assertEqual(VectorType(shape=(3, 4)), symbols.get('C').type)
+		symbols, caught = self.analyze("A = zeros(2, 3); C = A * ones(3, 4);")
+		self.assertEqual(["Vector dimensions must agree: (3, 2) != (4, 3)"], caught)
+
+	def test_elementwise_chain(self):
+		symbols, caught = self.analyze("A = [[1, 2, 3], [4, 5, 6]] .+ ones(3, 2) .* [[1, 1, 1], [2, 2, 2]] .- zeros(3, 2);")
+		self.assertEqual([], caught)
+		self.assertEqual(VectorType(shape=(2, 3)), symbols.get('A').type)
+
+	def test_unknown_dimensions_agree(self):
+		symbols, caught = self.analyze("n = 3; A = ones(n) + eye(3); B = A + ones(3, 3);")
+		self.assertFalse(any("Vector dimensions" in message for message in caught))
+		self.assertEqual(VectorType(shape=(3, 3)), symbols.get('A').type)
+
+	def test_transpose_and_matmul(self):
+		symbols, caught = self.analyze("A = zeros(3, 2); B = A'; C = A * ones(4, 3); D = 2 * C; E = -D;")
+		self.assertEqual([], caught)
+		self.assertEqual(VectorType(shape=(3, 2)), symbols.get('B').type)
+		self.assertEqual(VectorType(shape=(2, 4)), symbols.get('C').type)
+		self.assertEqual(VectorType(shape=(2, 4)), symbols.get('D').type)
+		self.assertEqual(VectorType(shape=(2, 4)), symbols.get('E').type)
+
+	def test_dimension_mismatch(self):
+		symbols, caught = self.analyze("A = eye(2) .+ eye(3); B = zeros(2, 3) * zeros(2, 3);")
+		self.assertEqual(2, len(caught))
+		self.assertTrue(all("Vector dimensions must agree" in message for message in caught))
+
+	def test_reference(self):
+		symbols, caught = self.analyze("A = zeros(3, 4); x = A[1, 2]; y = -2;")
+		self.assertEqual([], caught)
+		self.assertEqual(AST.Numeric, symbols.get('x').type)
+		self.assertEqual(AST.Numeric, symbols.get('y').type)
+
+
+if __name__ == '__main__':
+	unittest.main()
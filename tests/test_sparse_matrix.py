@@ -0,0 +1,76 @@
+import unittest
+import operator
+import numpy as np
+from interpreter.Matrix import Matrix, SparseArray, SPARSE_DENSITY
+
+
+def dense(matrix):
+	return Matrix(matrix.array.toarray() if matrix.sparse else matrix.array.copy())
+
+
+class SparseMatrixTest(unittest.TestCase):
+	def test_constructors_are_sparse(self):
+		zeros, ones, eye = Matrix.zeros(1000, 2000), Matrix.ones(1000, 1000), Matrix.eye(1000)
+		self.assertTrue(zeros.sparse and ones.sparse and eye.sparse)
+		self.assertEqual((1000, 2000), zeros.shape)
+		self.assertEqual(({}, 1), (ones.array.values, ones.array.fill))
+		self.assertEqual(1000, len(eye.array.values))
+		self.assertEqual((1, 0), (eye[3, 3], eye[3, 4]))
+		self.assertFalse(Matrix.eye(3).sparse)  # small matrices are dense enough
+
+	def test_operations_touch_stored_elements_only(self):
+		eye = Matrix.eye(1000)
+		result = (2 * eye.elementwise(operator.add, Matrix.zeros(1000, 1000)) - eye).transpose() * Matrix.eye(1000)
+		self.assertTrue(result.sparse)
+		self.assertEqual(1000, len(result.array.values))
+		self.assertEqual((1, 0), (result[10, 10], result[10, 11]))
+		shifted = -eye + 1
+		self.assertTrue(shifted.sparse)
+		self.assertEqual((0, 1, 1000), (shifted[10, 10], shifted[10, 11], len(shifted.array.values)))
+
+	def test_writes_convert_to_dense(self):
+		matrix = Matrix.zeros(10, 10)
+		for i in range(int(SPARSE_DENSITY * 100)):
+			matrix[i // 10, i % 10] = i + 1
+		self.assertTrue(matrix.sparse)
+		matrix[9, 9] = 0.5
+		self.assertFalse(matrix.sparse)
+		self.assertEqual([1, 2, 3], matrix.tolist()[0][:3])
+		self.assertEqual((0.5, 0), (matrix[9, 9], matrix[9, 8]))
+
+	def test_same_results_as_dense(self):
+		sparse = Matrix(SparseArray((4, 3), {(0, 1): 2, (3, 2): -1.5}))
+		other = Matrix(SparseArray((4, 3), {(0, 1): 4, (1, 1): 1}, fill=1))
+		for name, operation in [
+			('add', lambda x, y: x + y),
+			('sub', lambda x, y: x.elementwise(operator.sub, y)),
+			('mul', lambda x, y: x.elementwise(operator.mul, y)),
+			('div', lambda x, y: x.elementwise(operator.truediv, y)),
+			('scalar', lambda x, y: 3 - x * 0.5),
+			('transpose', lambda x, y: -x.transpose()),
+			('product', lambda x, y: x * y.transpose()),
+			('row', lambda x, y: x[0]),
+		]:
+			with self.subTest(operation=name), np.errstate(divide='ignore', invalid='ignore'):
+				self.assertEqual(str(operation(dense(sparse), dense(other))), str(operation(sparse, other)))
+
+	def test_integer_results_do_not_depend_on_density(self):
+		largest = 9223372036854775807
+		for n in (2, 20):
+			matrix = Matrix.ones(n, n)
+			matrix[0, 0] = largest
+			with self.subTest(sparse=matrix.sparse):
+				self.assertEqual(2 * largest, (matrix.elementwise(operator.add, matrix))[0, 0])
+				self.assertEqual(largest * largest + n - 1, (matrix * matrix)[0, 0])
+				self.assertEqual(largest + 1, (matrix + 1)[0, 0])
+				self.assertEqual(2, (matrix + 1)[1, 1])
+
+	def test_index_errors(self):
+		matrix = Matrix.zeros(2, 3)
+		self.assertEqual(0, matrix[-1, -1])
+		self.assertRaises(IndexError, matrix.__getitem__, (2, 0))
+		self.assertRaises(IndexError, matrix.__setitem__, (0, 3), 1)
+
+
+if __name__ == '__main__':
+	unittest.main()
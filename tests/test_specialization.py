@@ -0,0 +1,61 @@
+import unittest
+from unittest import mock
+import AST
+from LexicalAnalyzer import LexicalAnalyzer, ExpressionTypes, infer_types
+from SymbolTable import VectorType
+from interpreter import Operations
+from interpreter.Interpreter import Interpreter
+from interpreter.ClosureCompiler import ClosureCompiler
+from engine_test_case import EngineTestCase
+
+
+class SpecializationTest(EngineTestCase):
+	def test_recorded_signatures(self):
+		ast = self.parse("x = 1; y = x + 2.5; A = zeros(2, 3); B = A .+ ones(2, 3); C = 2 * A; z = -x; x += 1;")
+		types = infer_types(ast)
+		x, y, A, B, C, z, increment = ast.instructions
+		self.assertEqual((AST.Numeric, AST.Numeric, AST.Numeric), types.get(y.expr))
+		self.assertEqual((VectorType((3, 2)), VectorType((3, 2)), VectorType((3, 2))), types.get(B.expr))
+		self.assertEqual((VectorType((3, 2)), AST.Numeric, VectorType((3, 2))), types.get(C.expr))
+		self.assertEqual((AST.Numeric, AST.Numeric), types.get(z.expr))
+		self.assertEqual((AST.Numeric, AST.Numeric, AST.Numeric), types.get(increment))
+		self.assertIsNone(types.get(x.expr))
+		self.assertIsNone(types.get(self.parse("y = x + 2.5;").instructions[0].expr))
+
+	def test_invalid_operations_are_not_recorded(self):
+		analyzer = LexicalAnalyzer()
+		ast = self.parse("s = 'a' + 1; B = eye(2) .+ eye(3);")
+		with self.assertWarns(UserWarning):
+			analyzer.visit(ast)
+		self.assertEqual(0, len(analyzer.types))
+
+	def test_scalar_operations_are_inlined(self):
+		ast = self.parse("x = 1; for i = 0:3 x += i * 2; y = x + 1; if (x > 3) print y;")
+		generic = Operations.BINARY_OPERATORS['+']
+		calls = []
+
+		def counting(left, right):
+			calls.append((left, right))
+			return generic(left, right)
+		with mock.patch.dict(Operations.BINARY_OPERATORS, {'+': counting}):
+			self.assertEqual("8\n", self.run_program(ast, ClosureCompiler()))
+			self.assertEqual([], calls)
+			self.assertEqual("8\n", self.run_program(ast, ClosureCompiler(ExpressionTypes())))
+			self.assertEqual(4, len(calls))
+
+	def test_same_output_when_types_change_in_loops(self):
+		programs = [
+			"x = 1; for i = 0:2 { y = x * 2; print y; x = [[1, 2], [3, 4]]; }",
+			"A = eye(2); for i = 0:2 { print A * A; A = 3; }",
+			"s = 2; A = eye(2); for i = 0:2 { print s * A; s = A; }",
+			"A = ones(2, 3); B = zeros(2, 3); for i = 0:2 { print A .+ B; print A - B; B = [[1, 2], [3, 4], [5, 6]]; }",
+			"x = 5; for i = 0:2 { y = -x; print y; x = [[1.5]]; }",
+		]
+		for text in programs:
+			with self.subTest(text=text):
+				ast = self.parse(text)
+				self.assertEqual(self.run_program(ast, Interpreter()), self.run_program(ast, ClosureCompiler()))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from Parser import Parser
+from FlatAST import FlatTree
+from interpreter.Interpreter import Interpreter
+from interpreter.TracingJIT import TracingInterpreter, TraceCompiler, TraceAbort
+from engine_test_case import EngineTestCase
+
+
+class TracingJITTest(EngineTestCase):
+	def jit(self, hot_loop=5):
+		jit = TracingInterpreter(self.parser)
+		jit.hot_loop = hot_loop
+		return jit
+
+	def assertSameOutput(self, text, jit):
+		ast = self.parse(text)
+		self.assertEqual(self.run_program(ast, Interpreter()), self.run_program(ast, jit))
+
+	def test_counters(self):
+		ast = self.parse(self.read('primes'))
+		jit = self.jit(hot_loop=50)
+		self.run_program(ast, jit)
+		loops = {loop.lineno: loop for loop in jit.loops.values()}
+		while_loop = loops[5]
+		self.assertEqual(1, len(while_loop.traces))
+		self.assertEqual(50, while_loop.iterations - 1)  # and the recorded iteration
+		self.assertEqual(7096, while_loop.traced_iterations + while_loop.iterations)
+		self.assertEqual(3, loops[3].aborts)  # the for loops are not innermost
+		self.assertEqual(0, loops[3].traced_iterations)
+		self.assertEqual(jit.traced_iterations, while_loop.traced_iterations)
+		self.assertIn(f"{jit.traced_iterations} of {jit.traced_iterations + jit.iterations} iterations", jit.report())
+
+	def test_tree_not_parsed_by_the_parser(self):
+		tree = FlatTree.from_ast(self.parse("s = 0; for i = 0:20 { s += i; } print s;"))
+		jit = TracingInterpreter(Parser())
+		self.assertEqual("190\n", self.run_program(tree.view(), jit))
+		loop, = jit.loops.values()
+		self.assertIsNone(loop.lineno)
+
+	def test_type_guard(self):
+		jit = self.jit()
+		self.assertSameOutput("x = 0; s = 0; for i = 0:40 { if (i > 20) x = 0.5; s += x + i; } print s, x, i;", jit)
+		loop, = jit.loops.values()
+		self.assertEqual(2, len(loop.traces))
+		self.assertEqual([int, float], [trace.guards[trace.names.index('s')] for trace in loop.traces])
+		self.assertEqual(1, loop.exits)
+		self.assertGreater(loop.traced_iterations, 20)
+
+	def test_branch_guard(self):
+		jit = self.jit()
+		self.assertSameOutput("n = 0; k = 0; while (n < 100) { n += 1; if (n > 50) { k += 2; } else { k -= 1; } } "
+							  "print n, k;", jit)
+		loop, = jit.loops.values()
+		self.assertEqual(2, len(loop.traces))
+		self.assertEqual(100, loop.iterations + loop.traced_iterations)
+
+	def test_break_and_continue(self):
+		for text in ["s = 0; for i = 0:60 { if (i == 45) break; s += i; } print s, i;",
+					 "s = 0; for i = 0:60 { t = i * 2; if (t > 30) { s += t; continue; } s -= 1; } print s;",
+					 "n = 0; while (1 < 2) { n += 3; if (n > 100) break; } print n;"]:
+			with self.subTest(text=text):
+				jit = self.jit()
+				self.assertSameOutput(text, jit)
+				self.assertGreater(jit.traced_iterations, 0)
+
+	def test_not_compiled(self):
+		for text in ["n = 0; while (n < 30) { print n; if (n > 10) n += 2; n += 1; }",
+					 "A = eye(2); for i = 0:20 A = A + i; print A;"]:
+			with self.subTest(text=text):
+				jit = self.jit()
+				self.assertSameOutput(text, jit)
+				self.assertEqual(0, jit.traced_iterations)
+				self.assertEqual(jit.max_aborts, sum(loop.aborts for loop in jit.loops.values()))
+
+	def test_block_variables(self):
+		jit = self.jit()
+		self.assertSameOutput("s = 0; for i = 0:40 { w = 1.5; w += i; s += w; } print s;", jit)
+		loop, = jit.loops.values()
+		self.assertEqual(['w'], loop.traces[0].local_names)
+		self.assertNotIn('w', loop.traces[0].names)
+
+	def test_untraced_statement(self):
+		ast = self.parse("x = 1; while (x < 3) x = 'a';")
+		loop = ast.instructions[1]
+		jit = self.jit()
+		jit.memory_stack.insert('x', 1)
+		with self.assertRaises(TraceAbort):
+			TraceCompiler(jit.memory_stack, {}).compile(loop)
+
+
+if __name__ == '__main__':
+	unittest.main()